@@ -10,8 +10,15 @@ from .elements import (
     MdTable,
     MdTableOfContents,
     MdText,
+    render_cache,
 )
+from .builder import MdDocumentBuilder
 from .mdfy import Mdfier
+from .dedup import DedupReport
+from .disk_cache import DiskRenderCache
+from .template import MdSlot, MdTemplate
+from .references import LinkReferences
+from .validation import LinkIssue, ValidationReport, validate_links
 from .types import MdWritableItem, MdContents
 
 __all__ = [
@@ -27,6 +34,16 @@ __all__ = [
     "MdTableOfContents",
     "MdText",
     "Mdfier",
+    "MdSlot",
+    "MdTemplate",
+    "MdDocumentBuilder",
+    "LinkReferences",
+    "DedupReport",
+    "DiskRenderCache",
+    "LinkIssue",
+    "ValidationReport",
+    "validate_links",
     "MdWritableItem",
     "MdContents",
+    "render_cache",
 ]
@@ -0,0 +1,316 @@
+"""Compact, array-backed storage of large documents."""
+
+from array import array
+from io import StringIO
+from itertools import islice
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+from .elements import (
+    MdElement,
+    MdHeader,
+    MdHorizontal,
+    MdImage,
+    MdLink,
+    MdTableOfContents,
+    MdText,
+)
+from .elements._base import Write
+from .elements._table_schema import CHUNK_SIZE
+from .elements.text import _formatter_available, _default_formatter
+from .types import MdContents, MdWritableItem
+from .utils import flattern
+
+# Kinds of records
+_HEADER = 0
+_TEXT = 1
+_LINK = 2
+_IMAGE = 3
+_HORIZONTAL = 4
+_STR = 5
+# Any other element, kept as an object
+_OBJECT = 6
+
+# String index of a missing value, e.g. a link without title
+_NONE = -1
+
+# Levels are stored as unsigned bytes, headers beyond them are kept as objects
+_MAX_LEVEL = 255
+
+
+class MdDocumentBuilder:
+    """Records a document as compact records in parallel arrays.
+
+    Headers, texts, links, images, horizontal rules and plain strings are not
+    kept as objects. Each of them is one record: a kind code, up to three indices
+    into a table of interned strings, and a level, about 14 bytes per element
+    plus the distinct strings. The document is rendered straight from these
+    arrays. Other elements, e.g. tables or code blocks, are kept as they are.
+
+    Use :meth:`to_elements` and :meth:`from_elements` to convert from and to
+    regular element lists, e.g. to pass the document to
+    :class:`~mdfy.mdfy.Mdfier`, which also writes a builder directly.
+
+    Examples:
+        >>> from mdfy import MdDocumentBuilder, MdTable
+        >>> builder = MdDocumentBuilder()
+        >>> builder.header("Catalog")
+        >>> for i in range(2):
+        ...     builder.header(f"Item {i}", level=2)
+        ...     builder.text("[In stock:bold]")
+        >>> builder.add(MdTable([{"price": 10}]))
+        >>> print(builder)
+        # Catalog
+        ## Item 0
+        **In stock**
+        ## Item 1
+        **In stock**
+        | price |
+        | --- |
+        | 10 |
+        >>> len(builder)
+        6
+    """
+
+    __slots__ = (
+        "_kinds",
+        "_levels",
+        "_s0",
+        "_s1",
+        "_s2",
+        "_strings",
+        "_index",
+        "_objects",
+    )
+
+    def __init__(self) -> None:
+        self._kinds = array("B")
+        self._levels = array("B")
+        self._s0 = array("i")
+        self._s1 = array("i")
+        self._s2 = array("i")
+        self._strings: list[str] = []
+        self._index: Dict[str, int] = {}
+        self._objects: list[MdElement] = []
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def _intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NONE
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self._strings)
+            self._strings.append(value)
+        return index
+
+    def _append(
+        self,
+        kind: int,
+        s0: int,
+        s1: int = _NONE,
+        s2: int = _NONE,
+        level: int = 0,
+    ) -> None:
+        self._kinds.append(kind)
+        self._s0.append(s0)
+        self._s1.append(s1)
+        self._s2.append(s2)
+        self._levels.append(level)
+
+    def header(self, content: str, level: int = 1) -> None:
+        """Adds a header, like :class:`~mdfy.elements.header.MdHeader`."""
+        if 0 <= level <= _MAX_LEVEL:
+            self._append(_HEADER, self._intern(content), level=level)
+        else:
+            self._add_object(MdHeader(content, level))
+
+    def text(self, content: str, no_style: bool = False) -> None:
+        """Adds a text, like :class:`~mdfy.elements.text.MdText` with its default formatter."""
+        styled = _formatter_available and not no_style
+        self._append(_TEXT, self._intern(content), level=int(styled))
+
+    def link(self, url: str, text: str = "", title: Optional[str] = None) -> None:
+        """Adds a link, like :class:`~mdfy.elements.link.MdLink`."""
+        self._append(_LINK, self._intern(url), self._intern(text), self._intern(title))
+
+    def image(self, src: str, alt: str = "") -> None:
+        """Adds an image, like :class:`~mdfy.elements.image.MdImage`."""
+        self._append(_IMAGE, self._intern(src), self._intern(alt))
+
+    def horizontal(self, content: str = "***") -> None:
+        """Adds a horizontal rule, like :class:`~mdfy.elements.horizontal.MdHorizontal`."""
+        self._append(_HORIZONTAL, self._intern(content))
+
+    def add(self, element: MdWritableItem) -> None:
+        """Adds a string or an element.
+
+        Elements with a record kind are stored as records, the others as objects.
+
+        Args:
+            element (MdWritableItem): The string or element to add.
+        """
+        # Subclasses may render differently, so they are kept as objects
+        if isinstance(element, str):
+            self._append(_STR, self._intern(element))
+        elif type(element) is MdHeader and 0 <= element.level <= _MAX_LEVEL:
+            self.header(element.content, element.level)
+        elif type(element) is MdText and _is_default_text(element):
+            self.text(element.content, element.no_style)
+        elif type(element) is MdLink and element.url is not None:
+            self.link(element.url, element.text, element.title)
+        elif type(element) is MdImage and element.path is None and element.src:
+            self.image(element.src, element.alt)
+        elif type(element) is MdHorizontal:
+            self.horizontal(element.content)
+        else:
+            self._add_object(element)
+
+    def _add_object(self, element: MdElement) -> None:
+        self._append(_OBJECT, len(self._objects))
+        self._objects.append(element)
+
+    def extend(self, contents: MdContents) -> None:
+        """Adds the flattened contents.
+
+        Args:
+            contents (MdContents): The strings and elements to add.
+        """
+        for element in flattern(contents):
+            self.add(element)
+
+    @classmethod
+    def from_elements(cls, contents: MdContents) -> "MdDocumentBuilder":
+        """Creates a builder holding the given contents.
+
+        Args:
+            contents (MdContents): The strings and elements of the document.
+
+        Returns:
+            MdDocumentBuilder: The builder.
+        """
+        builder = cls()
+        builder.extend(contents)
+        return builder
+
+    def _element(self, i: int) -> MdWritableItem:
+        kind, s0, s1, s2 = self._kinds[i], self._s0[i], self._s1[i], self._s2[i]
+        strings = self._strings
+        if kind == _HEADER:
+            return MdHeader(strings[s0], self._levels[i])
+        if kind == _TEXT:
+            return MdText(strings[s0], no_style=not self._levels[i])
+        if kind == _LINK:
+            return MdLink(
+                strings[s0], strings[s1], None if s2 == _NONE else strings[s2]
+            )
+        if kind == _IMAGE:
+            return MdImage(strings[s0], strings[s1])
+        if kind == _HORIZONTAL:
+            return MdHorizontal(strings[s0])
+        if kind == _STR:
+            return strings[s0]
+        return self._objects[s0]
+
+    def __iter__(self) -> Iterator[MdWritableItem]:
+        """Yields the document as strings and elements, created one at a time."""
+        return map(self._element, range(len(self)))
+
+    def to_elements(self) -> list[MdWritableItem]:
+        """Returns the document as a list of strings and elements.
+
+        Returns:
+            list[MdWritableItem]: The contents, e.g. to pass to :class:`~mdfy.mdfy.Mdfier`.
+        """
+        return list(self)
+
+    def _headers_from(self, start: int) -> list[MdWritableItem]:
+        """Returns the headers of the document from record ``start`` on."""
+        strings, s0, levels = self._strings, self._s0, self._levels
+        headers: list[MdWritableItem] = []
+        for i in range(start, len(self)):
+            kind = self._kinds[i]
+            if kind == _HEADER:
+                headers.append(MdHeader(strings[s0[i]], levels[i]))
+            elif kind == _OBJECT and isinstance(self._objects[s0[i]], MdHeader):
+                headers.append(self._objects[s0[i]])
+        return headers
+
+    def _render(self, start: int, stop: int) -> Iterator[Any]:
+        """Yields the rendered records, or the objects to write, of a range."""
+        strings = self._strings
+        formatter = _default_formatter() if _formatter_available else None
+        records = zip(
+            range(start, stop),
+            islice(self._kinds, start, stop),
+            islice(self._s0, start, stop),
+            islice(self._s1, start, stop),
+            islice(self._s2, start, stop),
+            islice(self._levels, start, stop),
+        )
+        for i, kind, s0, s1, s2, level in records:
+            if kind == _HEADER:
+                yield "#" * level + " " + strings[s0]
+            elif kind == _TEXT:
+                content = strings[s0]
+                yield formatter.format(content) if level and formatter else content
+            elif kind == _LINK:
+                url = strings[s0]
+                text = strings[s1] or url
+                title = f' "{strings[s2]}"' if s2 != _NONE and strings[s2] else ""
+                yield f"[{text}]({url}{title})"
+            elif kind == _IMAGE:
+                yield f"![{strings[s1]}]({strings[s0]})"
+            elif kind == _HORIZONTAL:
+                yield f"\n{strings[s0]}\n"
+            elif kind == _STR:
+                yield strings[s0]
+            else:
+                element = self._objects[s0]
+                if isinstance(element, MdTableOfContents):
+                    yield element.render(self._headers_from(i + 1))
+                else:
+                    yield element
+
+    def render_into(self, write: Write, separator: str = "\n") -> None:
+        """Pushes the document into ``write``, rendering records in chunks.
+
+        Args:
+            write (Callable[[str], Any]): Called with every fragment, in order.
+            separator (str, optional): Pushed between elements. Defaults to a newline.
+        """
+        parts: list[str] = []
+        for i, part in enumerate(self._render(0, len(self))):
+            if i:
+                parts.append(separator)
+            if isinstance(part, str):
+                parts.append(part)
+                if len(parts) < CHUNK_SIZE:
+                    continue
+            if parts:
+                write("".join(parts))
+                parts.clear()
+            if isinstance(part, MdElement):
+                part.render_into(write)
+        write("".join(parts))
+
+    def write_to(self, file: TextIO, separator: str = "\n") -> None:
+        """Writes the document to a text file, rendering records in chunks.
+
+        Args:
+            file (TextIO): The file to write to.
+            separator (str, optional): Written between elements. Defaults to a newline.
+        """
+        self.render_into(file.write, separator)
+
+    def __str__(self) -> str:
+        buffer = StringIO()
+        self.render_into(buffer.write)
+        return buffer.getvalue()
+
+
+def _is_default_text(text: MdText) -> bool:
+    """Whether a text renders like a record, i.e. with no custom formatter."""
+    if text.formatter is None:
+        return True
+    return _formatter_available and text.formatter is _default_formatter()
@@ -0,0 +1,139 @@
+"""Rendering repeated elements of a document once."""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from io import StringIO
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence
+
+from .elements import MdElement
+from .elements._base import _REPR_TYPES, _VALUE_TYPES, MdControlElement, Write
+from .types import MdWritableItem
+
+
+@dataclass
+class DedupReport:
+    """Rendering work saved by writing repeated elements from one rendering.
+
+    Attributes:
+        rendered (int): Number of elements rendered.
+        reused (int): Number of repeated elements written from the rendering of
+            an equal element instead of being rendered.
+        chars_reused (int): Number of characters written from reused renderings.
+    """
+
+    rendered: int = 0
+    reused: int = 0
+    chars_reused: int = 0
+
+
+def _signature(value: Any) -> Hashable:
+    """Returns a cheap key that equal values share, see ``MdElement.structural_key``.
+
+    Lists and mappings only contribute their length, so elements whose
+    signatures differ are told apart without hashing their whole structure.
+    """
+    if isinstance(value, MdElement):
+        return (type(value), tuple(map(_signature, value._fields())))
+    if isinstance(value, (list, tuple, Mapping)):
+        return (type(value), len(value))
+    if isinstance(value, _REPR_TYPES):
+        return repr(value)
+    if value is None or isinstance(value, _VALUE_TYPES):
+        return (type(value), value)
+    return id(value)
+
+
+class SectionDeduplicator:
+    """Renders the equal elements of flattened contents once.
+
+    Elements are compared by their
+    :meth:`~mdfy.elements.MdElement.structural_key`, so a disclaimer quote or a
+    legend table built again for every section is rendered the first time and
+    its rendering is written again for the others. Elements that occur once
+    are streamed as usual, and only the renderings of repeated elements are
+    kept. Only the elements sharing a cheap signature, e.g. tables of as many
+    rows, are keyed and compared.
+
+    Args:
+        contents (Sequence[MdWritableItem]): The flattened contents to render.
+
+    Examples:
+        >>> from mdfy import MdQuote, MdText
+        >>> contents = [MdQuote(MdText("[Draft:bold]")) for _ in range(3)]
+        >>> dedup = SectionDeduplicator(contents)
+        >>> parts = []
+        >>> for i, element in enumerate(contents):
+        ...     dedup.render_into(i, element, parts.append)
+        >>> parts
+        ['> **Draft**', '> **Draft**', '> **Draft**']
+        >>> dedup.report
+        DedupReport(rendered=1, reused=2, chars_reused=22)
+    """
+
+    __slots__ = ("_sources", "_shared", "_renderings", "report")
+
+    def __init__(self, contents: Sequence[MdWritableItem]) -> None:
+        candidates: Dict[Hashable, list[int]] = {}
+        for i, element in enumerate(contents):
+            # Control elements render from their position, so are never shared
+            if isinstance(element, MdElement) and not isinstance(
+                element, MdControlElement
+            ):
+                candidates.setdefault(_signature(element), []).append(i)
+
+        # Index of every repeated element -> index of its first occurrence
+        self._sources: Dict[int, int] = {}
+        for indexes in candidates.values():
+            if len(indexes) < 2:
+                continue
+            firsts: Dict[Any, int] = {}
+            for i in indexes:
+                element = contents[i]
+                assert isinstance(element, MdElement)
+                first = firsts.setdefault(element.structural_key(), i)
+                if first != i:
+                    self._sources[i] = first
+        self._shared = set(self._sources.values())
+        self._renderings: Dict[int, str] = {}
+        self.report = DedupReport()
+
+    def render_into(
+        self,
+        index: int,
+        element: MdElement,
+        write: Write,
+        render: Optional[Callable[[MdElement, Write], None]] = None,
+    ) -> None:
+        """Pushes the element at ``index`` of the contents into ``write``.
+
+        Args:
+            index (int): Position of the element in the contents.
+            element (MdElement): The element.
+            write (Callable[[str], Any]): Called with every fragment, in order.
+            render (Optional[Callable[[MdElement, Write], None]]): Renders the
+                elements that are not reused, e.g.
+                :meth:`~mdfy.disk_cache.DiskRenderCache.render_into`. Defaults
+                to their own ``render_into``.
+        """
+        source = self._sources.get(index)
+        if source is not None:
+            rendering = self._renderings[source]
+            self.report.reused += 1
+            self.report.chars_reused += len(rendering)
+            write(rendering)
+            return
+
+        self.report.rendered += 1
+        if index in self._shared:
+            if render is None:
+                rendering = str(element)
+            else:
+                buffer = StringIO()
+                render(element, buffer.write)
+                rendering = buffer.getvalue()
+            self._renderings[index] = rendering
+            write(rendering)
+        elif render is None:
+            element.render_into(write)
+        else:
+            render(element, write)
@@ -0,0 +1,369 @@
+"""Renderings of elements persisted across runs in a SQLite database."""
+
+import hashlib
+import sqlite3
+import time
+from collections.abc import Mapping
+from datetime import date, time as time_of_day, timedelta
+from decimal import Decimal
+from importlib.metadata import PackageNotFoundError, distribution
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .elements import (
+    MdCode,
+    MdElement,
+    MdImage,
+    MdList,
+    MdQuote,
+    MdTable,
+    MdText,
+)
+from .elements._base import Write, _field_names
+from .elements.text import _default_formatter, _formatter_available
+
+
+def _source_digest() -> str:
+    """Returns a SHA-256 digest of the Python sources of the package."""
+    root = Path(__file__).parent
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob("*.py")):
+        source = path.read_bytes()
+        name = path.relative_to(root).as_posix().encode()
+        digest.update(b"%d;%s;%d;" % (len(name), name, len(source)))
+        digest.update(source)
+    return digest.hexdigest()
+
+
+def _mdfy_version() -> str:
+    """Returns the installed version of mdfy, or a digest of its sources.
+
+    Sources that are not the files of an installed distribution, e.g. a source
+    tree imported directly or installed in editable mode, change between runs
+    without a new version, so they are keyed by their digest.
+    """
+    try:
+        installed = distribution("mdfy")
+    except PackageNotFoundError:
+        return f"source {_source_digest()}"
+    location = Path(str(installed.locate_file("mdfy/disk_cache.py")))
+    if location.resolve() != Path(__file__).resolve():
+        return f"source {_source_digest()}"
+    return installed.version
+
+
+MDFY_VERSION = _mdfy_version()
+
+# Default size of the persisted renderings
+DEFAULT_MAX_BYTES = 256 * 2**20
+
+# Default size of the new renderings kept in memory until they are written
+DEFAULT_MAX_PENDING = 16 * 2**20
+
+# Elements worth a lookup: the others render faster than they are looked up
+_PERSISTED_TYPES = (MdText, MdTable, MdList, MdQuote, MdCode)
+
+# Tables with more rows are written row by row instead of being persisted
+MAX_TABLE_ROWS = 10_000
+
+# Keys per statement, below the limit of SQLite on bound parameters
+_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS renderings (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+
+def _feed(digest: Any, value: Any) -> bool:
+    """Feeds a canonical encoding of a value to ``digest``.
+
+    Returns:
+        bool: False if the value has no stable encoding, e.g. a callable, a
+        generator or a file read when rendering, so it cannot be persisted.
+    """
+    if value is None:
+        digest.update(b"N;")
+    elif isinstance(value, MdElement):
+        if isinstance(value, (MdCode, MdImage)) and value.path is not None:
+            # Rendered from a file that may change between runs
+            return False
+        if isinstance(value, MdTable) and not (
+            isinstance(value.data, list) and len(value.data) <= MAX_TABLE_ROWS
+        ):
+            # Streamed tables are read once, and large ones are not rendered
+            # into one string, nor their rows hashed
+            return False
+        cls = type(value)
+        digest.update(f"E{cls.__module__}.{cls.__qualname__};".encode())
+        for name in _field_names(cls):
+            if not _feed(digest, getattr(value, name, None)):
+                return False
+        if hasattr(value, "__dict__"):
+            return _feed(digest, sorted(vars(value).items()))
+    elif isinstance(value, str):
+        encoded = value.encode("utf-8", "surrogatepass")
+        digest.update(b"S%d;" % len(encoded))
+        digest.update(encoded)
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"L%d;" % len(value))
+        return all(_feed(digest, item) for item in value)
+    elif isinstance(value, Mapping):
+        digest.update(b"M%d;" % len(value))
+        return all(
+            _feed(digest, key) and _feed(digest, item) for key, item in value.items()
+        )
+    elif isinstance(
+        value, (bool, int, float, complex, Decimal, date, time_of_day, timedelta)
+    ):
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, bytes):
+        digest.update(b"B%d;" % len(value))
+        digest.update(value)
+    elif _formatter_available and value is _default_formatter():
+        digest.update(b"F;")
+    else:
+        return False
+    return True
+
+
+def element_key(element: MdElement) -> Optional[str]:
+    """Returns the key of the rendering of an element, stable across runs.
+
+    The key is a SHA-256 digest of the mdfy version, the type of the element and
+    its attributes, nested elements included. The version of mdfy imported from
+    a source tree is a digest of its sources.
+
+    Args:
+        element (MdElement): The element.
+
+    Returns:
+        Optional[str]: The key, or None if the element holds values that cannot
+        be encoded, e.g. a custom formatter, a generator or a file path, or a
+        table streamed from a source or of more than ``MAX_TABLE_ROWS`` rows.
+
+    Examples:
+        >>> from mdfy import MdList, MdText
+        >>> element_key(MdText("[a:bold]")) == element_key(MdText("[a:bold]"))
+        True
+        >>> element_key(MdText("[a:bold]")) == element_key(MdText("[a:italic]"))
+        False
+        >>> print(element_key(MdList(iter(["a"]))))
+        None
+    """
+    digest = hashlib.sha256(f"mdfy {MDFY_VERSION};".encode())
+    if not _feed(digest, element):
+        return None
+    return digest.hexdigest()
+
+
+class DiskRenderCache:
+    """Renderings of elements persisted in a SQLite database across runs.
+
+    :class:`~mdfy.mdfy.Mdfier` looks the texts, tables, lists, quotes and code
+    blocks it writes up by :func:`element_key`, and stores the renderings it
+    misses, so a document rebuilt from mostly unchanged data is mostly copied
+    from the cache. Upgrading mdfy, or editing the sources of a tree it is
+    imported from, changes every key.
+
+    The database is opened in write-ahead logging mode, so parallel processes
+    on the same machine read it while one of them writes. New renderings and
+    access times are kept in memory and written in one transaction by
+    :meth:`flush`, which then evicts the least recently used renderings beyond
+    ``max_bytes``. They are also flushed once the new renderings exceed
+    ``max_pending`` characters, so a long run does not hold them all.
+
+    Args:
+        path (Union[str, Path]): The database file, created if needed.
+        max_bytes (int, optional): Maximum size of the persisted renderings, in
+            UTF-8 bytes. Defaults to 256 MiB.
+        timeout (float, optional): Seconds to wait for another process holding
+            the database. Defaults to 30.
+        max_pending (int, optional): Size of the new renderings kept in memory,
+            in characters, beyond which they are flushed. Defaults to 16 Mi.
+
+    Attributes:
+        hits (int): Number of renderings found in the cache.
+        misses (int): Number of renderings computed and added to the cache.
+        uncacheable (int): Number of elements rendered without lookup, as they
+            have no key, e.g. streamed or large tables.
+
+    Examples:
+        >>> import tempfile
+        >>> from pathlib import Path
+        >>> from mdfy import MdText
+        >>> path = Path(tempfile.mkdtemp()) / "renderings.sqlite"
+        >>> with DiskRenderCache(path) as cache:
+        ...     parts = []
+        ...     cache.render_into(MdText("[cached:bold]"), parts.append)
+        >>> with DiskRenderCache(path) as cache:
+        ...     cache.render_into(MdText("[cached:bold]"), parts.append)
+        ...     cache.hit_rate
+        1.0
+        >>> parts
+        ['**cached**', '**cached**']
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        timeout: float = 30.0,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_pending = max_pending
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        # Transactions are begun explicitly, see flush
+        self._connection = sqlite3.connect(
+            self.path, timeout=timeout, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(_SCHEMA)
+        self._pending: dict[str, str] = {}
+        self._pending_size = 0
+        self._accessed: set[str] = set()
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of the looked up renderings found in the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def size(self) -> int:
+        """Size of the persisted renderings, in UTF-8 bytes."""
+        row = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM renderings"
+        ).fetchone()
+        return int(row[0])
+
+    def __len__(self) -> int:
+        row = self._connection.execute("SELECT COUNT(*) FROM renderings").fetchone()
+        return int(row[0])
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the rendering of the given key, if it is in the cache."""
+        text = self._pending.get(key)
+        if text is None:
+            row = self._connection.execute(
+                "SELECT text FROM renderings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            text = row[0]
+        self._accessed.add(key)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """Adds the rendering of the given key, written on the next :meth:`flush`.
+
+        The new renderings are flushed once they exceed ``max_pending`` characters.
+        """
+        previous = self._pending.get(key)
+        if previous is not None:
+            self._pending_size -= len(previous)
+        self._pending[key] = text
+        self._pending_size += len(text)
+        if self._pending_size > self.max_pending:
+            self.flush()
+
+    def render_into(self, element: MdElement, write: Write) -> None:
+        """Pushes an element into ``write``, from the cache if it was rendered before.
+
+        Args:
+            element (MdElement): The element.
+            write (Callable[[str], Any]): Called with every fragment, in order.
+        """
+        if not isinstance(element, _PERSISTED_TYPES):
+            element.render_into(write)
+            return
+        key = element_key(element)
+        if key is None:
+            self.uncacheable += 1
+            element.render_into(write)
+            return
+        text = self.get(key)
+        if text is None:
+            self.misses += 1
+            text = str(element)
+            self.put(key, text)
+        else:
+            self.hits += 1
+        write(text)
+
+    def flush(self) -> None:
+        """Writes the new renderings and access times, then evicts the least
+        recently used renderings beyond ``max_bytes``, in one transaction."""
+        if not self._pending and not self._accessed:
+            return
+        now = time.time()
+        connection = self._connection
+        # Taking the write lock up front, parallel writers wait for each other
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "INSERT OR REPLACE INTO renderings VALUES (?, ?, ?, ?)",
+                (
+                    (key, text, len(text.encode("utf-8", "surrogatepass")), now)
+                    for key, text in self._pending.items()
+                ),
+            )
+            accessed = list(self._accessed.difference(self._pending))
+            for start in range(0, len(accessed), _BATCH_SIZE):
+                batch = accessed[start : start + _BATCH_SIZE]
+                connection.execute(
+                    "UPDATE renderings SET accessed = ? WHERE key IN "
+                    f"({', '.join('?' * len(batch))})",
+                    (now, *batch),
+                )
+            self._evict()
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._pending.clear()
+        self._pending_size = 0
+        self._accessed.clear()
+
+    def _evict(self) -> None:
+        excess = self.size - self.max_bytes
+        if excess <= 0:
+            return
+        evicted = []
+        rows = self._connection.execute(
+            "SELECT key, size FROM renderings ORDER BY accessed"
+        )
+        for key, size in rows:
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._connection.executemany("DELETE FROM renderings WHERE key = ?", evicted)
+
+    def clear(self) -> None:
+        """Drops every persisted rendering and resets the statistics."""
+        self._pending.clear()
+        self._pending_size = 0
+        self._accessed.clear()
+        self._connection.execute("DELETE FROM renderings")
+        self.hits = self.misses = self.uncacheable = 0
+
+    def close(self) -> None:
+        """Flushes the new renderings and closes the database."""
+        self.flush()
+        self._connection.close()
+
+    def __enter__(self) -> "DiskRenderCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -1,4 +1,5 @@
 from ._base import MdElement
+from ._render_cache import RENDER_CACHE as render_cache
 from .code import MdCode
 from .header import MdHeader
 from .horizontal import MdHorizontal
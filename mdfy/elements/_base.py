@@ -1,7 +1,29 @@
+import io
 import logging
+from collections.abc import Mapping
+from itertools import chain
+from operator import is_
+from datetime import date, time, timedelta
+from decimal import Decimal
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    TextIO,
+    Tuple,
+    Type,
+    final,
+)
+
+from ._render_cache import next_version
 
 logger = logging.getLogger(__name__)
 
+# Sink receiving the fragments of rendered Markdown, e.g. ``file.write``
+Write = Callable[[str], Any]
+
 
 class MdElement:
     """Represents a Markdown element.
@@ -10,9 +32,100 @@ class MdElement:
         content (str or MdElement): The content of the element.
     """
 
+    # Version stamped when a public attribute is assigned while the render
+    # cache is enabled, see _render_cache, and the cached structural key
+    __slots__ = ("_version", "_key", "__weakref__")
+
     def __str__(self) -> str:
         raise NotImplementedError
 
+    def _fields(self) -> Tuple[Any, ...]:
+        """Returns the values of the attributes of the element, in a fixed order."""
+        values = tuple(getattr(self, name, None) for name in _field_names(type(self)))
+        if hasattr(self, "__dict__"):
+            values += tuple(sorted(vars(self).items()))
+        return values
+
+    def structural_key(self) -> Tuple[Any, ...]:
+        """Returns a key shared by the elements of the same type with equal attributes.
+
+        Nested elements, lists and mappings are keyed by their structure,
+        mappings in order. Strings, numbers and dates are keyed by value, floats
+        and decimals by their representation, and other objects, e.g.
+        formatters, callables or generators, by identity. Elements with equal
+        keys render alike. Elements themselves are compared and hashed by
+        identity, so this walks the element only when asked to.
+
+        The key is cached until an attribute of the element or of one of its
+        children is assigned another value, or :meth:`invalidate` is called,
+        e.g. after editing a list the element holds in place.
+
+        Returns:
+            tuple: A hashable key.
+
+        Examples:
+            >>> from mdfy import MdQuote, MdText
+            >>> key = MdQuote(MdText("[Note:bold]")).structural_key()
+            >>> key == MdQuote(MdText("[Note:bold]")).structural_key()
+            True
+            >>> key == MdQuote("[Note:bold]").structural_key()
+            False
+        """
+        # The cached key is valid while the element holds the same values and
+        # its children return their cached keys
+        version = getattr(self, "_version", 0)
+        values = _attribute_values(self)
+        children = list(self._children())
+        child_keys = tuple(child.structural_key() for child in children)
+        cached: Optional[_CachedKey] = getattr(self, "_key", None)
+        if (
+            cached is not None
+            and cached[0] == version
+            and _same(cached[1], values)
+            and _same(cached[2], child_keys)
+        ):
+            return cached[3]
+
+        known = dict(zip(map(id, children), child_keys))
+        fields = self._fields() if hasattr(self, "__dict__") else values
+        key = (type(self), tuple([_key_value(value, known) for value in fields]))
+        object.__setattr__(self, "_key", (version, values, child_keys, key))
+        return key
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """Pickles the element as its class and the values of its attributes.
+
+        Attribute names and bookkeeping, e.g. cached keys, are not pickled.
+        Derived state, like the formatter shared by texts and its parser, is
+        left out by :meth:`_state` and rebuilt on load by :meth:`_restored`.
+        """
+        state: Tuple[Any, ...] = self._state()
+        if hasattr(self, "__dict__"):
+            state += (vars(self),)
+        return (_restore, (type(self), state))
+
+    def _state(self) -> Tuple[Any, ...]:
+        """Returns the values of the slots of the element to pickle, in order."""
+        return tuple(getattr(self, name, None) for name in _field_names(type(self)))
+
+    def _restored(self) -> None:
+        """Rebuilds the state left out by :meth:`_state` once the element is loaded."""
+
+    def invalidate(self) -> None:
+        """Marks the cached rendering of the element, and of its containers, as stale.
+
+        Assigning a public attribute does this automatically while the
+        render cache is enabled. Call it after
+        editing a list held by the element in place, e.g. the rows of a table.
+        """
+
+        object.__setattr__(self, "_version", next_version())
+
+    def _children(self) -> Iterable["MdElement"]:
+        """Returns the elements rendered as part of this one."""
+
+        return ()
+
     def to_str(self) -> str:
         """Returns a string representation of the element in Markdown format.
 
@@ -22,6 +135,138 @@ class MdElement:
 
         return str(self)
 
+    def render_into(self, write: Write) -> None:
+        """Pushes the element in Markdown format into a sink, fragment by fragment.
+
+        Elements that can be rendered piece by piece override this, so that the
+        fragments of composite elements reach the sink without being joined into
+        intermediate strings first. The default writes ``str(self)``, so
+        elements only implementing ``__str__`` work everywhere.
+
+        Args:
+            write (Callable[[str], Any]): Called with every fragment, in order.
+        """
+
+        write(str(self))
+
+    @final
+    def write_to(self, file: TextIO) -> None:
+        """Writes the element in Markdown format to a text file.
+
+        Shorthand for ``render_into(file.write)``. Elements customize
+        :meth:`render_into`, the only sink API, and never override this.
+
+        Args:
+            file (TextIO): The file to write to.
+        """
+
+        self.render_into(file.write)
+
+    def _render_str(self) -> str:
+        """Returns the fragments pushed by :meth:`render_into` as one string."""
+
+        # Fragments are appended to one buffer instead of being kept until joined
+        buffer = io.StringIO()
+        self.render_into(buffer.write)
+        return buffer.getvalue()
+
+
+# Slots of the elements that are bookkeeping rather than attributes
+_BOOKKEEPING = frozenset(("_version", "_key", "__weakref__", "__dict__"))
+
+# Types whose values render alike whenever they are equal
+_VALUE_TYPES = (str, bytes, int, bool, complex, date, time, timedelta)
+
+# Types whose equal values may render differently, e.g. 0.0 and -0.0, or
+# Decimal("1") and Decimal("1.0"), compared by their representation
+_REPR_TYPES = (float, Decimal)
+
+
+# Names of the attribute slots of every element class, see _field_names
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+
+
+def _field_names(cls: type) -> Tuple[str, ...]:
+    """Returns the names of the slots of an element class holding its attributes."""
+    cached = _FIELD_NAMES.get(cls)
+    if cached is not None:
+        return cached
+    names: list[str] = []
+    for klass in reversed(cls.__mro__):
+        slots = vars(klass).get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name not in _BOOKKEEPING and name not in names:
+                names.append(name)
+    _FIELD_NAMES[cls] = tuple(names)
+    return _FIELD_NAMES[cls]
+
+
+# Setters of the attribute slots of every element class, see _restore
+_SETTERS: Dict[type, Tuple[Callable[[Any, Any], None], ...]] = {}
+
+
+def _restore(cls: Type[MdElement], state: Tuple[Any, ...]) -> MdElement:
+    """Creates an element pickled by ``MdElement.__reduce__``."""
+    element = cls.__new__(cls)
+    setters = _SETTERS.get(cls)
+    if setters is None:
+        setters = _SETTERS[cls] = tuple(
+            getattr(cls, name).__set__ for name in _field_names(cls)
+        )
+    # Slots are set through their descriptors, like object.__setattr__ would
+    for setter, value in zip(setters, state):
+        setter(element, value)
+    if len(state) > len(setters):
+        vars(element).update(state[-1])
+    if cls._restored is not MdElement._restored:
+        element._restored()
+    return element
+
+
+# Version, attribute values and child keys an element's key was derived from,
+# and the key
+_CachedKey = Tuple[int, Tuple[Any, ...], Tuple[Any, ...], Tuple[Any, ...]]
+
+
+def _attribute_values(element: MdElement) -> Tuple[Any, ...]:
+    """Returns the attribute values of an element, to be compared by identity."""
+    values = tuple(getattr(element, name, None) for name in _field_names(type(element)))
+    if hasattr(element, "__dict__"):
+        values += tuple(chain.from_iterable(vars(element).items()))
+    return values
+
+
+def _same(first: Tuple[Any, ...], second: Tuple[Any, ...]) -> bool:
+    """Tells whether two tuples hold the same objects."""
+    return len(first) == len(second) and all(map(is_, first, second))
+
+
+def _key_value(value: Any, known: Dict[int, Any]) -> Any:
+    """Returns the key of an attribute value, see ``MdElement.structural_key``.
+
+    ``known`` maps the ids of child elements to their keys, computed already.
+    """
+    if value is None:
+        return None
+    if isinstance(value, MdElement):
+        key = known.get(id(value))
+        return value.structural_key() if key is None else key
+    # Values first, sparing them the slower check against the Mapping ABC
+    if isinstance(value, _REPR_TYPES):
+        return (type(value), repr(value))
+    if isinstance(value, _VALUE_TYPES):
+        return (type(value), value)
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(_key_value(item, known) for item in value))
+    if isinstance(value, Mapping):
+        return (
+            type(value),
+            tuple(
+                (_key_value(k, known), _key_value(v, known)) for k, v in value.items()
+            ),
+        )
+    return (object, id(value))
+
 
 class MdControlElement(MdElement):
     """Represents a control element in Markdown.
@@ -31,6 +276,8 @@ class MdControlElement(MdElement):
     It should not be stringified.
     """
 
+    __slots__ = ()
+
     def __str__(self) -> str:
         logger.warning("Control elements should not be stringified.")
         return super().__str__()
@@ -0,0 +1,132 @@
+"""Base64 encoding of files embedded in the document as data URIs.
+
+Files are encoded in chunks straight into the output. Encodings of small files
+are cached by the hash of their content, so a file embedded many times, or the
+same content under several paths, is read and encoded once.
+"""
+
+import base64
+import hashlib
+import os
+import weakref
+from collections import OrderedDict
+from os import PathLike
+from typing import Any, Tuple, Union
+
+from ._base import Write
+
+# Multiple of 3 bytes, so chunks encode without padding in between
+ENCODE_CHUNK_SIZE = 3 * 2**16
+
+# Files up to this size keep their encoding in the cache
+CACHE_MAX_FILE_SIZE = 2**20
+
+# Default size of the cached encodings, and number of cached file hashes
+CACHE_MAX_BYTES = 32 * 2**20
+CACHE_MAX_DIGESTS = 4096
+
+FilePath = Union[str, "PathLike[str]"]
+
+
+class EmbedCache:
+    """Base64 encodings of files, keyed by the SHA-256 hash of their content.
+
+    Hashes are remembered per path, size and modification time, so an unchanged
+    file is hashed once. Encodings are only kept for files of up to
+    ``max_file_size`` bytes; larger files are encoded again on every write, in
+    chunks, and never held in memory as a whole. Both are evicted least
+    recently used first, beyond ``max_digests`` hashes and ``max_bytes`` of
+    encodings.
+
+    Args:
+        max_file_size (int, optional): Size in bytes of the largest file whose
+            encoding is cached. Defaults to 1 MiB.
+        max_bytes (int, optional): Maximum size of the cached encodings, in
+            bytes. Defaults to 32 MiB.
+        max_digests (int, optional): Maximum number of cached file hashes.
+            Defaults to 4096.
+    """
+
+    def __init__(
+        self,
+        max_file_size: int = CACHE_MAX_FILE_SIZE,
+        max_bytes: int = CACHE_MAX_BYTES,
+        max_digests: int = CACHE_MAX_DIGESTS,
+    ) -> None:
+        self.max_file_size = max_file_size
+        self.max_bytes = max_bytes
+        self.max_digests = max_digests
+        self._digests: OrderedDict[Tuple[str, int, int], str] = OrderedDict()
+        self._encodings: OrderedDict[str, str] = OrderedDict()
+        # Size of the cached encodings, one byte per ASCII character
+        self._size = 0
+
+    def digest(self, path: FilePath) -> str:
+        """Returns the SHA-256 hex digest of the content of a file."""
+        stat = os.stat(path)
+        key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+        digests = self._digests
+        digest = digests.get(key)
+        if digest is not None:
+            digests.move_to_end(key)
+            return digest
+        sha = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(ENCODE_CHUNK_SIZE), b""):
+                sha.update(chunk)
+        digest = digests[key] = sha.hexdigest()
+        while len(digests) > self.max_digests:
+            digests.popitem(last=False)
+        return digest
+
+    def render_base64(self, path: FilePath, write: Write) -> None:
+        """Pushes the base64 encoding of a file into ``write``.
+
+        Args:
+            path (Union[str, PathLike]): The file to encode.
+            write (Callable[[str], Any]): Called with the encoding, in chunks.
+        """
+        if os.path.getsize(path) > self.max_file_size:
+            _stream_base64(path, write)
+            return
+        digest = self.digest(path)
+        encodings = self._encodings
+        encoding = encodings.get(digest)
+        if encoding is not None:
+            encodings.move_to_end(digest)
+            write(encoding)
+            return
+        with open(path, "rb") as source:
+            encoding = base64.b64encode(source.read()).decode("ascii")
+        if len(encoding) <= self.max_bytes:
+            encodings[digest] = encoding
+            self._size += len(encoding)
+            while self._size > self.max_bytes:
+                _, evicted = encodings.popitem(last=False)
+                self._size -= len(evicted)
+        write(encoding)
+
+    def clear(self) -> None:
+        """Forgets every cached hash and encoding."""
+        self._digests.clear()
+        self._encodings.clear()
+        self._size = 0
+
+
+def _stream_base64(path: FilePath, write: Write) -> None:
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(ENCODE_CHUNK_SIZE), b""):
+            write(base64.b64encode(chunk).decode("ascii"))
+
+
+# Shared by all embedded images
+EMBED_CACHE = EmbedCache()
+
+# Embedded reference-style images alive, as documents are only searched for
+# nested ones while there are any
+REFERENCE_IMAGES: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+def reference_label(digest: str, prefix: str = "image") -> str:
+    """Returns the label of a reference definition for content with ``digest``."""
+    return f"{prefix}-{digest[:12]}"
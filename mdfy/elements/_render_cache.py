@@ -0,0 +1,213 @@
+"""Memoized rendering of elements.
+
+Rendered elements are kept in a least recently used cache bounded in bytes.
+While the cache is enabled, assigning a public attribute of an element stamps
+it with a new version; a cached rendering is only reused while the highest
+version in the element's subtree is the one it was rendered with, so a
+container is rendered again when any of its children changes.
+"""
+
+import sys
+import weakref
+from collections import OrderedDict
+from functools import wraps
+from itertools import count
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple, TypeVar
+
+if TYPE_CHECKING:
+    from ._base import MdElement, Write
+
+# Default size of the cached renderings
+DEFAULT_MAX_BYTES = 64 * 2**20
+
+# Versions stamped on elements, increasing across all elements
+_versions = count(1)
+
+_Entry = Tuple["weakref.ref[MdElement]", int, str, int]
+
+_Str = TypeVar("_Str", bound=Callable[[Any], str])
+_RenderInto = TypeVar("_RenderInto", bound=Callable[[Any, Any], None])
+
+
+def next_version() -> int:
+    """Returns a version newer than every version stamped so far."""
+    return next(_versions)
+
+
+def _stamping_setattr(element: "MdElement", name: str, value: Any) -> None:
+    object.__setattr__(element, name, value)
+    if not name.startswith("_"):
+        object.__setattr__(element, "_version", next_version())
+
+
+def _track_versions(enabled: bool) -> None:
+    """Installs or removes the ``__setattr__`` stamping elements with versions.
+
+    It is only installed while the cache is enabled, so assigning attributes
+    costs nothing more otherwise.
+    """
+    from ._base import MdElement
+
+    if enabled:
+        setattr(MdElement, "__setattr__", _stamping_setattr)
+    elif "__setattr__" in vars(MdElement):
+        delattr(MdElement, "__setattr__")
+
+
+def subtree_version(element: "MdElement") -> int:
+    """Returns the highest version of an element and its descendants."""
+    version: int = getattr(element, "_version", 0)
+    for child in element._children():
+        version = max(version, subtree_version(child))
+    return version
+
+
+class RenderCache:
+    """Least recently used cache of rendered elements, bounded in bytes.
+
+    The cache is disabled by default: rendering once, e.g. when writing a
+    document, does not keep every rendered element in memory. Enable it when the
+    same elements are rendered several times.
+
+    Elements are only referenced weakly, and renderings larger than the cache
+    are not kept. Lists and table rows edited in place are not noticed; call
+    :meth:`~mdfy.elements.MdElement.invalidate` on the element afterwards.
+
+    Attributes:
+        enabled (bool): Whether renderings are cached.
+        max_bytes (int): Maximum size of the cached renderings.
+        hits (int): Number of renderings reused.
+        misses (int): Number of renderings computed while enabled.
+
+    Examples:
+        >>> from mdfy import MdText, render_cache
+        >>> render_cache.enable(max_bytes=2**20)
+        >>> text = MdText("[cached:bold]")
+        >>> str(text), str(text)
+        ('**cached**', '**cached**')
+        >>> render_cache.hits, render_cache.misses
+        (1, 1)
+        >>> text.content = "[changed:italic]"
+        >>> str(text)
+        '*changed*'
+        >>> render_cache.disable()
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.enabled = False
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        """Size in bytes of the cached renderings."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def enable(self, max_bytes: Optional[int] = None) -> None:
+        """Starts caching renderings.
+
+        Args:
+            max_bytes (Optional[int]): Maximum size of the cached renderings.
+                Defaults to the current limit, 64 MiB unless changed.
+        """
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+            self._evict()
+        self.enabled = True
+        _track_versions(True)
+
+    def disable(self) -> None:
+        """Stops caching renderings and drops the cached ones."""
+        self.enabled = False
+        _track_versions(False)
+        self.clear()
+
+    def clear(self) -> None:
+        """Drops the cached renderings and resets the statistics."""
+        self._entries.clear()
+        self._size = 0
+        self.hits = self.misses = 0
+
+    def get(self, element: "MdElement") -> Optional[str]:
+        """Returns the cached rendering of an element, if it is still up to date."""
+        key = id(element)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        ref, version, text, size = entry
+        if ref() is not element or subtree_version(element) != version:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return text
+
+    def put(self, element: "MdElement", text: str) -> None:
+        """Caches the rendering of an element, unless it is larger than the cache."""
+        self.misses += 1
+        size = sys.getsizeof(text)
+        if size > self.max_bytes:
+            return
+        key = id(element)
+        self._remove(key)
+        entries = self._entries
+        ref = weakref.ref(element, lambda _: self._remove(key))
+        entries[key] = (ref, subtree_version(element), text, size)
+        self._size += size
+        self._evict()
+
+    def _remove(self, key: int) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[3]
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._size -= entry[3]
+
+
+# Shared by all elements
+RENDER_CACHE = RenderCache()
+
+
+def cached_str(method: _Str) -> _Str:
+    """Decorates ``__str__`` of an element to reuse its cached rendering."""
+
+    @wraps(method)
+    def __str__(self: "MdElement") -> str:
+        cache = RENDER_CACHE
+        if not cache.enabled:
+            return method(self)
+        text = cache.get(self)
+        if text is None:
+            text = method(self)
+            cache.put(self, text)
+        return text
+
+    return __str__  # type: ignore[return-value]
+
+
+def cached_render_into(method: _RenderInto) -> _RenderInto:
+    """Decorates ``render_into`` of an element to push its cached rendering, if any.
+
+    Renderings are only cached by ``__str__``, so streaming a large element does
+    not build it as a whole.
+    """
+
+    @wraps(method)
+    def render_into(self: "MdElement", write: "Write") -> None:
+        if RENDER_CACHE.enabled:
+            text = RENDER_CACHE.get(self)
+            if text is not None:
+                write(text)
+                return
+        method(self, write)
+
+    return render_into  # type: ignore[return-value]
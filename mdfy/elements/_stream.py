@@ -0,0 +1,66 @@
+"""Sinks used by container elements to render their children."""
+
+from typing import Optional
+
+from ._base import Write
+
+
+class LinePrefixWriter:
+    """Sink prefixing every line pushed through it.
+
+    Container elements render their children into its :meth:`write`, so lines
+    are prefixed fragment by fragment as the output streams through, instead of
+    rendering the child to a string and splitting it into lines. Like
+    ``"\\n".join`` over ``str.splitlines()``, a final line break is dropped and
+    an empty output still gets the first prefix once :meth:`finish` is called.
+
+    Args:
+        write (Callable[[str], Any]): The sink to push the prefixed lines to.
+        prefix (str): Prefix of every line.
+        first_prefix (Optional[str]): Prefix of the first line, e.g. the marker of
+            a list item whose other lines are indented. Defaults to ``prefix``.
+
+    Examples:
+        >>> parts = []
+        >>> writer = LinePrefixWriter(parts.append, "> ")
+        >>> writer.write("first line\\nsecond ")
+        >>> writer.write("line\\n")
+        >>> writer.finish()
+        >>> print("".join(parts))
+        > first line
+        > second line
+    """
+
+    __slots__ = ("_write", "_prefix", "_first_prefix", "_started", "_pending")
+
+    def __init__(
+        self, write: Write, prefix: str, first_prefix: Optional[str] = None
+    ) -> None:
+        self._write = write
+        self._prefix = prefix
+        self._first_prefix = prefix if first_prefix is None else first_prefix
+        self._started = False
+        # A line break is only written once the next line starts
+        self._pending = False
+
+    def write(self, text: str) -> None:
+        if not text:
+            return
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+        if self._pending:
+            text = "\n" + text
+        elif not self._started:
+            self._write(self._first_prefix)
+            self._started = True
+        self._pending = text.endswith("\n")
+        if self._pending:
+            text = text[:-1]
+        self._write(text.replace("\n", "\n" + self._prefix))
+
+    def finish(self) -> None:
+        """Writes the first prefix if nothing was written."""
+        if not self._started:
+            self._write(self._first_prefix)
+            self._started = True
@@ -0,0 +1,98 @@
+"""Per-column cell formatters for table rendering.
+
+A column format is compiled once into a function turning a whole column of values
+into strings. Where a column is homogeneous, the conversion runs as a single
+C-level ``map`` instead of dispatching on the type of every cell.
+"""
+
+from itertools import repeat
+from typing import Any, Callable, Optional, Sequence, Union
+
+ColumnFormat = Union[str, Callable[[Any], str]]
+"""Format of a table column.
+
+Either a format specification applied with :func:`format` (e.g. ``",.2f"`` for a
+thousands separator and two decimals, ``".1%"`` for a percentage, or a
+``strftime`` pattern such as ``"%Y-%m-%d"`` for dates), or a callable returning
+the string of a cell.
+"""
+
+ColumnFormatter = Callable[[Sequence[Any]], list[str]]
+
+
+def _format_cell(value: Any, spec: str) -> str:
+    """Formats one value with ``spec``, falling back to ``str`` if it does not apply."""
+    try:
+        return format(value, spec)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _spec_formatter(spec: str) -> ColumnFormatter:
+    def format_column(values: Sequence[Any]) -> list[str]:
+        try:
+            return list(map(format, values, repeat(spec)))
+        except (TypeError, ValueError):
+            # Some cells (e.g. empty cells or labels) do not accept the spec
+            return [_format_cell(value, spec) for value in values]
+
+    return format_column
+
+
+def _precision_formatter(precision: int) -> ColumnFormatter:
+    spec = f".{precision}f"
+
+    def format_column(values: Sequence[Any]) -> list[str]:
+        types = set(map(type, values))
+        if not any(issubclass(t, float) for t in types):
+            return list(map(str, values))
+        if all(issubclass(t, float) for t in types):
+            return list(map(format, values, repeat(spec)))
+        return [
+            format(value, spec) if isinstance(value, float) else str(value)
+            for value in values
+        ]
+
+    return format_column
+
+
+def _callable_formatter(func: Callable[[Any], str]) -> ColumnFormatter:
+    def format_column(values: Sequence[Any]) -> list[str]:
+        return list(map(func, values))
+
+    return format_column
+
+
+def _str_column(values: Sequence[Any]) -> list[str]:
+    return list(map(str, values))
+
+
+def compile_column_formatter(
+    column_format: Optional[ColumnFormat] = None, precision: Optional[int] = None
+) -> ColumnFormatter:
+    """Compiles the format of a column into a column formatter.
+
+    Args:
+        column_format (Optional[ColumnFormat]): Format of the column. If None,
+            values are converted with ``str``, and floats are rounded to
+            ``precision`` decimal places if it is given.
+        precision (Optional[int]): Default number of decimal places for floats.
+
+    Returns:
+        Callable[[Sequence[Any]], list[str]]: Function formatting a column of values.
+
+    Examples:
+        >>> compile_column_formatter(",.2f")([1234.5, 3, ""])
+        ['1,234.50', '3.00', '']
+        >>> compile_column_formatter(precision=1)([0.25, 3, "x"])
+        ['0.2', '3', 'x']
+    """
+    if column_format is None:
+        if precision is None:
+            return _str_column
+        return _precision_formatter(precision)
+    if isinstance(column_format, str):
+        return _spec_formatter(column_format)
+    if callable(column_format):
+        return _callable_formatter(column_format)
+    raise ValueError(f"Invalid column format: {column_format!r}")
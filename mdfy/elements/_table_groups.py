@@ -0,0 +1,94 @@
+"""Single-pass grouping of table rows.
+
+Rows are hashed into per-group buffers while the data is read once. With spilling
+enabled, a buffer holding ``buffer_size`` rows is pickled to a shared temporary
+file, so memory is bounded by the number of groups rather than the number of rows.
+"""
+
+import os
+import pickle
+import tempfile
+from collections import defaultdict
+from itertools import islice
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, Union
+
+from ._table_schema import CHUNK_SIZE, RowExtractor
+
+GroupKey = Union[Any, Callable[[Dict[str, Any]], Any]]
+
+
+class SpilledRows(Iterable[Dict[str, Any]]):
+    """Rows of one group, partly spilled to a temporary file.
+
+    Args:
+        file (IO[bytes]): Temporary file holding the spilled chunks of rows.
+        offsets (list[int]): Offsets of the chunks of this group in ``file``.
+        rows (list[dict]): Rows of this group read after its last spilled chunk.
+    """
+
+    def __init__(self, file: IO[bytes], offsets: list[int], rows: list[Dict[str, Any]]):
+        self._file = file
+        self._offsets = offsets
+        self._rows = rows
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for offset in self._offsets:
+            # Seek before every chunk, other groups may read the file in between
+            self._file.seek(offset)
+            yield from pickle.load(self._file)
+        yield from self._rows
+
+
+def group_rows(
+    data: Iterable[Dict[str, Any]],
+    key: GroupKey,
+    spill: bool = False,
+    buffer_size: int = CHUNK_SIZE,
+) -> Dict[Any, Iterable[Dict[str, Any]]]:
+    """Splits rows into groups in a single pass.
+
+    Args:
+        data (Iterable[dict]): Rows to group. Read once.
+        key (Any): Flattened key (e.g. ``"team.region"``) of the column to group by,
+            or a callable returning the group of a row.
+        spill (bool, optional): If True, groups holding ``buffer_size`` rows are
+            spilled to a temporary file. Defaults to False.
+        buffer_size (int, optional): Number of rows buffered in memory per group
+            when spilling. Defaults to 1024.
+
+    Returns:
+        Dict[Any, Iterable[dict]]: The rows of every group, in order of first appearance.
+    """
+    extractor = None if callable(key) else RowExtractor(columns=[key])
+    groups: Dict[Any, list[Dict[str, Any]]] = defaultdict(list)
+    spilled: Dict[Any, list[int]] = defaultdict(list)
+    file = tempfile.TemporaryFile() if spill else None
+
+    rows = iter(data)
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            break
+        if extractor is None:
+            values: Iterable[Any] = map(key, chunk)
+        else:
+            (values,) = extractor.extract_columns(chunk)
+
+        if file is None:
+            for value, row in zip(values, chunk):
+                groups[value].append(row)
+            continue
+        for value, row in zip(values, chunk):
+            buffer = groups[value]
+            buffer.append(row)
+            if len(buffer) >= buffer_size:
+                spilled[value].append(file.seek(0, os.SEEK_END))
+                pickle.dump(buffer, file, pickle.HIGHEST_PROTOCOL)
+                buffer.clear()
+
+    if file is None:
+        return dict(groups)
+    return {
+        value: SpilledRows(file, spilled.get(value, []), buffer)
+        for value, buffer in groups.items()
+    }
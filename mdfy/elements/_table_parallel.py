@@ -0,0 +1,150 @@
+"""Row-chunked parallel rendering of large tables.
+
+The columns of the table are extracted once in the calling process. Numeric columns
+(only ``int`` or only ``float`` values) are copied into
+:mod:`multiprocessing.shared_memory` blocks, so worker processes read them without
+pickling; the other columns are sent along with each chunk. Workers format and join
+their chunk of rows with the same code as the serial renderer, and the chunks are
+reassembled in order.
+"""
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from ._table_format import ColumnFormat
+from ._table_schema import CHUNK_SIZE
+
+if TYPE_CHECKING:
+    from .table import MdTable
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+# (column index, shared memory name, array typecode)
+_SharedColumn = Tuple[int, str, str]
+
+
+def _typecode(column: list[Any]) -> Optional[str]:
+    """Returns the array typecode to share ``column`` with, if it is numeric.
+
+    Only exact ``int`` and ``float`` columns qualify, so that reading the values
+    back yields objects that format exactly like the originals.
+    """
+    types = set(map(type, column))
+    if types == {float}:
+        return "d"
+    if types == {int} and _INT64_MIN <= min(column) and max(column) <= _INT64_MAX:
+        return "q"
+    return None
+
+
+def _buffer(shm: SharedMemory) -> memoryview:
+    """Returns the buffer of an open shared memory block."""
+    buffer = shm.buf
+    if buffer is None:
+        raise ValueError(f"Shared memory block {shm.name} is closed")
+    return buffer
+
+
+def _attach(name: str) -> SharedMemory:
+    """Attaches to an existing shared memory block owned by another process."""
+    options: Dict[str, Any] = {"track": False}
+    try:
+        return SharedMemory(name=name, **options)
+    except TypeError:
+        # Before Python 3.13 the block is registered with the resource tracker,
+        # which workers share with the owning process that unlinks it.
+        return SharedMemory(name=name)
+
+
+def _render_chunk(
+    start: int,
+    stop: int,
+    keys: list[Any],
+    shared: list[_SharedColumn],
+    columns: Dict[int, list[Any]],
+    row_labels: list[Any],
+    precision: Optional[int],
+    formats: Optional[Dict[Any, ColumnFormat]],
+) -> list[str]:
+    """Renders rows ``start`` to ``stop`` of a table in a worker process."""
+    from .table import MdTable
+
+    for index, name, typecode in shared:
+        shm = _attach(name)
+        values = array(typecode)
+        try:
+            buffer = _buffer(shm)
+            values.frombytes(buffer[start * values.itemsize : stop * values.itemsize])
+        finally:
+            shm.close()
+        columns[index] = values.tolist()
+
+    table = MdTable([], precision=precision, formats=formats)
+    return table._build_batch_rows(
+        table._column_formatters(keys),
+        [columns[i] for i in range(len(keys))],
+        stop - start,
+        row_labels,
+    )
+
+
+def render_rows_parallel(table: "MdTable", workers: int) -> Tuple[list[Any], list[str]]:
+    """Renders the value rows of ``table`` with a pool of worker processes.
+
+    Args:
+        table (MdTable): The table to render. Must not be transposed, and its data
+            must be a list.
+        workers (int): Number of worker processes.
+
+    Returns:
+        Tuple[list[Any], list[str]]: The column keys and the markdown rows, exactly
+        as rendered by the serial renderer.
+    """
+    keys, columns, num_rows = table._collect_columns()
+    row_labels = table.row_labels or []
+    chunk_size = max(CHUNK_SIZE, -(-num_rows // (workers * 4)))
+
+    blocks: list[SharedMemory] = []
+    shared: list[_SharedColumn] = []
+    pickled: list[int] = []
+    try:
+        for index, column in enumerate(columns):
+            typecode = _typecode(column) if column else None
+            if typecode is None:
+                pickled.append(index)
+                continue
+            values = array(typecode, column)
+            shm = SharedMemory(create=True, size=max(1, len(values) * values.itemsize))
+            blocks.append(shm)
+            with memoryview(values) as source:
+                _buffer(shm)[: source.nbytes] = source.cast("B")
+            shared.append((index, shm.name, typecode))
+
+        starts = range(0, num_rows, chunk_size)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _render_chunk,
+                    start,
+                    min(start + chunk_size, num_rows),
+                    keys,
+                    shared,
+                    {i: columns[i][start : start + chunk_size] for i in pickled},
+                    row_labels[start : start + chunk_size],
+                    table.precision,
+                    table.formats,
+                )
+                for start in starts
+            ]
+            rows: list[str] = []
+            for future in futures:
+                rows.extend(future.result())
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    return keys, rows
@@ -0,0 +1,375 @@
+"""Schema inference and compiled key-path extraction for table rows.
+
+Rows handed to :class:`~mdfy.elements.table.MdTable` are usually dictionaries that
+share one (possibly nested) layout. Instead of re-flattening every row, the layout
+of a row is compiled once into a :class:`_RowShape` and whole batches of rows with
+the same layout are extracted column by column with C-level ``map``/``itemgetter``
+passes.
+"""
+
+from itertools import repeat
+from operator import eq, itemgetter
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+_Path = Tuple[Hashable, ...]
+_Columns = list[list[Any]]
+
+# Value used for cells whose key is missing from a row.
+_FILL: Any = ""
+
+_NO_KEYS: frozenset = frozenset()
+
+_MISSING: Any = object()
+
+# Upper bound on the number of row layouts remembered by a single extractor.
+_MAX_SHAPES = 16
+
+# Number of rows extracted per batch.
+CHUNK_SIZE = 1024
+
+
+def path_to_key(path: _Path, sep: str = ".") -> Any:
+    """Converts a key path into the flattened column key.
+
+    Top level keys are kept as-is, nested keys are joined with ``sep``.
+    """
+    if len(path) == 1:
+        return path[0]
+    return sep.join(str(k) for k in path)
+
+
+def _key_prefixes(columns: Iterable[Any], sep: str) -> set:
+    """Returns the flattened keys of the nested dictionaries leading to ``columns``."""
+    prefixes: set[str] = set()
+    for column in columns:
+        if isinstance(column, str):
+            parts = column.split(sep)
+            prefixes.update(sep.join(parts[:i]) for i in range(1, len(parts)))
+    return prefixes
+
+
+class _RowShape:
+    """Compiled extractor for one dictionary layout.
+
+    With a selection of columns, only the branches leading to selected keys are
+    walked, and rows match the shape as long as they hold every selected key of
+    the layout, whatever other keys they have. Such shapes are only used when
+    they cover every selected key.
+
+    Attributes:
+        columns (list): Flattened column keys produced by this shape, in order.
+    """
+
+    def __init__(
+        self,
+        row: Dict,
+        flatten: bool,
+        sep: str,
+        selected: Optional[set] = None,
+        prefixes: Optional[set] = None,
+    ) -> None:
+        node_paths: list[_Path] = []
+        sizes: list[int] = []
+        node_leaves: list[list[Hashable]] = []
+        paths: list[_Path] = []
+
+        # Walk the row once, recording every dictionary node with its full key
+        # count and the leaf keys it holds. Node 0 is the row itself.
+        def visit(d: Dict, prefix: _Path) -> None:
+            leaves: list[Hashable] = []
+            node_paths.append(prefix)
+            sizes.append(len(d))
+            node_leaves.append(leaves)
+            for k, v in d.items():
+                path = prefix + (k,)
+                if selected is None:
+                    if flatten and isinstance(v, dict):
+                        visit(v, path)
+                    else:
+                        leaves.append(k)
+                        paths.append(path)
+                    continue
+                key = path_to_key(path, sep)
+                if key in selected and not (flatten and isinstance(v, dict)):
+                    leaves.append(k)
+                    paths.append(path)
+                elif flatten and isinstance(v, dict) and key in (prefixes or ()):
+                    visit(v, path)
+
+        visit(row, ())
+
+        self.columns = [path_to_key(p, sep) for p in paths]
+        # Key counts are only checked when every key of a row is extracted
+        self._sizes: Optional[list[int]] = sizes if selected is None else None
+        # (parent node index, getter of the node in its parent) for every node
+        # but the row itself, and (node index, getter of the value) per column.
+        node_index = {path: i for i, path in enumerate(node_paths)}
+        self._links = [(node_index[p[:-1]], itemgetter(p[-1])) for p in node_paths[1:]]
+        self._leaves = [(node_index[p[:-1]], itemgetter(p[-1])) for p in paths]
+
+    def extract(self, rows: list[Any], leaf_types: Optional[set]) -> Optional[_Columns]:
+        """Extracts the leaf values of a batch of rows, column by column.
+
+        Args:
+            rows (list): Rows to extract values from.
+            leaf_types (Optional[set]): Types already known not to be dictionaries.
+                New leaf types are added to it. If None, leaves are not checked.
+
+        Returns:
+            Optional[list[list]]: One list of values per column, or None if any
+            of the rows does not have exactly this layout.
+        """
+        # A dictionary holding exactly as many keys as the layout, all of which
+        # the getters find, has exactly the keys of the layout.
+        nodes = [rows]
+        try:
+            if self._sizes is None:
+                for parent, getter in self._links:
+                    nodes.append(list(map(getter, nodes[parent])))
+                columns = [
+                    list(map(getter, nodes[node])) for node, getter in self._leaves
+                ]
+                return self._check_leaves(columns, leaf_types)
+
+            if not all(map(eq, map(len, rows), repeat(self._sizes[0]))):
+                return None
+            for (parent, getter), size in zip(self._links, self._sizes[1:]):
+                children = list(map(getter, nodes[parent]))
+                if size == 0:
+                    # Nothing to fetch from an empty node, so check it directly.
+                    if not all(map(eq, map(dict.keys, children), repeat(_NO_KEYS))):
+                        return None
+                elif not all(map(eq, map(len, children), repeat(size))):
+                    return None
+                nodes.append(children)
+
+            columns = [list(map(getter, nodes[node])) for node, getter in self._leaves]
+        except (KeyError, TypeError, IndexError):
+            # Missing keys, or not a dictionary where this layout expects one.
+            return None
+        return self._check_leaves(columns, leaf_types)
+
+    @staticmethod
+    def _check_leaves(
+        columns: _Columns, leaf_types: Optional[set]
+    ) -> Optional[_Columns]:
+        """Returns None if a leaf of this layout holds a dictionary in some row."""
+        if leaf_types is not None:
+            for column in columns:
+                types = set(map(type, column))
+                if not types <= leaf_types:
+                    if any(issubclass(t, dict) for t in types):
+                        return None
+                    leaf_types |= types
+        return columns
+
+
+class RowExtractor:
+    """Extracts table rows from dictionaries along precompiled key paths.
+
+    The layout of the first row is compiled once and reused for every row that
+    shares it. Rows with a different layout are compiled on the fly, and their
+    new keys are appended to :attr:`columns`, so the extracted table covers the
+    union of all keys in first-seen order.
+
+    Attributes:
+        columns (list): Column keys seen so far.
+
+    Examples:
+        >>> extract = RowExtractor()
+        >>> extract.extract_many([{"a": 1, "b": {"c": 2}}, {"a": 3, "b": {"c": 4}}])
+        [(1, 2), (3, 4)]
+        >>> extract({"a": 3, "b": {"c": 4}, "d": 5})
+        (3, 4, 5)
+        >>> extract.columns
+        ['a', 'b.c', 'd']
+        >>> # Only the selected keys are read
+        >>> RowExtractor(columns=["b.c", "x"]).extract_many([{"a": 1, "b": {"c": 2}}])
+        [(2, '')]
+    """
+
+    def __init__(
+        self, flatten: bool = True, sep: str = ".", columns: Optional[list[Any]] = None
+    ) -> None:
+        """Initializes a row extractor.
+
+        Args:
+            flatten (bool, optional): If True, nested dictionaries are flattened
+                into dotted column keys. Defaults to True.
+            sep (str, optional): Separator used between nested keys. Defaults to '.'.
+            columns (Optional[list]): Flattened keys of the columns to extract, in
+                order. Other keys are never read, and nested dictionaries that do not
+                lead to a selected key are not walked. Defaults to None (all keys).
+        """
+        self.columns: list[Any] = list(columns) if columns is not None else []
+        self._flatten = flatten
+        self._sep = sep
+        self._index: Dict[Any, int] = {c: i for i, c in enumerate(self.columns)}
+        self._selected = set(self.columns) if columns is not None else None
+        self._prefixes = (
+            _key_prefixes(self.columns, sep) if columns is not None else None
+        )
+        self._shapes: list[Tuple[_RowShape, Optional[list[Optional[int]]]]] = []
+        self._leaf_types: Optional[set] = set() if flatten else None
+
+    def __call__(self, row: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Extracts the values of a single row.
+
+        The returned tuple follows :attr:`columns` at the time of the call. Rows
+        extracted before new columns appeared are shorter; see :meth:`pad`.
+        """
+        return tuple(column[0] for column in self.extract_columns([row]))
+
+    def extract_many(self, rows: Iterable[Dict[str, Any]]) -> list[Tuple[Any, ...]]:
+        """Extracts the values of a batch of rows.
+
+        Args:
+            rows (Iterable[dict]): Rows to extract values from.
+
+        Returns:
+            list[tuple]: Values of each row, see :meth:`__call__`.
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        columns = self.extract_columns(rows)
+        if not columns:
+            return [()] * len(rows)
+        return list(zip(*columns))
+
+    def extract_columns(self, rows: Iterable[Dict[str, Any]]) -> _Columns:
+        """Extracts the values of a batch of rows, column by column.
+
+        Batches where every row shares a known layout are extracted in one pass.
+        Otherwise rows are extracted one by one, learning new layouts as needed.
+
+        Args:
+            rows (Iterable[dict]): Rows to extract values from.
+
+        Returns:
+            list[list]: One list of values per entry of :attr:`columns`.
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        for shape, arrange in self._shapes:
+            columns = shape.extract(rows, self._leaf_types)
+            if columns is not None:
+                return self._arrange(columns, arrange, len(rows))
+
+        if self._selected is not None:
+            return self._extract_selected(rows)
+
+        if not rows:
+            return [[] for _ in self.columns]
+        first = rows[:1]
+        if len(rows) == 1 or not any(
+            shape.extract(first, None) is not None for shape, _ in self._shapes
+        ):
+            # The batch starts with a new layout, which likely covers the rest.
+            shape, arrange = self._learn(rows[0])
+            columns = shape.extract(rows, self._leaf_types)
+            if columns is not None:
+                return self._arrange(columns, arrange, len(rows))
+            if len(rows) == 1:  # pragma: no cover - a learnt shape always matches
+                raise ValueError(f"Unable to extract row: {rows[0]!r}")
+
+        # Mixed layouts: go row by row, then pad the rows seen before the
+        # last new column appeared.
+        values = [self(row) for row in rows]
+        values = [self.pad(v) for v in values]
+        if not self.columns:
+            return []
+        return [list(column) for column in zip(*values)]
+
+    def _extract_selected(self, rows: list[Dict[str, Any]]) -> _Columns:
+        """Extracts the selected columns of rows no known layout matches."""
+        first = rows[:1]
+        if (
+            first
+            and isinstance(first[0], dict)
+            and not any(
+                shape.extract(first, None) is not None for shape, _ in self._shapes
+            )
+        ):
+            shape = _RowShape(
+                rows[0], self._flatten, self._sep, self._selected, self._prefixes
+            )
+            # A shape lacking a selected key would also match rows holding it
+            if len(shape.columns) == len(self.columns):
+                arrange = self._register(shape)
+                columns = shape.extract(rows, self._leaf_types)
+                if columns is not None:
+                    return self._arrange(columns, arrange, len(rows))
+
+        # Some rows lack selected keys: look the keys up row by row
+        for row in rows:
+            if not isinstance(row, dict):
+                raise ValueError(f"Table rows must be dictionaries, got {type(row)}")
+        return [
+            [
+                _FILL if v is _MISSING else v
+                for v in map(self._lookup, rows, repeat(key))
+            ]
+            for key in self.columns
+        ]
+
+    def _lookup(self, d: Dict, key: Any) -> Any:
+        """Returns the leaf value of a flattened key in ``d``, or ``_MISSING``."""
+        if key in d:
+            value = d[key]
+            if not (self._flatten and isinstance(value, dict)):
+                return value
+        if self._flatten and isinstance(key, str):
+            # Try every split of the key into a nested dictionary and the rest
+            parts = key.split(self._sep)
+            for i in range(1, len(parts)):
+                child = d.get(self._sep.join(parts[:i]))
+                if isinstance(child, dict):
+                    value = self._lookup(child, self._sep.join(parts[i:]))
+                    if value is not _MISSING:
+                        return value
+        return _MISSING
+
+    @staticmethod
+    def _arrange(
+        columns: _Columns, arrange: Optional[list[Optional[int]]], size: int
+    ) -> _Columns:
+        if arrange is None:
+            return columns
+        return [[_FILL] * size if i is None else columns[i] for i in arrange]
+
+    def _learn(
+        self, row: Dict[str, Any]
+    ) -> Tuple[_RowShape, Optional[list[Optional[int]]]]:
+        """Compiles the layout of ``row`` and registers its new columns."""
+        if not isinstance(row, dict):
+            raise ValueError(f"Table rows must be dictionaries, got {type(row)}")
+
+        shape = _RowShape(row, self._flatten, self._sep)
+        return shape, self._register(shape)
+
+    def _register(self, shape: _RowShape) -> Optional[list[Optional[int]]]:
+        """Registers a compiled layout and its new columns.
+
+        Returns:
+            Optional[list[Optional[int]]]: The index of the shape's column of every
+            column, or None where they are in the same order.
+        """
+        for column in shape.columns:
+            if column not in self._index:
+                self._index[column] = len(self.columns)
+                self.columns.append(column)
+
+        # Map the current union of columns to the shape's columns; None marks a
+        # column this layout does not have.
+        source = {self._index[c]: i for i, c in enumerate(shape.columns)}
+        order = [source.get(i) for i in range(len(self.columns))]
+        arrange = None if order == list(range(len(shape.columns))) else order
+
+        if len(self._shapes) >= _MAX_SHAPES:
+            # Keep the first layout, it is the one most rows share.
+            del self._shapes[1]
+        self._shapes.append((shape, arrange))
+        return arrange
+
+    def pad(self, values: Tuple[Any, ...]) -> Tuple[Any, ...]:
+        """Pads ``values`` with fill values up to the current number of columns."""
+        missing = len(self.columns) - len(values)
+        return values + (_FILL,) * missing if missing > 0 else values
@@ -0,0 +1,402 @@
+"""Row sources read by :class:`~mdfy.elements.table.MdTable` in batches.
+
+A row source yields the table as a stream of column batches, so tables built from
+files are read, rendered and written a bounded number of rows at a time instead
+of being loaded into memory first.
+"""
+
+import abc
+import csv
+import heapq
+import json
+from contextlib import nullcontext
+from itertools import chain, islice, repeat, zip_longest
+from os import PathLike
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+from ._table_schema import _FILL, CHUNK_SIZE, RowExtractor
+
+# (column keys, one sequence of values per column, number of rows)
+Batch = Tuple[list[Any], Sequence[Sequence[Any]], int]
+
+TextSource = Union[str, "PathLike[str]", TextIO]
+
+
+def dict_batches(
+    rows: Iterable[Dict[str, Any]], extractor: RowExtractor
+) -> Iterator[Batch]:
+    """Extracts dictionary rows batch by batch.
+
+    Keys are the columns of ``extractor`` at the time of the batch, so batches
+    extracted before later rows introduced new keys hold fewer columns.
+    """
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            return
+        yield extractor.columns, extractor.extract_columns(chunk), len(chunk)
+
+
+def project_batches(
+    batches: Iterable[Batch],
+    columns: Optional[list[Any]] = None,
+    types: Optional[Dict[Any, Callable[[Any], Any]]] = None,
+) -> Iterator[Batch]:
+    """Selects and converts the columns of batches.
+
+    Args:
+        batches (Iterable[Batch]): Batches to project.
+        columns (Optional[list[Any]]): Keys of the columns to keep, in order.
+            Columns missing from a batch are left empty.
+        types (Optional[Dict[Any, Callable[[Any], Any]]]): Functions converting
+            the values of columns, keyed by column.
+    """
+    for keys, values, size in batches:
+        if columns is not None:
+            index = {key: i for i, key in enumerate(keys[: len(values)])}
+            values = [
+                values[index[key]] if key in index else [_FILL] * size
+                for key in columns
+            ]
+            keys = columns
+        if types:
+            values = [
+                _coerce(column, types[key]) if key in types else column
+                for key, column in zip(keys, values)
+            ]
+        yield keys, values, size
+
+
+def slice_batches(
+    batches: Iterable[Batch], offset: int = 0, limit: Optional[int] = None
+) -> Iterator[Batch]:
+    """Skips the first ``offset`` rows and stops after ``limit`` rows.
+
+    Batches are read lazily, so no batch is read after the last one needed.
+    """
+    if limit is not None and limit <= 0:
+        return
+    start = offset
+    for keys, columns, size in batches:
+        if start >= size:
+            start -= size
+            continue
+        stop = size if limit is None else min(size, start + limit)
+        if start or stop < size:
+            columns = [column[start:stop] for column in columns]
+        yield keys, columns, stop - start
+        if limit is not None:
+            limit -= stop - start
+            if limit <= 0:
+                return
+        start = 0
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == _FILL
+
+
+def _unsortable(sort_by: Any, error: TypeError) -> ValueError:
+    return ValueError(f"Cannot sort by column {sort_by!r}: {error}")
+
+
+def sort_batches(
+    batches: Iterable[Batch],
+    sort_by: Any,
+    descending: bool = False,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Iterator[Batch]:
+    """Sorts the rows of batches by the values of one column.
+
+    With a ``limit``, only the ``offset + limit`` first rows are kept while the
+    batches are read, in a bounded heap: sorting takes O(n log k) time and O(k)
+    memory. Ties keep the order of the source. Rows without a value in the
+    column are placed last.
+
+    Args:
+        batches (Iterable[Batch]): Batches to sort.
+        sort_by (Any): Key of the column to sort by.
+        descending (bool, optional): Sort in descending order. Defaults to False.
+        offset (int, optional): Number of sorted rows to skip. Defaults to 0.
+        limit (Optional[int]): Maximum number of rows to keep.
+
+    Yields:
+        Batch: The sorted rows, with the keys of all batches.
+
+    Raises:
+        ValueError: If the values of the column cannot be compared, e.g. numbers
+            and strings a type conversion left as-is.
+    """
+    if limit is not None and limit <= 0:
+        return
+    size_limit = None if limit is None else offset + limit
+    select = heapq.nlargest if descending else heapq.nsmallest
+    # Rows are compared as (value, position, row). Positions are unique, so rows
+    # are never compared, and negated when descending so that ties keep their order.
+    step = -1 if descending else 1
+
+    keys: list[Any] = []
+    ranked: list[Tuple[Any, int, Tuple[Any, ...]]] = []
+    empty: list[Tuple[Any, ...]] = []
+    position = 0
+    for keys, columns, size in batches:
+        rows: Iterable[Tuple[Any, ...]] = zip(*columns) if columns else repeat((), size)
+        positions = range(position * step, (position + size) * step, step)
+        position += size
+
+        present = keys[: len(columns)]
+        if sort_by not in present:
+            empty.extend(rows)
+        else:
+            values = columns[present.index(sort_by)]
+            entries: Iterable[Tuple[Any, int, Tuple[Any, ...]]] = zip(
+                values, positions, rows
+            )
+            if None in values or _FILL in values:
+                entries = list(entries)
+                empty.extend(row for value, _, row in entries if _is_empty(value))
+                entries = [entry for entry in entries if not _is_empty(entry[0])]
+            if size_limit is None:
+                ranked.extend(entries)
+            else:
+                try:
+                    ranked = select(size_limit, chain(ranked, entries))
+                except TypeError as error:
+                    raise _unsortable(sort_by, error) from error
+        if size_limit is not None:
+            del empty[size_limit:]
+
+    if size_limit is None:
+        try:
+            ranked.sort(reverse=descending)
+        except TypeError as error:
+            raise _unsortable(sort_by, error) from error
+    selected = [row for _, _, row in ranked]
+    selected.extend(empty)
+    selected = selected[offset:size_limit]
+
+    # Rows read before later batches introduced new columns are shorter
+    width = len(keys)
+    for start in range(0, len(selected), CHUNK_SIZE):
+        chunk = [
+            row + (_FILL,) * (width - len(row))
+            for row in selected[start : start + CHUNK_SIZE]
+        ]
+        yield keys, list(zip(*chunk)) if width else [], len(chunk)
+
+
+def _coerce(values: Sequence[Any], func: Callable[[Any], Any]) -> list[Any]:
+    """Converts a column of values with ``func``, keeping the values it rejects."""
+    try:
+        return list(map(func, values))
+    except (TypeError, ValueError):
+        converted = []
+        for value in values:
+            try:
+                converted.append(func(value))
+            except (TypeError, ValueError):
+                # e.g. empty cells of a numeric column
+                converted.append(value)
+        return converted
+
+
+def _open_text(
+    source: TextSource, encoding: str, newline: Optional[str] = None
+) -> ContextManager[TextIO]:
+    """Opens a path, or passes an already open file through without closing it."""
+    if isinstance(source, (str, PathLike)):
+        return open(source, encoding=encoding, newline=newline)
+    return nullcontext(source)
+
+
+class RowSource(Iterable[Dict[str, Any]], abc.ABC):
+    """Source of table rows read in batches.
+
+    Args:
+        columns (Optional[list[Any]]): Keys of the columns to keep, in order.
+            Defaults to None (all columns).
+        types (Optional[Dict[Any, Callable[[Any], Any]]]): Functions converting
+            the values of columns, keyed by column. Values a function rejects are
+            kept as-is.
+        limit (Optional[int]): Maximum number of rows to read.
+    """
+
+    def __init__(
+        self,
+        columns: Optional[list[Any]] = None,
+        types: Optional[Dict[Any, Callable[[Any], Any]]] = None,
+        limit: Optional[int] = None,
+    ) -> None:
+        self.columns = columns
+        self.types = types
+        self.limit = limit
+
+    @abc.abstractmethod
+    def _read_batches(self) -> Iterator[Batch]:
+        """Yields the rows of the source as batches of all its columns."""
+
+    def _check_columns(self, header: list[Any]) -> None:
+        """Raises a ValueError if a selected column is missing from ``header``."""
+        if self.columns is not None:
+            unknown = [key for key in self.columns if key not in header]
+            if unknown:
+                raise ValueError(f"Columns not found in header: {unknown}")
+
+    def iter_batches(self) -> Iterator[Batch]:
+        """Yields the rows of the source as batches of selected, converted columns."""
+        return project_batches(self._read_batches(), self.columns, self.types)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for keys, columns, _ in self.iter_batches():
+            keys = keys[: len(columns)]
+            for values in zip(*columns):
+                yield dict(zip(keys, values))
+
+
+class CsvSource(RowSource):
+    """Rows of a CSV file, whose first line holds the column names.
+
+    Args:
+        source (Union[str, PathLike, TextIO]): Path or open text file to read.
+        delimiter (str, optional): Field delimiter, e.g. ``"\\t"`` for TSV.
+            Defaults to ``","``.
+        encoding (str, optional): Encoding of the file. Defaults to ``"utf-8"``.
+        **fmtparams: Other formatting parameters of :func:`csv.reader`.
+    """
+
+    def __init__(
+        self,
+        source: TextSource,
+        delimiter: str = ",",
+        columns: Optional[list[Any]] = None,
+        types: Optional[Dict[Any, Callable[[Any], Any]]] = None,
+        limit: Optional[int] = None,
+        encoding: str = "utf-8",
+        **fmtparams: Any,
+    ) -> None:
+        super().__init__(columns, types, limit)
+        self.source = source
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.fmtparams = fmtparams
+
+    def _read_batches(self) -> Iterator[Batch]:
+        with _open_text(self.source, self.encoding, newline="") as file:
+            reader = csv.reader(file, delimiter=self.delimiter, **self.fmtparams)
+            header = next(reader, None)
+            if header is None:
+                return
+            self._check_columns(header)
+
+            width = len(header)
+            rows = reader if self.limit is None else islice(reader, self.limit)
+            while True:
+                chunk = list(islice(rows, CHUNK_SIZE))
+                if not chunk:
+                    return
+                # Short rows are padded, fields beyond the header are dropped
+                columns: list[Sequence[Any]] = list(
+                    zip_longest(*chunk, fillvalue=_FILL)
+                )[:width]
+                columns.extend([(_FILL,) * len(chunk)] * (width - len(columns)))
+                yield header, columns, len(chunk)
+
+
+class JsonLinesSource(RowSource):
+    """Rows of a JSON Lines file, one JSON object per line.
+
+    Nested objects are flattened into dotted column keys.
+
+    Args:
+        source (Union[str, PathLike, TextIO]): Path or open text file to read.
+        encoding (str, optional): Encoding of the file. Defaults to ``"utf-8"``.
+    """
+
+    def __init__(
+        self,
+        source: TextSource,
+        columns: Optional[list[Any]] = None,
+        types: Optional[Dict[Any, Callable[[Any], Any]]] = None,
+        limit: Optional[int] = None,
+        encoding: str = "utf-8",
+    ) -> None:
+        super().__init__(columns, types, limit)
+        self.source = source
+        self.encoding = encoding
+
+    @staticmethod
+    def _parse(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+
+    def _read_batches(self) -> Iterator[Batch]:
+        with _open_text(self.source, self.encoding) as file:
+            rows = self._parse(file)
+            if self.limit is not None:
+                rows = islice(rows, self.limit)
+            # Only the selected keys are extracted from the parsed objects
+            yield from dict_batches(rows, RowExtractor(columns=self.columns))
+
+
+class CursorSource(RowSource):
+    """Rows of a DB-API 2.0 cursor holding the result of a query.
+
+    Column names are read from ``cursor.description`` and rows are fetched with
+    ``cursor.fetchmany(batch_size)``, so the result set is never held as a whole.
+
+    Args:
+        cursor (Any): Cursor on which a query was executed.
+        batch_size (int, optional): Number of rows fetched at once.
+            Defaults to ``CHUNK_SIZE``.
+    """
+
+    def __init__(
+        self,
+        cursor: Any,
+        batch_size: int = CHUNK_SIZE,
+        columns: Optional[list[Any]] = None,
+        types: Optional[Dict[Any, Callable[[Any], Any]]] = None,
+        limit: Optional[int] = None,
+    ) -> None:
+        super().__init__(columns, types, limit)
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        self.cursor = cursor
+        self.batch_size = batch_size
+
+    def _read_batches(self) -> Iterator[Batch]:
+        description = self.cursor.description
+        if description is None:
+            raise ValueError("The cursor does not hold the result of a query")
+        header = [column[0] for column in description]
+        self._check_columns(header)
+
+        remaining = self.limit
+        while remaining is None or remaining > 0:
+            size = (
+                self.batch_size
+                if remaining is None
+                else min(self.batch_size, remaining)
+            )
+            rows = self.cursor.fetchmany(size)
+            if not rows:
+                return
+            if remaining is not None:
+                remaining -= len(rows)
+            # Rows of a result set all hold one value per column
+            yield header, list(zip(*rows)), len(rows)
@@ -1,9 +1,28 @@
 import logging
+import mmap
+import re
+from os import PathLike
+from pathlib import Path
+from typing import Optional, Tuple, Union
 
-from ._base import MdElement
+from ._base import MdElement, Write
+from ._render_cache import cached_render_into, cached_str
 
 logger = logging.getLogger(__name__)
 
+# Runs of backticks that a code fence must be longer than
+_BACKTICK_RUN = re.compile("`{3,}")
+_BACKTICK_RUN_BYTES = re.compile(b"`{3,}")
+
+# Number of characters read at once from code files
+_READ_CHUNK_SIZE = 2**16
+
+
+def _fence_length(runs: "re.Pattern", content: Union[str, bytes, mmap.mmap]) -> int:
+    """Returns the length of a fence longer than every run of backticks in ``content``."""
+    longest = max((len(m.group()) for m in runs.finditer(content)), default=0)
+    return max(3, longest + 1)
+
 
 class MdCode(MdElement):
     """Represents Markdown code or code block.
@@ -12,6 +31,7 @@ class MdCode(MdElement):
         code (str): The code string.
         inline (bool): Determines if the code should be represented as inline or block.
         syntax (str): The programming language syntax for the code block.
+        path (Optional[Path]): File holding the code, for code blocks created with :meth:`from_file`.
 
     Examples:
         >>> code = MdCode("print('Hello World!')", inline=True)
@@ -24,6 +44,8 @@ class MdCode(MdElement):
         ```
     """
 
+    __slots__ = ("code", "inline", "syntax", "path", "encoding")
+
     def __init__(self, code: str, inline: bool = False, syntax: str = "") -> None:
         """Initializes an instance of the MdCode class to represent Markdown code or code block.
 
@@ -42,11 +64,71 @@ class MdCode(MdElement):
         self.code = code
         self.inline = inline
         self.syntax = syntax
+        self.path: Optional[Path] = None
+        self.encoding = "utf-8"
 
         # Check for newlines to override inline setting
         if "\n" in code:
             self.inline = False
 
+    @classmethod
+    def from_file(
+        cls,
+        path: Union[str, "PathLike[str]"],
+        syntax: str = "",
+        encoding: str = "utf-8",
+    ) -> "MdCode":
+        """Creates a code block holding the content of a file.
+
+        The file is read when the code block is rendered. When written to a file,
+        the content is copied in chunks and never held in memory as a whole, and
+        the fence is chosen by scanning a memory map of the file, so it is longer
+        than any run of backticks in the content.
+
+        Args:
+            path (Union[str, PathLike[str]]): Path of the file.
+            syntax (str, optional): The programming language syntax for the code block.
+            encoding (str, optional): Encoding of the file. Defaults to "utf-8".
+
+        Returns:
+            MdCode: The code block.
+        """
+        code = cls("", syntax=syntax)
+        code.path = Path(path)
+        code.encoding = encoding
+        return code
+
+    def _scan_file(self, path: Path) -> Tuple[str, bool]:
+        """Returns the fence of a file's code block, and whether the file ends with a newline."""
+        with path.open("rb") as file:
+            if path.stat().st_size == 0:
+                return "```", False
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                return "`" * _fence_length(_BACKTICK_RUN_BYTES, content), (
+                    content[-1:] == b"\n"
+                )
+
+    @cached_render_into
+    def render_into(self, write: Write) -> None:
+        """Pushes the code in Markdown format into ``write``.
+
+        Code blocks created with :meth:`from_file` push the file in chunks.
+
+        Args:
+            write (Callable[[str], Any]): Called with every fragment, in order.
+        """
+        if self.path is None:
+            write(str(self))
+            return
+
+        fence, ends_with_newline = self._scan_file(self.path)
+        write(f"{fence}{self.syntax}\n")
+        with self.path.open(encoding=self.encoding) as source:
+            for chunk in iter(lambda: source.read(_READ_CHUNK_SIZE), ""):
+                write(chunk)
+        write(fence if ends_with_newline else f"\n{fence}")
+
+    @cached_str
     def __str__(self) -> str:
         """Returns a string representation of the code in Markdown format.
 
@@ -58,7 +140,12 @@ class MdCode(MdElement):
         """
 
         code = self.code
+        if self.path is not None:
+            code = self.path.read_text(encoding=self.encoding)
+            if code.endswith("\n"):
+                code = code[:-1]
         if self.inline:
             return f"`{code}`"
         else:
-            return f"```{self.syntax}\n{code}\n```"
+            fence = "`" * _fence_length(_BACKTICK_RUN, code)
+            return f"{fence}{self.syntax}\n{code}\n{fence}"
@@ -20,6 +20,8 @@ class MdHeader(MdElement):
         ## This is a header
     """
 
+    __slots__ = ("content", "level")
+
     def __init__(self, content: str, level: int = 1) -> None:
         """Initializes an instance of the MdHeader class to represent a Markdown header.
 
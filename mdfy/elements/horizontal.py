@@ -21,6 +21,8 @@ class MdHorizontal(MdElement):
         ---
     """
 
+    __slots__ = ("content",)
+
     def __init__(self, content: str = "***") -> None:
         """Initializes an instance of the MdHorizontal class to represent a Markdown horizontal rule.
 
@@ -1,6 +1,11 @@
 import logging
+import mimetypes
+from os import PathLike
+from pathlib import Path
+from typing import Optional, Union
 
-from ._base import MdElement
+from ._base import MdElement, Write
+from ._embed import EMBED_CACHE, REFERENCE_IMAGES, reference_label
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +27,21 @@ class MdImage(MdElement):
         >>> image = MdImage("https://example.com/image.png", alt="Example image")
         >>> print(image)
         ![Example image](https://example.com/image.png)
+        >>>
+        >>> import tempfile
+        >>> path = Path(tempfile.mkdtemp()) / "dot.gif"
+        >>> _ = path.write_bytes(b"GIF89a")
+        >>> print(MdImage.embed(path, alt="Dot"))
+        ![Dot](data:image/gif;base64,R0lGODlh)
+        >>> image = MdImage.embed(path, alt="Dot", reference=True)
+        >>> print(image)
+        ![Dot][image-610f5ae4d76e]
+        >>> print(image.definition())
+        [image-610f5ae4d76e]: data:image/gif;base64,R0lGODlh
     """
 
+    __slots__ = ("src", "alt", "path", "mime_type", "reference")
+
     def __init__(self, src: str, alt: str = "") -> None:
         """Initializes an instance of the MdImage class to represent a Markdown image.
 
@@ -33,6 +51,106 @@ class MdImage(MdElement):
         """
         self.src = src
         self.alt = alt
+        self.path: Optional[Path] = None
+        self.mime_type = ""
+        self.reference = False
+
+    @classmethod
+    def embed(
+        cls,
+        path: Union[str, "PathLike[str]"],
+        alt: str = "",
+        mime_type: Optional[str] = None,
+        reference: bool = False,
+    ) -> "MdImage":
+        """Creates an image embedded in the document as a base64 data URI.
+
+        The file is read when the image is rendered. When written to a file, it
+        is encoded in chunks straight into the output. Encodings of small files
+        are cached by content hash, so an image used many times is encoded once.
+
+        With ``reference``, the image is rendered as a reference-style image
+        (``![alt][label]``) whose label is derived from the content hash, and
+        :class:`~mdfy.mdfy.Mdfier` writes the data URI once, as a definition at
+        the end of the document, however many times the image appears.
+
+        Args:
+            path (Union[str, PathLike]): The image file.
+            alt (str, optional): The alternative text for the image. Defaults to an empty string.
+            mime_type (Optional[str]): The media type of the image. Defaults to
+                the type guessed from the file extension.
+            reference (bool, optional): Render as a reference-style image. Defaults to False.
+
+        Returns:
+            MdImage: The embedded image.
+        """
+        path = Path(path)
+        if mime_type is None:
+            mime_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        image = cls(str(path), alt)
+        image.path = path
+        image.mime_type = mime_type
+        image.reference = reference
+        if reference:
+            REFERENCE_IMAGES.add(image)
+        return image
+
+    @property
+    def label(self) -> Optional[str]:
+        """The label of the reference definition of an embedded reference-style image."""
+        if self.path is None or not self.reference:
+            return None
+        return reference_label(EMBED_CACHE.digest(self.path))
+
+    def _render_data_uri(self, write: Write) -> None:
+        assert self.path is not None
+        write(f"data:{self.mime_type};base64,")
+        EMBED_CACHE.render_base64(self.path, write)
+
+    def render_definition_into(self, write: Write) -> None:
+        """Pushes the reference definition of an embedded reference-style image into ``write``.
+
+        Args:
+            write (Callable[[str], Any]): Called with every fragment, in order.
+
+        Raises:
+            ValueError: If the image is not an embedded reference-style image.
+        """
+        label = self.label
+        if label is None:
+            raise ValueError("Only embedded reference-style images have a definition")
+        write(f"[{label}]: ")
+        self._render_data_uri(write)
+
+    def definition(self) -> str:
+        """Returns the reference definition of an embedded reference-style image.
+
+        Returns:
+            str: The definition, e.g. ``[image-0123456789ab]: data:image/png;base64,...``.
+        """
+        parts: list[str] = []
+        self.render_definition_into(parts.append)
+        return "".join(parts)
+
+    def render_into(self, write: Write) -> None:
+        """Pushes the image into ``write``, encoding embedded images in chunks.
+
+        Args:
+            write (Callable[[str], Any]): Called with every fragment, in order.
+        """
+        if self.path is None:
+            write(str(self))
+            return
+        label = self.label
+        if label is not None:
+            # Registers images made reference-style after being embedded, so
+            # that Mdfier defines them
+            REFERENCE_IMAGES.add(self)
+            write(f"![{self.alt}][{label}]")
+            return
+        write(f"![{self.alt}](")
+        self._render_data_uri(write)
+        write(")")
 
     def __str__(self) -> str:
         """Returns a string representation of the image in Markdown format.
@@ -43,6 +161,8 @@ class MdImage(MdElement):
         Warnings:
             If the image source is None, it will log a warning and set the source to an empty string.
         """
+        if self.path is not None:
+            return self._render_str()
         src = self.src
         if src is None:
             logger.warning("Image source is None, setting to empty string")
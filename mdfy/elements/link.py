@@ -24,6 +24,8 @@ class MdLink(MdElement):
         [example](https://www.example.com "example")
     """
 
+    __slots__ = ("url", "text", "title")
+
     def __init__(self, url: str, text: str = "", title: Optional[str] = None) -> None:
         """Initializes an instance of the MdLink class to represent a Markdown link.
 
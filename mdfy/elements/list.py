@@ -1,16 +1,72 @@
-from typing import Union
+from collections import deque
+from collections.abc import Mapping
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from ._base import MdElement
+from ._base import MdElement, Write
+from ._render_cache import cached_render_into, cached_str
+from ._stream import LinePrefixWriter
+from ._table_schema import CHUNK_SIZE
+
+ListItems = Union[Iterable[Any], Mapping[Any, Any]]
+
+# (iterator over items, depth, next number, whether the items are mapping pairs)
+_Frame = Tuple[Iterator[Any], int, int, bool]
+
+
+def _is_nested(item: Any) -> bool:
+    """Returns True if ``item`` holds nested items rather than being an item."""
+    return isinstance(item, (list, Mapping, Iterator))
+
+
+def _groups(items: Iterable[Any]) -> Iterator[list[Any]]:
+    """Yields every top-level item together with the nested lists holding its children."""
+    group: list[Any] = []
+    for item in items:
+        if group and (type(item) is str or not _is_nested(item)):
+            yield group
+            group = []
+        group.append(item)
+    if group:
+        yield group
+
+
+def _render_element(element: MdElement, prefix: str) -> str:
+    """Renders an element as a list item, indenting its other lines under the first."""
+    parts: list[str] = []
+    writer = LinePrefixWriter(parts.append, " " * len(prefix), prefix)
+    element.render_into(writer.write)
+    writer.finish()
+    return "".join(parts)
+
+
+def _frame(items: ListItems, depth: int, number: int) -> _Frame:
+    if isinstance(items, Mapping):
+        return iter(items.items()), depth, number, True
+    return iter(items), depth, number, False
 
 
 class MdList(MdElement):
     """Represents a Markdown list.
 
     Attributes:
-        items (list[Union[str, MdList]]): List of items, where each item can be a string or another MdList.
+        items (Union[Iterable, Mapping]): Items of the list, where nested lists or mappings hold nested items.
         depth (int): Current depth of the list.
         indent (int): indent size of the list.
         numbered (bool): If True, the list will be numbered. Otherwise, it will be bulleted.
+        sequential (bool): If True, numbered items are numbered 1, 2, 3... instead of all 1.
+        children (Optional[Callable]): Function returning the children of an item, if any.
+        max_depth (Optional[int]): Number of nested levels rendered below the top level.
+        max_items (Optional[int]): Number of items rendered before the list is cut off.
 
     Examples:
         >>> from mdfy.elements import MdList
@@ -36,63 +92,289 @@ class MdList(MdElement):
         - item 1
             - item 2.1
             - item 2.2
+        >>>
+        >>> list = MdList(["item 1", ["item 1.1"], "item 2"], numbered=True, sequential=True)
+        >>> print(list)
+        1. item 1
+            1. item 1.1
+        2. item 2
+        >>>
+        >>> # Mappings, with nested mappings or lists as children
+        >>> print(MdList({"src": {"main.py": None, "lib": ["util.py"]}, "version": "1.0"}))
+        - src
+            - main.py
+            - lib
+                - util.py
+        - version: 1.0
+        >>>
+        >>> # Elements spanning several lines are indented under their marker
+        >>> from mdfy.elements import MdCode
+        >>> print(MdList(["Install:", MdCode("pip install mdfy", syntax="sh")]))
+        - Install:
+        - ```sh
+          pip install mdfy
+          ```
+        >>>
+        >>> # Children expanded lazily while rendering
+        >>> print(MdList([1], children=lambda n: [n * 2, n * 2 + 1], max_depth=2))
+        - 1
+            - 2
+                - 4
+                - 5
+            - 3
+                - 6
+                - 7
     """
 
+    __slots__ = (
+        "items",
+        "depth",
+        "indent",
+        "numbered",
+        "sequential",
+        "children",
+        "max_depth",
+        "max_items",
+    )
+
     def __init__(
         self,
-        items: list[Union[str, "MdList"]],
+        items: ListItems,
         depth: int = 0,
         indent: int = 4,
         numbered: bool = False,
+        sequential: bool = False,
+        children: Optional[Callable[[Any], Optional[Iterable[Any]]]] = None,
+        max_depth: Optional[int] = None,
+        max_items: Optional[int] = None,
     ) -> None:
         """Initialize a MdList instance.
 
         Args:
-            items (list[Union[str, MdList]]): List of items, where each item can be a string or another MdList.
+            items (Union[Iterable, Mapping]): Items of the list. A list (or generator) following an
+                item holds its nested items. In a mapping, every key is an item, and its value holds
+                its nested items if it is a mapping or a list, is shown after the key otherwise, or
+                is None. Generators are consumed when the list is rendered.
             That's a [A:bold] statement (bool, optional): If True, the list will be numbered. Otherwise, it will be bulleted. Defaults to True.
             depth (int, optional): Current depth of the list. Defaults to 0.
             indent (int, optional): indent size of the list. Defaults to 4.
+            sequential (bool, optional): If True, numbered items are numbered sequentially
+                within every (nested) list. Otherwise, every item is numbered 1. Defaults to False.
+            children (Optional[Callable[[Any], Optional[Iterable[Any]]]], optional): Function
+                returning the children of an item (or None), called only when the item is
+                rendered. Trees can then be rendered without being converted to nested lists.
+            max_depth (Optional[int], optional): Number of nested levels rendered below the
+                top level. Deeper items are neither rendered nor expanded. Defaults to None.
+            max_items (Optional[int], optional): Number of items rendered. If more items
+                follow, an ``...`` item is rendered instead and the rest is not expanded.
+                Defaults to None.
 
         """
         self.items = items
         self.numbered = numbered
         self.depth = depth
         self.indent = indent
+        self.sequential = sequential
+        self.children = children
+        self.max_depth = max_depth
+        self.max_items = max_items
+
+    def _children(self) -> Iterator[MdElement]:
+        # Iterators are left alone, as walking them would consume the items
+        stack: list[Any] = [self.items]
+        while stack:
+            items = stack.pop()
+            if isinstance(items, Mapping):
+                items = [*items.keys(), *items.values()]
+            elif not isinstance(items, list):
+                continue
+            for item in items:
+                if isinstance(item, MdElement):
+                    yield item
+                elif isinstance(item, (list, Mapping)):
+                    stack.append(item)
+
+    def _iter_items(
+        self, items: ListItems, depth: int, start: int = 1
+    ) -> Iterator[str]:
+        """Render the given items line by line, with an explicit stack of nested lists.
 
-    def _process_items(self, items: list[Union[str, "MdList"]], depth: int) -> str:
+        Lines are yielded as they are rendered, so nested lists are neither
+        joined per level nor limited by the recursion limit. Mappings, generators
+        and the children of nodes are only expanded when their lines are reached.
+
+        Args:
+            items (ListItems): Items to be processed.
+            depth (int): Depth of the items.
+            start (int, optional): Number of the first item of a sequentially
+                numbered list. Defaults to 1.
+
+        Yields:
+            str: Formatted markdown line of every item.
+        """
+        sequential = self.numbered and self.sequential
+        marker = "" if sequential else ("1. " if self.numbered else "- ")
+        # Line prefix of every depth, computed once per depth
+        prefixes: list[str] = []
+
+        # One (items, depth, next number, whether items is a mapping) entry per
+        # list being rendered
+        stack: list[_Frame] = [_frame(items, depth, start)]
+        children, max_depth, max_items = self.children, self.max_depth, self.max_items
+        count = 0
+        while stack:
+            iterator, level, number, is_mapping = stack[-1]
+            expand = max_depth is None or level - depth < max_depth
+            expand_children = children is not None and expand
+            offset = level - depth
+            while len(prefixes) <= offset:
+                prefixes.append(" " * self.indent * (depth + len(prefixes)) + marker)
+            prefix = prefixes[offset]
+
+            for item in iterator:
+                nested: Optional[ListItems] = None
+                if is_mapping:
+                    key, value = item
+                    if value is None or _is_nested(value):
+                        item, nested = key, value
+                    else:
+                        item = f"{key}: {value}"
+                elif type(item) is not str and _is_nested(item):
+                    # A nested list holds the children of the previous item
+                    if expand:
+                        stack[-1] = (iterator, level, number, is_mapping)
+                        stack.append(_frame(item, level + 1, 1))
+                        break
+                    continue
+                elif expand_children:
+                    nested = children(item)  # type: ignore[misc]
+
+                if max_items is not None and count >= max_items:
+                    yield f"{prefix}{f'{number}. ' if sequential else ''}..."
+                    return
+                count += 1
+                if sequential:
+                    item_prefix = f"{prefix}{number}. "
+                    number += 1
+                else:
+                    item_prefix = prefix
+                if type(item) is not str and isinstance(item, MdElement):
+                    yield _render_element(item, item_prefix)
+                else:
+                    yield f"{item_prefix}{item}"
+
+                if nested is not None and expand:
+                    stack[-1] = (iterator, level, number, is_mapping)
+                    stack.append(_frame(nested, level + 1, 1))
+                    break
+            else:
+                stack.pop()
+
+    def _process_items(self, items: ListItems, depth: int, start: int = 1) -> str:
         """Process the given list of items and convert them to a markdown string.
 
         Args:
-            items (list[Union[str, MdList]]): List of items to be processed.
+            items (ListItems): Items to be processed.
             depth (int): Current depth of the list.
+            start (int, optional): Number of the first item of a sequentially
+                numbered list. Defaults to 1.
 
         Returns:
             str: Formatted markdown string.
         """
-        return "\n".join(f"{self._process_item(item, depth)}" for item in items)
+        return "\n".join(self._iter_items(items, depth, start))
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yields the lines of the list in Markdown format, one at a time.
+
+        Yields:
+            str: Formatted markdown line of every item.
+        """
+        return self._iter_items(self.items, self.depth)
 
-    def _process_item(self, item: Union[str, "MdList"], depth: int) -> str:
-        """Process an individual item. If the item is a list, process it recursively.
+    @cached_render_into
+    def render_into(self, write: Write) -> None:
+        """Pushes the list into ``write``, rendering it line by line.
 
         Args:
-            item (Union[str, MdList]): The item to be processed.
-            depth (int): Current depth of the list.
+            write (Callable[[str], Any]): Called with every fragment, in order.
+        """
+        lines = self.iter_lines()
+        first = next(lines, None)
+        if first is None:
+            return
+        write(first)
+        # Lines are joined per chunk, so wrapping sinks get few large fragments
+        while True:
+            chunk = list(islice(lines, CHUNK_SIZE))
+            if not chunk:
+                return
+            write("\n" + "\n".join(chunk))
+
+    def preview(self, head: int = 10, tail: int = 10) -> str:
+        """Returns the first and last items of the list, with an item telling how many
+        items were left out in between.
+
+        Every top-level item is shown or left out with its nested items. Only
+        the items shown are rendered. Lists given as generators are consumed.
+
+        Args:
+            head (int, optional): Number of first top-level items to show. Defaults to 10.
+            tail (int, optional): Number of last top-level items to show. Defaults to 10.
 
         Returns:
-            str: Formatted markdown string for the item.
+            str: Formatted markdown string for the preview of the list.
+
+        Examples:
+            >>> print(MdList([f"item {i}" for i in range(100)]).preview(head=2, tail=1))
+            - item 0
+            - item 1
+            - ... (97 items omitted)
+            - item 99
         """
-        if isinstance(item, list):
-            # If the item is a list, process it recursively with one deeper level
-            return self._process_items(item, depth + 1)
+        if isinstance(self.items, Mapping):
+            groups: Iterator[list[Any]] = ([pair] for pair in self.items.items())
+        else:
+            groups = _groups(self.items)
+        shown = list(islice(groups, head))
+        last: Deque[list[Any]] = deque(maxlen=tail)
+        omitted = 0
+        for group in groups:
+            if len(last) == tail:
+                omitted += 1
+            last.append(group)
+
+        if not omitted:
+            return self._process_items(self._join(shown + list(last)), self.depth)
 
-        prefix = " " * self.indent * depth
+        prefix = " " * self.indent * self.depth
         marker = "1." if self.numbered else "-"
-        return f"{prefix}{marker} {item}"
+        if self.numbered and self.sequential:
+            marker = f"{head + 1}."
+        noun = "item" if omitted == 1 else "items"
+        parts = []
+        if shown:
+            parts.append(self._process_items(self._join(shown), self.depth))
+        parts.append(f"{prefix}{marker} ... ({omitted} {noun} omitted)")
+        if last:
+            start = head + omitted + 1
+            parts.append(self._process_items(self._join(last), self.depth, start))
+        return "\n".join(parts)
+
+    def _join(self, groups: Iterable[list[Any]]) -> ListItems:
+        """Joins groups of items, see :func:`_groups`, into items of the list."""
+        items = [item for group in groups for item in group]
+        return dict(items) if isinstance(self.items, Mapping) else items
+
+    def _repr_markdown_(self) -> str:
+        """Returns the markdown shown by Jupyter: a preview of the first and last items."""
+        return self.preview()
 
+    @cached_str
     def __str__(self) -> str:
         """Returns a string representation of the list in Markdown format.
 
         Returns:
             str: Formatted markdown string for the entire list.
         """
-        return self._process_items(self.items, self.depth)
+        return "\n".join(self.iter_lines())
@@ -1,6 +1,8 @@
-from typing import Union
+from typing import Iterable, Union
 
-from ._base import MdElement
+from ._base import MdElement, Write
+from ._render_cache import cached_render_into, cached_str
+from ._stream import LinePrefixWriter
 
 
 class MdQuote(MdElement):
@@ -20,8 +22,13 @@ class MdQuote(MdElement):
         >>> print(quote)
         > This is a quote.
         > This is another line.
+        >>>
+        >>> print(MdQuote(MdQuote("Nested quote.")))
+        > > Nested quote.
     """
 
+    __slots__ = ("content",)
+
     def __init__(self, content: Union[str, MdElement]) -> None:
         """Initializes an instance of the MdQuote class to represent a Markdown blockquote.
 
@@ -30,20 +37,28 @@ class MdQuote(MdElement):
         """
         self.content = content
 
+    def _children(self) -> Iterable[MdElement]:
+        return (self.content,) if isinstance(self.content, MdElement) else ()
+
+    @cached_render_into
+    def render_into(self, write: Write) -> None:
+        """Pushes the blockquote into ``write``, prefixing lines as the content streams.
+
+        Args:
+            write (Callable[[str], Any]): Called with every fragment, in order.
+        """
+        writer = LinePrefixWriter(write, "> ")
+        if isinstance(self.content, MdElement):
+            self.content.render_into(writer.write)
+        elif self.content is not None:
+            writer.write(self.content)
+        writer.finish()
+
+    @cached_str
     def __str__(self) -> str:
         """Returns a string representation of the blockquote in Markdown format.
 
         Returns:
             str: String representation of the blockquote.
         """
-        # Convert the content to string if it's an instance of MdElement
-        content_str = (
-            str(self.content) if isinstance(self.content, MdElement) else self.content
-        )
-        content_str = "" if content_str is None else content_str
-
-        # Ensure content is not None
-        lines = [""] if len(content_str) <= 0 else content_str.splitlines()
-
-        # Create a blockquote by prefixing each line with '>'
-        return "\n".join([f"> {line}" for line in lines])
+        return self._render_str()
@@ -1,7 +1,41 @@
+import copy
+import warnings
+from collections import deque
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Union, Iterable, Tuple
-
-from ._base import MdElement
+from itertools import chain, islice, repeat
+from operator import add, itemgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    Optional,
+    Union,
+    Iterable,
+    Tuple,
+    overload,
+)
+
+from ._base import MdElement, Write
+from ._render_cache import cached_render_into, cached_str
+from ._table_groups import GroupKey, group_rows
+from ._table_parallel import render_rows_parallel
+from ._table_format import ColumnFormat, ColumnFormatter, compile_column_formatter
+from ._table_schema import _FILL, CHUNK_SIZE, RowExtractor
+from .header import MdHeader
+from ._table_sources import (
+    Batch,
+    CsvSource,
+    CursorSource,
+    JsonLinesSource,
+    RowSource,
+    TextSource,
+    dict_batches,
+    project_batches,
+    slice_batches,
+    sort_batches,
+)
 
 
 @dataclass
@@ -24,13 +58,22 @@ class TableData:
         data: list[Dict[str, Any]],
         header: Optional[list[str]] = None,
         row_labels: Optional[list[str]] = None,
+        flatten: bool = False,
+        columns: Optional[list[Any]] = None,
     ) -> "TableData":
         """Create TableData from a list of dictionaries.
 
+        Columns are the union of the keys of all rows, in first-seen order.
+        Cells of keys missing from a row are left empty.
+
         Args:
             data (list[dict[str, Any]]): List of dictionaries to convert to table data
             header (Optional[list[str]], optional): Custom header labels. Defaults to None.
             row_labels (Optional[list[str]], optional): Custom row labels. Defaults to None.
+            flatten (bool, optional): If True, nested dictionaries are flattened into
+                dotted keys. Defaults to False.
+            columns (Optional[list[Any]], optional): Keys of the only columns to extract,
+                in order. Defaults to None (all keys).
 
         Returns:
             TableData: Converted table data
@@ -38,18 +81,19 @@ class TableData:
         if not data:
             return cls(header=[], row_labels=[], values=[])
 
+        # Extract values along the key paths of each row layout, batch by batch
+        extractor = RowExtractor(flatten=flatten, columns=columns)
+        values: list[Tuple] = []
+        for start in range(0, len(data), CHUNK_SIZE):
+            values.extend(extractor.extract_many(data[start : start + CHUNK_SIZE]))
+
+        # Rows extracted before a later row introduced new keys are shorter
+        if min(map(len, values)) < len(extractor.columns):
+            values = list(map(extractor.pad, values))
+
         # Get header from data if not provided
         if header is None:
-            header = list(data[0].keys())
-
-        # Extract values using the header order
-        values = []
-        for row in data:
-            row_values = []
-            for key in data[0].keys():  # Use original keys to maintain order
-                value = row.get(key, "")
-                row_values.append(value)
-            values.append(row_values)
+            header = extractor.columns
 
         # Use provided row_labels or empty list
         row_labels = row_labels or []
@@ -59,14 +103,25 @@ class TableData:
     def transpose(self) -> "TableData":
         """Create a transposed version of the table data.
 
+        The transposed values are a view on the original values, no copy is made.
+
+        .. deprecated:: 0.9.0
+            MdTable renders from batches of columns and no longer uses this;
+            pass ``transpose=True`` to :class:`MdTable` instead.
+
         Returns:
             TableData: Transposed table data
         """
+        warnings.warn(
+            "TableData.transpose is deprecated and will be removed, "
+            "use MdTable(..., transpose=True) instead",
+            DeprecationWarning,
+            stacklevel=2,
+        )
         if not self.values:
             return TableData(header=[], row_labels=[], values=[])
 
-        # Get original keys and values
-        transposed_values = list(zip(*self.values))  # We only have one row in this case
+        transposed_values = _TransposedValues(self.values)
 
         return TableData(
             header=self.row_labels
@@ -76,15 +131,99 @@ class TableData:
         )
 
 
+class _TransposedValues(Sequence):
+    """Read-only transposed view on a 2D array of values.
+
+    Only the row being read is materialized, so iterating over the view costs
+    one row of memory instead of a full transposed copy.
+    """
+
+    def __init__(self, values: Iterable[Union[list[Any], Tuple]]) -> None:
+        self._values = values if isinstance(values, Sequence) else list(values)
+        # Like zip(), the view is as long as the shortest row
+        self._length = min(map(len, self._values), default=0)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> Tuple: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Tuple]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Tuple, list[Tuple]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("transposed row index out of range")
+        return tuple(map(itemgetter(index), self._values))
+
+
+def _call(func: Callable[[Any], Any], arg: Any) -> Any:
+    return func(arg)
+
+
+def _slice_rows(
+    columns: Sequence[Sequence[Any]], start: int, stop: int
+) -> list[Tuple[Any, ...]]:
+    """Read rows ``start`` to ``stop`` of a batch of columns."""
+    if not columns:
+        return [()] * max(0, stop - start)
+    return list(zip(*(column[start:stop] for column in columns)))
+
+
+def _read_columns(columns: Optional[list[Any]], sort_by: Any) -> Optional[list[Any]]:
+    """Returns the columns to read: the selected ones and the column to sort by.
+
+    The selected ``columns`` themselves are returned when they hold the column
+    to sort by, so a result that is not ``columns`` has to be projected back
+    onto them once sorted.
+    """
+    if columns is None or sort_by is None or sort_by in columns:
+        return columns
+    return columns + [sort_by]
+
+
+def _source_columns(
+    columns: Optional[list[str]], kwargs: Dict[str, Any]
+) -> Tuple[Optional[list[str]], Dict[str, Any]]:
+    """Returns the columns to read from a source and the arguments of its table.
+
+    When the column to sort by is not selected, the table is also given
+    ``columns``, to drop the sort column once sorted. ``kwargs`` is not modified.
+    """
+    read = _read_columns(columns, kwargs.get("sort_by"))
+    if read is not columns:
+        kwargs = {**kwargs, "columns": columns}
+    return read, kwargs
+
+
+def _format_row(cells: Iterable[str]) -> str:
+    """Format the cells of one row as a markdown table row."""
+    return "| " + " | ".join(cells) + " |"
+
+
 class MdTable(MdElement):
     """Converter for dict or list to markdown table.
 
     Args:
-        data (dict or list): The data to convert.
+        data (dict or iterable): The data to convert. Lists are rendered with the union of the keys
+            of all rows; other iterables, such as generators, are streamed with the columns of
+            their first rows.
         header (list[str], optional): Custom header labels. If not provided, dictionary keys will be used.
         row_labels (list[str], optional): Custom row labels. If not provided, no row labels will be shown.
         transpose (bool, optional): If True, transpose the table. Defaults to False.
         precision (Optional[int]): Number of decimal places for floats. If None, values are not formatted.
+        formats (dict, optional): Per-column format specifications or callables, keyed by column.
+        workers (Optional[int]): Number of processes rendering the rows in parallel.
+        sort_by (optional): Key of the column to sort the rows by.
+        descending (bool, optional): If True, sort in descending order. Defaults to False.
+        limit (Optional[int]): Maximum number of rows to show.
+        offset (int, optional): Number of (sorted) rows to skip. Defaults to 0.
+        columns (list, optional): Keys of the columns to show, nested keys as dotted paths.
 
     Examples:
         >>> data = {
@@ -120,111 +259,337 @@ class MdTable(MdElement):
         | --- | --- | --- |
         | Name | John Doe | Jane Doe |
         | Age | 30 | 25 |
+        >>> # Per-column formats
+        >>> data = [{"Item": "Laptop", "Sales": 1234567.891, "Growth": 0.153}]
+        >>> print(MdTable(data, formats={"Sales": ",.2f", "Growth": ".1%"}))
+        | Item | Sales | Growth |
+        | --- | --- | --- |
+        | Laptop | 1,234,567.89 | 15.3% |
+        >>> # Selected columns of nested records
+        >>> data = [{"id": 1, "user": {"name": "Ann", "address": {"city": "Oslo"}}}]
+        >>> print(MdTable(data, columns=["user.address.city", "id"]))
+        | user.address.city | id |
+        | --- | --- |
+        | Oslo | 1 |
+        >>> # Top rows of a generator
+        >>> rows = ({"n": n, "square": n * n} for n in range(-5, 5))
+        >>> print(MdTable(rows, sort_by="square", descending=True, limit=2))
+        | n | square |
+        | --- | --- |
+        | -5 | 25 |
+        | -4 | 16 |
+        >>> # Streamed from a CSV file
+        >>> import io
+        >>> csv_file = io.StringIO("name,price\\nPen,1.5\\nBook,12.25\\n")
+        >>> print(MdTable.from_csv(csv_file, types={"price": float}, precision=1))
+        | name | price |
+        | --- | --- |
+        | Pen | 1.5 |
+        | Book | 12.2 |
     """
 
+    __slots__ = (
+        "data",
+        "header",
+        "row_labels",
+        "transpose",
+        "precision",
+        "formats",
+        "workers",
+        "sort_by",
+        "descending",
+        "limit",
+        "offset",
+        "columns",
+    )
+
     def __init__(
         self,
-        data: Union[Dict[str, Any], list[Dict[str, Any]]],
+        data: Union[Dict[str, Any], Iterable[Dict[str, Any]]],
         header: Optional[list[str]] = None,
         row_labels: Optional[list[str]] = None,
         transpose: bool = False,
         precision: Union[None, int] = None,
+        formats: Optional[Dict[Any, ColumnFormat]] = None,
+        workers: Optional[int] = None,
+        sort_by: Optional[Any] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        columns: Optional[list[Any]] = None,
     ):
         """Initialize a MdTable instance.
 
         Args:
-            data (Union[Dict[str, Any], list[Dict[str, Any]]]): The data to convert.
+            data (Union[Dict[str, Any], Iterable[Dict[str, Any]]]): The data to convert.
+                Iterables other than lists are read and rendered in batches; the columns
+                are then those found in the first batch of rows.
             header (list[str], optional): Custom header labels. If not provided, dictionary keys will be used.
             row_labels (list[str], optional): Custom row labels. If not provided, no row labels will be shown.
-            transpose (bool, optional): If True, transpose the table. Defaults to False.
+            transpose (bool, optional): If True, transpose the table. Every row of a
+                transposed table holds a value of every data row, so the data is read whole,
+                streamed sources included, before the first row is written. Defaults to False.
             precision (Optional[int]): Number of decimal places for floats. If None, values are not formatted.
+            formats (Dict[Any, ColumnFormat], optional): Per-column formats, keyed by the
+                (flattened) column key. A format is either a format specification such as
+                ``",.2f"``, ``".1%"`` or ``"%Y-%m-%d"``, or a callable returning the cell string.
+                Columns without a format fall back to ``precision``.
+            workers (Optional[int]): If greater than 1, the rows of a non-transposed table are
+                rendered in chunks by this many worker processes, with numeric columns passed
+                through shared memory. Formats must then be picklable. Defaults to None (serial).
+            sort_by (Optional[Any]): Key of the (flattened) column to sort the rows by. Rows
+                without a value in the column are placed last, ties keep their order. Other
+                values must be comparable, or rendering raises a ValueError naming the column.
+            descending (bool, optional): If True, sort in descending order. Defaults to False.
+            limit (Optional[int]): Maximum number of rows to show. When sorting, only the top
+                ``offset + limit`` rows are kept in a bounded heap while the data is read;
+                otherwise a streamed source is not read past the last row shown.
+            offset (int, optional): Number of (sorted) rows to skip. Defaults to 0.
+                Row labels apply to the rows shown.
+            columns (Optional[list[Any]]): Keys of the columns to show, in order, with nested
+                keys given as dotted paths such as ``"user.address.city"``. Only these keys are
+                read from the rows: nested dictionaries that do not lead to one of them are
+                never walked. Keys missing from a row are left empty.
         """
         if isinstance(data, dict):
             data = [data]
-        elif not isinstance(data, list):
+        elif isinstance(data, (str, bytes)) or not isinstance(data, Iterable):
             raise ValueError(
                 "Provided data is not a dictionary or list of dictionaries"
             )
 
-        self.data = self._flatten_data(data)
+        self.data = data
         self.header = header
         self.row_labels = row_labels
         self.transpose = transpose
         self.precision = precision
+        self.formats = formats
+        self.workers = workers
+        self.sort_by = sort_by
+        self.descending = descending
+        self.limit = limit
+        self.offset = offset
+        self.columns = columns
+
+    def _children(self) -> Iterator[MdElement]:
+        # Streamed sources and iterators are left alone, as walking them would
+        # consume the rows
+        stack: list[Any] = [self.data, self.header, self.row_labels]
+        while stack:
+            values = stack.pop()
+            if isinstance(values, dict):
+                values = values.values()
+            elif not isinstance(values, (list, tuple)):
+                continue
+            for value in values:
+                if isinstance(value, MdElement):
+                    yield value
+                elif isinstance(value, (dict, list, tuple)):
+                    stack.append(value)
 
-    def _flatten_data(self, data: list[Dict[str, Any]]) -> list[Dict[str, Any]]:
-        """Flatten nested dictionaries in the data.
+    @classmethod
+    def from_csv(
+        cls,
+        source: TextSource,
+        delimiter: str = ",",
+        columns: Optional[list[str]] = None,
+        types: Optional[Dict[str, Callable[[str], Any]]] = None,
+        limit: Optional[int] = None,
+        encoding: str = "utf-8",
+        **kwargs: Any,
+    ) -> "MdTable":
+        """Create a table streamed from a CSV (or TSV) file.
+
+        The file is read in batches of rows while the table is written, so it is
+        never loaded into memory as a whole. Its first line holds the column names.
 
         Args:
-            data (list[Dict[str, Any]]): The data to flatten.
+            source (Union[str, PathLike, TextIO]): Path or open text file to read. An open
+                file can only be rendered once.
+            delimiter (str, optional): Field delimiter, ``"\\t"`` for TSV. Defaults to ``","``.
+            columns (Optional[list[str]]): Names of the columns to keep, in order.
+            types (Optional[Dict[str, Callable[[str], Any]]]): Functions converting the values
+                of columns, e.g. ``{"price": float}`` to apply ``precision``. Values a function
+                rejects, such as empty cells, are kept as-is.
+            limit (Optional[int]): Maximum number of rows to read.
+            encoding (str, optional): Encoding of the file. Defaults to ``"utf-8"``.
+            **kwargs: Other arguments of :class:`MdTable`, e.g. ``precision`` or ``formats``.
 
         Returns:
-            list[Dict[str, Any]]: Flattened data
+            MdTable: The table.
         """
-        flattened_data = []
-        for entry in data:
-            flattened_data.append(self._flatten_dict(entry))
-        return flattened_data
+        columns, kwargs = _source_columns(columns, kwargs)
+        return cls(
+            CsvSource(source, delimiter, columns, types, limit, encoding), **kwargs
+        )
 
-    def _flatten_dict(
-        self, d: Dict, parent_key: str = "", sep: str = "."
-    ) -> Dict[str, Any]:
-        """Recursively flatten a nested dictionary.
+    @classmethod
+    def from_jsonl(
+        cls,
+        source: TextSource,
+        columns: Optional[list[str]] = None,
+        types: Optional[Dict[str, Callable[[Any], Any]]] = None,
+        limit: Optional[int] = None,
+        encoding: str = "utf-8",
+        **kwargs: Any,
+    ) -> "MdTable":
+        """Create a table streamed from a JSON Lines file.
+
+        Every line holds one JSON object, nested objects are flattened into dotted
+        column keys. The file is read in batches of rows while the table is written.
 
         Args:
-            d (Dict): Dictionary to flatten.
-            parent_key (str, optional): Key from parent dictionary. Defaults to ''.
-            sep (str, optional): Separator to use between keys. Defaults to '.'.
+            source (Union[str, PathLike, TextIO]): Path or open text file to read. An open
+                file can only be rendered once.
+            columns (Optional[list[str]]): Keys of the columns to keep, in order. Keys missing
+                from a row are left empty.
+            types (Optional[Dict[str, Callable[[Any], Any]]]): Functions converting the values
+                of columns. Values a function rejects are kept as-is.
+            limit (Optional[int]): Maximum number of rows to read.
+            encoding (str, optional): Encoding of the file. Defaults to ``"utf-8"``.
+            **kwargs: Other arguments of :class:`MdTable`, e.g. ``precision`` or ``formats``.
 
         Returns:
-            Dict: Flattened dictionary.
+            MdTable: The table.
         """
-        items = {}
-        for k, v in d.items():
-            new_key = f"{parent_key}{sep}{k}" if parent_key else k
-            if isinstance(v, dict):
-                items.update(self._flatten_dict(v, new_key, sep=sep))
-            else:
-                items[new_key] = v
-        return items
+        columns, kwargs = _source_columns(columns, kwargs)
+        return cls(JsonLinesSource(source, columns, types, limit, encoding), **kwargs)
 
-    def _value_to_string(self, value: Any) -> str:
-        """Convert the given value to a string. If it's a floating point number,
-        it will be formatted according to the precision attribute.
+    @classmethod
+    def from_cursor(
+        cls,
+        cursor: Any,
+        batch_size: int = CHUNK_SIZE,
+        columns: Optional[list[str]] = None,
+        types: Optional[Dict[str, Callable[[Any], Any]]] = None,
+        limit: Optional[int] = None,
+        **kwargs: Any,
+    ) -> "MdTable":
+        """Create a table streamed from a DB-API 2.0 cursor, e.g. of :mod:`sqlite3`.
+
+        The header is read from ``cursor.description`` and rows are pulled with
+        ``cursor.fetchmany(batch_size)`` while the table is written, so the result
+        set is never held in memory as a whole. The cursor can only be rendered once.
 
         Args:
-            value (Any): The value to be converted.
+            cursor (Any): Cursor on which a query was executed.
+            batch_size (int, optional): Number of rows fetched at once. Defaults to 1024.
+            columns (Optional[list[str]]): Names of the columns to keep, in order.
+            types (Optional[Dict[str, Callable[[Any], Any]]]): Functions converting the values
+                of columns, e.g. ``{"price": float}`` for a ``DECIMAL`` column. Values a
+                function rejects are kept as-is.
+            limit (Optional[int]): Maximum number of rows to fetch.
+            **kwargs: Other arguments of :class:`MdTable`, e.g. ``precision`` or ``formats``.
 
         Returns:
-            str: The string representation of the value.
+            MdTable: The table.
+
+        Examples:
+            >>> import sqlite3
+            >>> connection = sqlite3.connect(":memory:")
+            >>> cursor = connection.execute("SELECT 'Pen' AS item, 1.5 AS price")
+            >>> print(MdTable.from_cursor(cursor, precision=2))
+            | item | price |
+            | --- | --- |
+            | Pen | 1.50 |
         """
-        if isinstance(value, float) and self.precision is not None:
-            return f"{value:.{self.precision}f}"
-        return str(value)
+        columns, kwargs = _source_columns(columns, kwargs)
+        return cls(CursorSource(cursor, batch_size, columns, types, limit), **kwargs)
 
-    def _build_markdown_table(self, table_data: TableData) -> str:
-        """Build markdown table from TableData.
+    def group_by(
+        self,
+        key: GroupKey,
+        level: int = 2,
+        spill: bool = False,
+        buffer_size: int = CHUNK_SIZE,
+    ) -> list[MdElement]:
+        """Split the table into one subtable per group of rows, in a single pass.
+
+        Rows are hashed into groups while the data is read once, so streamed data
+        can be grouped too. Every subtable keeps the options of this table (e.g.
+        ``formats``, ``columns``, or ``sort_by`` and ``limit``, which then apply
+        per group), except for the row labels.
 
         Args:
-            table_data (TableData): The table data to convert to markdown
+            key (Any): Flattened key (e.g. ``"team.region"``) of the column to group by,
+                or a callable returning the group of a row.
+            level (int, optional): Level of the header of every group. Defaults to 2.
+            spill (bool, optional): If True, rows of a group beyond ``buffer_size`` are
+                spilled to a temporary file, so memory does not grow with the data.
+                Defaults to False.
+            buffer_size (int, optional): Number of rows buffered in memory per group
+                when spilling. Defaults to 1024.
 
         Returns:
-            str: Markdown formatted table
+            list[MdElement]: A header and a table for every group, in order of first
+            appearance, ready to be written with :class:`~mdfy.Mdfier`.
+
+        Examples:
+            >>> data = [
+            ...     {"region": "EU", "name": "Ann", "sales": 3},
+            ...     {"region": "US", "name": "Bob", "sales": 5},
+            ...     {"region": "EU", "name": "Eve", "sales": 8},
+            ... ]
+            >>> for element in MdTable(data, columns=["name", "sales"]).group_by("region"):
+            ...     print(element)
+            ## EU
+            | name | sales |
+            | --- | --- |
+            | Ann | 3 |
+            | Eve | 8 |
+            ## US
+            | name | sales |
+            | --- | --- |
+            | Bob | 5 |
         """
-        if not table_data.values:
-            return ""
+        elements: list[MdElement] = []
+        for value, rows in group_rows(self.data, key, spill, buffer_size).items():
+            table = copy.copy(self)
+            table.data = rows
+            table.row_labels = None
+            elements.extend([MdHeader(str(value), level), table])
+        return elements
+
+    def _column_formatters(self, keys: list[Any]) -> list[ColumnFormatter]:
+        """Compile the formatter of every column.
+
+        Args:
+            keys (list[Any]): Keys of the columns, in order.
+
+        Returns:
+            list[ColumnFormatter]: One formatter per column.
+        """
+        formats = self.formats or {}
+        default = compile_column_formatter(precision=self.precision)
+        return [
+            (
+                compile_column_formatter(formats[key], self.precision)
+                if key in formats
+                else default
+            )
+            for key in keys
+        ]
 
-        has_row_labels = bool(table_data.row_labels)
-        num_columns = len(next(iter(table_data.values)))
+    def _build_header_rows(
+        self, header: Optional[list[Any]], has_row_labels: bool, num_columns: int
+    ) -> list[str]:
+        """Build the header and separator rows of a markdown table.
+
+        Args:
+            header (Optional[list[Any]]): Header labels
+            has_row_labels (bool): Whether the table has a row label column
+            num_columns (int): Number of value columns
 
-        # Build header row
-        header_parts = []
+        Returns:
+            list[str]: The header row (if any) followed by the separator row
+        """
+        header_parts: list[Any] = []
         if has_row_labels:
             # Empty cell for row label column
             header_parts.append("")
 
-        if table_data.header:
-            header_parts.extend(table_data.header)
+        if header:
+            header_parts.extend(header)
 
         # Format header row with correct spacing
         header_cells = []
@@ -234,57 +599,383 @@ class MdTable(MdElement):
             else:
                 # Single space for empty cells
                 header_cells.append(" ")
-        header_row = "|" + "|".join(header_cells) + "|" if header_parts else None
+
+        rows = []
+        if header_parts:
+            rows.append("|" + "|".join(header_cells) + "|")
 
         # Build separator row
         if has_row_labels:
             num_columns += 1
-        separator_row = "|" + "|".join([" --- "] * num_columns) + "|"
-
-        # Build value rows
-        value_rows = []
-        for i, row in enumerate(table_data.values):
-            row_parts = []
-            if has_row_labels and i < len(table_data.row_labels):
-                row_parts.append(table_data.row_labels[i])
-            row_parts.extend(self._value_to_string(val) for val in row)
-            value_rows.append("| " + " | ".join(row_parts) + " |")
-
-        # Combine all parts
-        table_parts = []
-        if header_row:
-            table_parts.append(header_row)
-        table_parts.append(separator_row)
-        table_parts.extend(value_rows)
+        rows.append("|" + "|".join([" --- "] * num_columns) + "|")
+        return rows
 
-        return "\n".join(table_parts)
+    def _build_value_rows(
+        self, rows: Iterable[Tuple[str, ...]], row_labels: list[Any]
+    ) -> list[str]:
+        """Build the value rows of a markdown table.
 
-    def _to_md_table(self) -> str:
-        """Convert the data to a Markdown formatted table.
+        Args:
+            rows (Iterable[Tuple[str, ...]]): Rows of formatted cells
+            row_labels (list[Any]): Labels prepended to the first rows
+
+        Returns:
+            list[str]: Markdown formatted rows
+        """
+        if row_labels:
+            rows = list(rows)
+            labelled = min(len(row_labels), len(rows))
+            rows[:labelled] = map(add, zip(row_labels), rows[:labelled])
+        return list(map(_format_row, rows))
+
+    def _iter_batches(self) -> Iterator[Batch]:
+        """Iterate over the rows to show as batches of columns."""
+        # Read the column to sort by too, and drop it once sorted
+        columns = _read_columns(self.columns, self.sort_by)
+
+        if isinstance(self.data, RowSource):
+            batches = self.data.iter_batches()
+            if columns is not None:
+                batches = project_batches(batches, columns)
+        else:
+            batches = dict_batches(self.data, RowExtractor(columns=columns))
+
+        if self.sort_by is not None:
+            batches = sort_batches(
+                batches, self.sort_by, self.descending, self.offset, self.limit
+            )
+            if columns is not self.columns:
+                batches = project_batches(batches, self.columns)
+            return batches
+        if self.offset or self.limit is not None:
+            return slice_batches(batches, self.offset, self.limit)
+        return batches
+
+    def _build_batch_rows(
+        self,
+        formatters: list[ColumnFormatter],
+        columns: Sequence[Sequence[Any]],
+        num_rows: int,
+        row_labels: list[Any],
+    ) -> list[str]:
+        """Format a batch of columns into markdown rows.
 
         Args:
-            transpose (bool, optional): If True, transpose the table. Defaults to False.
-            precision (Union[None, int], optional): The precision for floating point numbers.
+            formatters (list[ColumnFormatter]): Formatter of every column
+            columns (Sequence[Sequence[Any]]): Values of the batch, column by column
+            num_rows (int): Number of rows in the batch
+            row_labels (list[Any]): Labels prepended to the first rows
 
         Returns:
-            str: Markdown formatted table.
+            list[str]: Markdown formatted rows
+        """
+        # Format column by column, then read the cells back row by row
+        cells = [
+            format_column(column) for format_column, column in zip(formatters, columns)
+        ]
+        return self._build_value_rows(
+            zip(*cells) if cells else repeat((), num_rows), row_labels
+        )
+
+    def _collect_columns(self) -> Tuple[list[Any], list[list[Any]], int]:
+        """Extract the full columns of the data.
+
+        Returns:
+            Tuple[list[Any], list[list[Any]], int]: The column keys, one list of values
+            per column, padded with empty cells where a row lacks the column, and the
+            number of rows.
+        """
+        keys: list[Any] = []
+        columns: list[list[Any]] = []
+        num_rows = 0
+        for keys, batch, size in self._iter_batches():
+            # Columns that appeared in this batch are empty for earlier rows
+            columns.extend([_FILL] * num_rows for _ in range(len(batch) - len(columns)))
+            for column, values in zip(columns, batch):
+                column.extend(values)
+            for column in columns[len(batch) :]:
+                column.extend([_FILL] * size)
+            num_rows += size
+        return list(keys[: len(columns)]), columns, num_rows
+
+    def _build_rows_in_chunks(self) -> Tuple[list[Any], list[str]]:
+        """Flatten, extract and format the rows in a single pass.
+
+        Rows are extracted batch by batch and turned into markdown rows right
+        away, so no flattened copy of the whole data is ever held.
+
+        Returns:
+            Tuple[list[Any], list[str]]: The column keys and the markdown rows
+        """
+        row_labels = self.row_labels or []
+        rows: list[str] = []
+        keys: list[Any] = []
+        # (first row, number of rows, number of columns) of every batch, to pad
+        # rows of batches extracted before later rows introduced new columns
+        batches: list[Tuple[int, int, int]] = []
+
+        formatters: list[ColumnFormatter] = []
+
+        for keys, columns, size in self._iter_batches():
+            if len(formatters) < len(columns):
+                formatters.extend(
+                    self._column_formatters(keys[len(formatters) : len(columns)])
+                )
+            start = len(rows)
+            rows.extend(
+                self._build_batch_rows(
+                    formatters, columns, size, row_labels[start : start + size]
+                )
+            )
+            batches.append((start, size, len(columns)))
+
+        num_columns = len(keys)
+        for start, size, batch_columns in batches:
+            if batch_columns < num_columns:
+                padding = "  |" * (num_columns - batch_columns)
+                rows[start : start + size] = [
+                    row + padding for row in rows[start : start + size]
+                ]
+
+        return list(keys), rows
+
+    def _iter_streamed_rows(self) -> Iterator[str]:
+        """Render the rows of a streamed source batch by batch.
+
+        The header is written before the rest of the source is read, so the
+        columns are those found in the first batch of rows.
+
+        Yields:
+            str: The header rows, then the markdown rows
         """
+        batches = self._iter_batches()
+        first = next(batches, None)
+        if first is None:
+            return
+
+        keys, columns, _ = first
+        num_columns = len(columns)
+        keys = list(keys[:num_columns])
+        formatters = self._column_formatters(keys)
+        yield from self._build_header_rows(
+            self.header if self.header is not None else keys,
+            bool(self.row_labels),
+            num_columns,
+        )
+
+        row_labels = self.row_labels or []
+        start = 0
+        for _, columns, size in chain([first], batches):
+            if len(columns) != num_columns:
+                columns = list(columns[:num_columns])
+                columns.extend([[_FILL] * size] * (num_columns - len(columns)))
+            yield from self._build_batch_rows(
+                formatters, columns, size, row_labels[start : start + size]
+            )
+            start += size
+
+    def _iter_transposed_rows(self) -> Iterator[str]:
+        """Render the transposed table.
+
+        Every row of the transposed table needs a value of every original row,
+        so the whole columns are extracted first; each of them is one row.
+
+        Yields:
+            str: The header rows, then the markdown rows
+        """
+        keys, columns, _ = self._collect_columns()
+        if not columns:
+            return
+
+        formatters = self._column_formatters(keys)
+        row_labels = self.header if self.header is not None else keys
+        num_columns = len(columns[0])
+        yield from self._build_header_rows(
+            self.row_labels or [""] * num_columns, bool(row_labels), num_columns
+        )
+        yield from self._build_value_rows(
+            map(tuple, map(_call, formatters, columns)), row_labels
+        )
+
+    def _iter_rows(self) -> Iterator[str]:
+        """Render the markdown table row by row.
+
+        Yields:
+            str: The lines of the markdown table
+        """
+        if self.transpose:
+            yield from self._iter_transposed_rows()
+            return
+
+        if not isinstance(self.data, list):
+            yield from self._iter_streamed_rows()
+            return
+
         if not self.data:
+            return
+
+        if self.workers is not None and self.workers > 1:
+            columns, rows = render_rows_parallel(self, self.workers)
+        else:
+            columns, rows = self._build_rows_in_chunks()
+        if not rows:
+            return
+        yield from self._build_header_rows(
+            self.header if self.header is not None else columns,
+            bool(self.row_labels),
+            len(columns),
+        )
+        yield from rows
+
+    def _sample_rows(
+        self, head: int, tail: int
+    ) -> Tuple[list[Any], list[Tuple[Any, ...]], list[Tuple[Any, ...]], int]:
+        """Read the first ``head`` and last ``tail`` rows to show.
+
+        Only those rows are extracted from in-memory lists. Other sources are read
+        once, keeping at most ``head + tail`` rows.
+
+        Returns:
+            Tuple[list[Any], list[tuple], list[tuple], int]: The column keys, the
+            first rows, the last rows and the number of rows to show.
+        """
+        total: Optional[int] = None
+        if isinstance(self.data, list) and self.sort_by is None:
+            stop = len(self.data)
+            if self.limit is not None:
+                stop = min(stop, self.offset + self.limit)
+            total = max(0, stop - self.offset)
+            split = min(stop, self.offset + head)
+            rows = chain(
+                self.data[self.offset : split],
+                self.data[max(split, stop - tail) : stop],
+            )
+            batches = dict_batches(rows, RowExtractor(columns=self.columns))
+        else:
+            batches = self._iter_batches()
+
+        keys: list[Any] = []
+        first: list[Tuple[Any, ...]] = []
+        last: deque[Tuple[Any, ...]] = deque(maxlen=tail)
+        count = 0
+        for keys, columns, size in batches:
+            taken = 0
+            if len(first) < head:
+                taken = min(size, head - len(first))
+                first.extend(_slice_rows(columns, 0, taken))
+            if tail:
+                last.extend(_slice_rows(columns, max(taken, size - tail), size))
+            count += size
+        return list(keys), first, list(last), count if total is None else total
+
+    def preview(self, head: int = 10, tail: int = 10) -> str:
+        """Render the first and last rows of the table, with a row telling how many
+        rows were left out in between.
+
+        Only the rows shown are extracted and formatted from lists, and other
+        sources keep at most ``head + tail`` rows while they are read. Columns are
+        those of the rows shown. Transposed tables are rendered in full.
+
+        Args:
+            head (int, optional): Number of first rows to show. Defaults to 10.
+            tail (int, optional): Number of last rows to show. Defaults to 10.
+
+        Returns:
+            str: Markdown formatted preview of the table.
+
+        Raises:
+            ValueError: If no row would be shown, as the columns are those of the
+                rows shown.
+
+        Examples:
+            >>> table = MdTable([{"n": n, "square": n * n} for n in range(1000)])
+            >>> print(table.preview(head=2, tail=1))
+            | n | square |
+            | --- | --- |
+            | 0 | 0 |
+            | 1 | 1 |
+            | ... (997 rows omitted) | ... |
+            | 999 | 998001 |
+        """
+        if head < 0 or tail < 0 or head + tail == 0:
+            raise ValueError(
+                f"preview needs at least one row to show, got head={head}, tail={tail}"
+            )
+        if self.transpose:
+            return str(self)
+
+        keys, first, last, total = self._sample_rows(head, tail)
+        if not total:
             return ""
 
-        # Create table data
-        table_data = TableData.from_dict_list(
-            self.data, header=self.header, row_labels=self.row_labels
+        width = len(keys)
+        first = [row + (_FILL,) * (width - len(row)) for row in first]
+        last = [row + (_FILL,) * (width - len(row)) for row in last]
+        formatters = self._column_formatters(keys)
+        row_labels = self.row_labels or []
+
+        table_parts = self._build_header_rows(
+            self.header if self.header is not None else keys,
+            bool(self.row_labels),
+            width,
         )
+        table_parts.extend(
+            self._build_batch_rows(
+                formatters, list(zip(*first)), len(first), row_labels[: len(first)]
+            )
+        )
+        omitted = total - len(first) - len(last)
+        if omitted > 0:
+            num_cells = max(1, width + bool(self.row_labels))
+            table_parts.append(
+                _format_row(
+                    [f"... ({omitted} rows omitted)"] + ["..."] * (num_cells - 1)
+                )
+            )
+        table_parts.extend(
+            self._build_batch_rows(
+                formatters,
+                list(zip(*last)),
+                len(last),
+                row_labels[total - len(last) : total],
+            )
+        )
+        return "\n".join(table_parts)
 
-        # Handle transposition
-        if self.transpose:
-            table_data = table_data.transpose()
+    def _repr_markdown_(self) -> str:
+        """Markdown shown by Jupyter: a preview of the first and last rows."""
+        return self.preview()
+
+    def _to_md_table(self) -> str:
+        """Convert the data to a Markdown formatted table.
+
+        Returns:
+            str: Markdown formatted table.
+        """
+        return "\n".join(self._iter_rows())
 
-        # Build markdown table
-        md_table = self._build_markdown_table(table_data)
+    @cached_render_into
+    def render_into(self, write: Write) -> None:
+        """Pushes the markdown table into ``write`` row by row.
 
-        return md_table
+        Tables read from a streamed source are rendered while the source is
+        read, so memory does not grow with the number of rows.
 
+        Args:
+            write (Callable[[str], Any]): Called with every fragment, in order.
+        """
+        rows = self._iter_rows()
+        first = next(rows, None)
+        if first is None:
+            return
+        write(first)
+        # Rows are joined per chunk, so wrapping sinks get few large fragments
+        while True:
+            chunk = list(islice(rows, CHUNK_SIZE))
+            if not chunk:
+                return
+            write("\n" + "\n".join(chunk))
+
+    @cached_str
     def __str__(self) -> str:
         return self._to_md_table()
@@ -1,6 +1,8 @@
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Optional, Tuple
 
-from mdfy.elements._base import MdElement
+from mdfy.elements._base import MdElement, _field_names
+from mdfy.elements._render_cache import cached_str
 from mdfy.elements.text_formatter import MdFormatter
 
 try:
@@ -11,12 +13,23 @@ except ImportError:
     _formatter_available = False
 
 
+@lru_cache(maxsize=None)
+def _default_formatter() -> MdFormatter:
+    """Returns the formatter shared by the texts created without one.
+
+    Building the parser dominates the cost of a text, and the formatter keeps no
+    state between calls, so one instance serves every text.
+    """
+    return MdTextFormatter()
+
+
 class MdText(MdElement):
     """MdElementt class to handle the text and styling of text.
 
     Attributes:
         content (str): The content string containing potential style markers.
         formatter (MdFormatter): The formatter to apply styling to the content.
+            Texts created without one share a default formatter.
 
     Examples:
         >>> # If you have installed mdfy[styled-text]
@@ -49,6 +62,8 @@ class MdText(MdElement):
             - code: cd, quote
     """
 
+    __slots__ = ("content", "formatter", "no_style")
+
     def __init__(
         self,
         content: str,
@@ -70,8 +85,21 @@ class MdText(MdElement):
         self.no_style = no_style
 
         if self.formatter is None and _formatter_available and not no_style:
-            self.formatter = MdTextFormatter()
+            self.formatter = _default_formatter()
+
+    def _state(self) -> Tuple[Any, ...]:
+        state = super()._state()
+        if _formatter_available and self.formatter is _default_formatter():
+            # Pickled as a reference to the function returning it
+            i = _field_names(type(self)).index("formatter")
+            state = state[:i] + (_default_formatter,) + state[i + 1 :]
+        return state
+
+    def _restored(self) -> None:
+        if self.formatter is _default_formatter:
+            self.formatter = _default_formatter()
 
+    @cached_str
     def __str__(self) -> str:
         """Returns the styled content as per the specified style markers.
 
@@ -19,6 +19,8 @@ class MdTableOfContents(MdControlElement):
         contents (Optional[ContentType]): The markdown contents to generate TOC from.
     """
 
+    __slots__ = ("_contents", "_render_all")
+
     def __init__(
         self,
         contents: Union[list[MdWritableItem], None] = None,
@@ -1,11 +1,57 @@
-from io import TextIOWrapper
+from io import StringIO, TextIOWrapper
 from pathlib import Path
 from types import TracebackType
-from typing import Optional, Type, Union, Iterable
+from itertools import chain
+from typing import Optional, TextIO, Type, Union, Iterable
 
-from .elements import MdTableOfContents
+from .elements import MdElement, MdImage, MdTableOfContents
+from .elements._base import Write
+from .elements._embed import REFERENCE_IMAGES
+from .builder import MdDocumentBuilder
+from .dedup import DedupReport, SectionDeduplicator
+from .disk_cache import DiskRenderCache
+from .references import LinkReferences
 from .utils import flattern
-from .types import MdContents
+from .validation import ValidationReport, validate_links
+from .types import MdContents, MdWritableItem
+
+
+def _reference_images(contents: Iterable[MdWritableItem]) -> list[MdImage]:
+    """Returns the embedded reference-style images of contents, one per label.
+
+    Images nested in other elements, e.g. in a quote, a list or a table cell,
+    are found through their ``_children``. Contents are only searched while
+    reference-style images exist, as searching the cells of large tables costs
+    about as much as rendering them.
+    """
+    images: dict[str, MdImage] = {}
+    if not REFERENCE_IMAGES:
+        return []
+
+    def search(elements: Iterable[MdWritableItem]) -> None:
+        for element in elements:
+            if isinstance(element, MdImage):
+                label = element.label
+                if label is not None:
+                    images.setdefault(label, element)
+            elif isinstance(element, MdElement):
+                search(element._children())
+
+    search(contents)
+    return list(images.values())
+
+
+def _render_definitions(
+    write: Write, definitions: list[str], images: list[MdImage]
+) -> None:
+    """Pushes reference definitions after a blank line, if there are any."""
+    items: Iterable[Union[str, MdImage]] = chain(definitions, images)
+    for i, definition in enumerate(items):
+        write("\n" if i else "\n\n")
+        if isinstance(definition, MdImage):
+            definition.render_definition_into(write)
+        else:
+            write(definition)
 
 
 class Mdfier:
@@ -47,17 +93,43 @@ class Mdfier:
         2 * 2 = 4
     """
 
-    def __init__(self, filepath: Union[str, Path], encoding: str = "utf-8") -> None:
+    def __init__(
+        self,
+        filepath: Union[str, Path],
+        encoding: str = "utf-8",
+        reference_links: bool = False,
+        dedup: bool = False,
+        disk_cache: Optional[DiskRenderCache] = None,
+    ) -> None:
         """Initializes an instance of the Mdfier class to write Markdown content to a file.
 
         Args:
             filepath (Union[str, Path]): The path to the file.
+            reference_links (bool, optional): Write repeated link and image URLs as
+                reference-style links, defined once at the end of the file.
+                Defaults to False.
+            dedup (bool, optional): Render equal elements repeated in a write
+                once, and write that rendering for each of them. Defaults to False.
+            disk_cache (Optional[DiskRenderCache]): Cache of renderings persisted
+                across runs, looked up before rendering elements and flushed
+                after each write. Defaults to None.
         """
 
         self.filepath = Path(filepath)
         self.filepath.parent.mkdir(parents=True, exist_ok=True)
         self.file_object: Optional[TextIOWrapper] = None
         self._encoding = encoding
+        self.reference_links = reference_links
+        # References of the open file or of the last write, reporting the bytes
+        # they saved
+        self.link_references: Optional[LinkReferences] = None
+        # Embedded images used by reference in the open file, by label, set to
+        # None once defined by flush
+        self._images: dict[str, Optional[MdImage]] = {}
+        self.dedup = dedup
+        # Rendering work saved by the last write with dedup
+        self.dedup_report: Optional[DedupReport] = None
+        self.disk_cache = disk_cache
 
     def __enter__(self) -> "Mdfier":
         """Returns the Mdfier instance.
@@ -67,6 +139,10 @@ class Mdfier:
         """
 
         self.file_object = self.filepath.open("w", encoding=self._encoding)
+        self.link_references = (
+            LinkReferences([], self._encoding) if self.reference_links else None
+        )
+        self._images = {}
         return self
 
     def __exit__(
@@ -75,7 +151,7 @@ class Mdfier:
         exc_value: Optional[BaseException],
         traceback: Optional[TracebackType],
     ) -> None:
-        """Writes the Markdown content to the file.
+        """Writes the pending reference definitions and closes the file.
 
         Args:
             exc_type (type): The type of the exception.
@@ -84,30 +160,181 @@ class Mdfier:
         """
         if self.file_object is None:
             return
+        self.flush()
         self.file_object.close()
 
     @classmethod
-    def stringify(cls, contents: MdContents, separator: str = "\n") -> str:
+    def stringify(
+        cls,
+        contents: MdContents,
+        separator: str = "\n",
+        reference_links: bool = False,
+        dedup: bool = False,
+        disk_cache: Optional[DiskRenderCache] = None,
+    ) -> str:
         """Converts the given Markdown content to a string.
 
         Args:
             content (Union[str, MdElement]): The Markdown content to convert to a string.
+            reference_links (bool, optional): Write repeated link and image URLs as
+                reference-style links. Defaults to False.
+            dedup (bool, optional): Render equal repeated elements once.
+                Defaults to False.
+            disk_cache (Optional[DiskRenderCache]): Cache of renderings persisted
+                across runs, flushed once the content is rendered. Defaults to None.
         """
 
-        flattened_contents = flattern(contents)
+        references = None
+        if reference_links:
+            contents = flattern(contents)
+            references = LinkReferences(contents)
+        deduplicator = None
+        if dedup:
+            contents = flattern(contents)
+            deduplicator = SectionDeduplicator(contents)
 
-        markdown_parts = []
-        for i, element in enumerate(flattened_contents):
-            if isinstance(element, MdTableOfContents):
-                markdown_parts.append(element.render(flattened_contents, i))
-            else:
-                markdown_parts.append(str(element))
+        # Fragments are appended to one buffer instead of being kept until joined
+        buffer = StringIO()
+        cls._render_contents(
+            buffer.write, contents, separator, references, deduplicator, disk_cache
+        )
+        if disk_cache is not None:
+            disk_cache.flush()
+        return buffer.getvalue()
+
+    @classmethod
+    def _render_contents(
+        cls,
+        write: Write,
+        contents: MdContents,
+        separator: str = "\n",
+        references: Optional[LinkReferences] = None,
+        deduplicator: Optional[SectionDeduplicator] = None,
+        disk_cache: Optional[DiskRenderCache] = None,
+        images: Optional[dict[str, Optional[MdImage]]] = None,
+    ) -> None:
+        """Pushes the given Markdown content into a sink element by element.
+
+        Args:
+            write (Callable[[str], Any]): Called with every fragment, in order.
+            contents (MdContents): The Markdown content to render.
+            separator (str, optional): Pushed between elements. Defaults to a newline.
+            references (Optional[LinkReferences]): Labels of the repeated link targets
+                of ``contents``, whose definitions are pushed after the content.
+            deduplicator (Optional[SectionDeduplicator]): Renders the repeated
+                elements of ``contents``, which must then be flattened, once.
+            disk_cache (Optional[DiskRenderCache]): Persisted renderings looked up
+                before rendering elements.
+            images (Optional[dict[str, Optional[MdImage]]]): Collects the embedded
+                images used by reference, by label. The definitions of these
+                images and of ``references`` are then left to the caller.
+                Defaults to None, pushing them after the content.
+        """
+
+        if (
+            isinstance(contents, MdDocumentBuilder)
+            and references is None
+            and deduplicator is None
+            and disk_cache is None
+        ):
+            # Records are rendered straight from the arrays of the builder
+            contents.render_into(write, separator)
+            found = _reference_images(contents._objects)
+        else:
+            flattened_contents = flattern(contents)
+            render = None if disk_cache is None else disk_cache.render_into
+
+            for i, element in enumerate(flattened_contents):
+                if i:
+                    write(separator)
+                reference = None if references is None else references.render(element)
+                if reference is not None:
+                    write(reference)
+                elif isinstance(element, MdTableOfContents):
+                    write(element.render(flattened_contents, i))
+                elif deduplicator is not None and isinstance(element, MdElement):
+                    deduplicator.render_into(i, element, write, render)
+                elif render is not None and isinstance(element, MdElement):
+                    render(element, write)
+                elif isinstance(element, MdElement):
+                    element.render_into(write)
+                else:
+                    write(str(element))
+            found = _reference_images(flattened_contents)
+
+        if images is not None:
+            for image in found:
+                images.setdefault(image.label, image)  # type: ignore[arg-type]
+            return
+        # Links and embedded images used by reference are defined once, at the end
+        _render_definitions(
+            write, [] if references is None else references.definitions(), found
+        )
+
+    @classmethod
+    def _write_contents(
+        cls,
+        file: TextIO,
+        contents: MdContents,
+        separator: str = "\n",
+        references: Optional[LinkReferences] = None,
+        deduplicator: Optional[SectionDeduplicator] = None,
+        disk_cache: Optional[DiskRenderCache] = None,
+        images: Optional[dict[str, Optional[MdImage]]] = None,
+    ) -> None:
+        """Writes the given Markdown content to a file element by element.
 
-        return separator.join(markdown_parts)
+        Args:
+            file (TextIO): The file to write to.
+            contents (MdContents): The Markdown content to write.
+            separator (str, optional): Written between elements. Defaults to a newline.
+            references (Optional[LinkReferences]): Labels of the repeated link targets
+                of ``contents``, whose definitions are written after the content.
+            deduplicator (Optional[SectionDeduplicator]): Renders the repeated
+                elements of ``contents``, which must then be flattened, once.
+            disk_cache (Optional[DiskRenderCache]): Persisted renderings looked up
+                before rendering elements.
+            images (Optional[dict[str, Optional[MdImage]]]): Collects the embedded
+                images used by reference, whose definitions, with those of
+                ``references``, are then left to the caller. Defaults to None.
+        """
+
+        cls._render_contents(
+            file.write,
+            contents,
+            separator,
+            references,
+            deduplicator,
+            disk_cache,
+            images,
+        )
+        file.write("\n")
 
     def write(self, contents: MdContents) -> None:
         """Writes the given Markdown content to the file.
 
+        Elements are written one after the other, and tables streamed from a file
+        or a generator are written as their rows are read. A
+        :class:`~mdfy.builder.MdDocumentBuilder` is rendered from its records,
+        without creating its elements. Embedded reference-style images are defined
+        once, after the content.
+
+        With ``reference_links``, the link targets are indexed before writing, and
+        the definitions of the repeated ones are written after the content.
+        :attr:`link_references` then reports the bytes saved.
+
+        Writes into a file opened with ``with`` share their reference labels,
+        and the definitions of the links and embedded images used by reference
+        are written once, when the file is closed or :meth:`flush` is called.
+
+        With ``dedup``, equal elements, e.g. a disclaimer repeated in every
+        section, are rendered once, and :attr:`dedup_report` reports the
+        rendering work saved.
+
+        With a ``disk_cache``, texts, tables, lists, quotes and code blocks
+        rendered by an earlier run are copied from it, and the new renderings
+        are persisted once the content is written.
+
         Args:
             content (Union[str, MdElement]): The Markdown content to write to the file.
         """
@@ -115,8 +342,86 @@ class Mdfier:
         if not isinstance(contents, Iterable):
             contents = [contents]
 
-        markdown = self.stringify(contents)
+        references = None
+        if self.file_object is not None:
+            # Writes into an open file share its labels
+            references = self.link_references
+            if references is not None:
+                contents = flattern(contents)
+                references.add(contents)
+        elif self.reference_links:
+            contents = flattern(contents)
+            references = LinkReferences(contents, self._encoding)
+        self.link_references = references
+
+        deduplicator = None
+        if self.dedup:
+            contents = flattern(contents)
+            deduplicator = SectionDeduplicator(contents)
+        self.dedup_report = None if deduplicator is None else deduplicator.report
+
         if self.file_object is None:
-            self.filepath.write_text(markdown + "\n", encoding=self._encoding)
+            with self.filepath.open("w", encoding=self._encoding) as file:
+                self._write_contents(
+                    file,
+                    contents,
+                    references=references,
+                    deduplicator=deduplicator,
+                    disk_cache=self.disk_cache,
+                )
         else:
-            self.file_object.write(markdown + "\n")
+            self._write_contents(
+                self.file_object,
+                contents,
+                references=references,
+                deduplicator=deduplicator,
+                disk_cache=self.disk_cache,
+                images=self._images,
+            )
+        if self.disk_cache is not None:
+            self.disk_cache.flush()
+
+    def flush(self) -> None:
+        """Writes the definitions of the references used so far to the open file.
+
+        Writes into a file opened with ``with`` share their reference labels,
+        which are defined when the file is closed. Call this to define them
+        earlier, e.g. at the end of a chapter. Labels stay usable by later
+        writes, and are defined once.
+        """
+
+        if self.file_object is None:
+            return
+        definitions: list[Union[str, MdImage]] = []
+        if self.link_references is not None:
+            definitions.extend(self.link_references.new_definitions())
+        for label, image in self._images.items():
+            if image is not None:
+                definitions.append(image)
+                self._images[label] = None
+        if not definitions:
+            return
+        # Blank line separating the definitions from the document
+        write = self.file_object.write
+        write("\n")
+        for definition in definitions:
+            if isinstance(definition, MdImage):
+                definition.render_definition_into(write)
+            else:
+                write(definition)
+            write("\n")
+
+    def validate(self, contents: MdContents) -> ValidationReport:
+        """Checks the internal anchors and relative file links of the given content.
+
+        Relative targets are resolved against the directory of the file, as a
+        Markdown viewer would. Nothing is written.
+
+        Args:
+            contents (MdContents): The Markdown content to check.
+
+        Returns:
+            ValidationReport: The number of checked links and the broken ones.
+        """
+
+        return validate_links(contents, self.filepath.parent)
@@ -0,0 +1,168 @@
+"""Reference-style links shared across a document."""
+
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterable, Optional, Tuple
+
+from .elements import MdImage, MdLink
+from .types import MdWritableItem
+
+# (url, title) of a link or image
+LinkTarget = Tuple[str, Optional[str]]
+
+
+def _target(element: MdWritableItem) -> Optional[LinkTarget]:
+    """Returns the target of a link or a non-embedded image, if any."""
+    if isinstance(element, MdLink):
+        if element.url is None:
+            return None
+        return element.url, element.title or None
+    if isinstance(element, MdImage):
+        if element.path is not None or element.src is None:
+            return None
+        return element.src, None
+    return None
+
+
+class LinkReferences:
+    """Reference labels of the link and image URLs repeated in a document.
+
+    The targets (URL and title) of the :class:`~mdfy.elements.link.MdLink` and
+    :class:`~mdfy.elements.image.MdImage` elements of the contents are counted
+    in a hash map. Targets used more than once get a short numeric label when
+    that makes the document smaller: their elements render as
+    ``[text][label]``, and a ``[label]: url "title"`` definition is written
+    once, at the end of the document.
+
+    Documents written in several parts :meth:`add` the contents of every part,
+    so the parts share labels. Targets keep their label once given, and a
+    target repeated across parts is labelled from the part using it again on.
+
+    Attributes:
+        bytes_saved (int): Number of bytes the labels save in the encoded document.
+
+    Args:
+        contents (Iterable[MdWritableItem], optional): The flattened contents of
+            the document, or of its first part. Defaults to none.
+        encoding (str, optional): Encoding the sizes are counted in. Defaults to ``"utf-8"``.
+        start (int, optional): First label. Defaults to 1.
+
+    Examples:
+        >>> from mdfy import MdLink, MdText
+        >>> url = "https://example.com/a/very/long/url"
+        >>> contents = [MdLink(url, "first"), MdText("and"), MdLink(url, "second")]
+        >>> references = LinkReferences(contents)
+        >>> print(references.render(contents[0]))
+        [first][1]
+        >>> print(references.render(contents[1]))
+        None
+        >>> references.definitions()
+        ['[1]: https://example.com/a/very/long/url']
+        >>> references.bytes_saved
+        26
+    """
+
+    def __init__(
+        self,
+        contents: Iterable[MdWritableItem] = (),
+        encoding: str = "utf-8",
+        start: int = 1,
+    ) -> None:
+        self.encoding = encoding
+        self.start = start
+        self._labels: Dict[LinkTarget, str] = {}
+        # Uses of every target so far, and number of labels already defined
+        self._uses: Counter[LinkTarget] = Counter()
+        self._defined = 0
+        self.bytes_saved = 0
+        self.add(contents)
+
+    def add(self, contents: Iterable[MdWritableItem]) -> None:
+        """Counts the targets of the next part of the document, labelling repeated ones.
+
+        A target is labelled when its uses so far, those of earlier parts
+        included, save more than its definition costs. Only its uses from this
+        part on render by reference.
+
+        Args:
+            contents (Iterable[MdWritableItem]): The flattened contents of the part.
+        """
+        had_labels = bool(self._labels)
+        counts = Counter(filter(None, map(_target, contents)))
+        for target, count in counts.items():
+            uses = self._uses[target] + count
+            self._uses[target] = uses
+            label = self._labels.get(target)
+            if label is None:
+                if uses < 2:
+                    continue
+                label = str(self.start + len(self._labels))
+                definition_size = self._size(self._definition(target, label) + "\n")
+                if uses * self._saving(target, label) <= definition_size:
+                    continue
+                self._labels[target] = label
+                self.bytes_saved -= definition_size
+            self.bytes_saved += count * self._saving(target, label)
+        if self._labels and not had_labels:
+            # Blank line separating the definitions from the document
+            self.bytes_saved -= self._size("\n")
+
+    def _size(self, text: str) -> int:
+        return len(text.encode(self.encoding))
+
+    def _saving(self, target: LinkTarget, label: str) -> int:
+        """Returns the bytes saved by every use of a target by reference."""
+        url, title = target
+        title_str = f' "{title}"' if title else ""
+        # An inline "(url "title")" becomes "[label]" at every use
+        return self._size(f"({url}{title_str})") - self._size(f"[{label}]")
+
+    @staticmethod
+    def _definition(target: LinkTarget, label: str) -> str:
+        url, title = target
+        title_str = f' "{title}"' if title else ""
+        return f"[{label}]: {url}{title_str}"
+
+    def __len__(self) -> int:
+        """Returns the number of labels."""
+        return len(self._labels)
+
+    def render(self, element: MdWritableItem) -> Optional[str]:
+        """Returns the reference-style rendering of an element.
+
+        Args:
+            element (MdWritableItem): An element of the contents.
+
+        Returns:
+            Optional[str]: ``[text][label]`` or ``![alt][label]``, or None if the
+            element does not use a labelled target.
+        """
+        target = _target(element)
+        label = None if target is None else self._labels.get(target)
+        if label is None:
+            return None
+        if isinstance(element, MdImage):
+            return f"![{element.alt}][{label}]"
+        assert isinstance(element, MdLink)
+        return f"[{element.text or element.url}][{label}]"
+
+    def definitions(self) -> list[str]:
+        """Returns the definitions of the labels, in order of first use.
+
+        Returns:
+            list[str]: Definitions like ``[1]: https://example.com "title"``.
+        """
+        return [
+            self._definition(target, label) for target, label in self._labels.items()
+        ]
+
+    def new_definitions(self) -> list[str]:
+        """Returns the definitions of the labels given since the last call, in order.
+
+        Returns:
+            list[str]: Definitions like ``[1]: https://example.com "title"``.
+        """
+        labels = islice(self._labels.items(), self._defined, None)
+        definitions = [self._definition(target, label) for target, label in labels]
+        self._defined = len(self._labels)
+        return definitions
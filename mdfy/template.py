@@ -0,0 +1,263 @@
+"""Documents compiled once and filled in many times."""
+
+import os
+from io import StringIO
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping, Optional, TextIO, Tuple, Union
+
+from .elements import MdElement, MdTableOfContents
+from .elements._base import MdControlElement, Write
+from .mdfy import _reference_images, _render_definitions
+from .types import MdContents
+from .utils import flattern
+
+# Values of the slots of one document
+SlotValues = Mapping[str, MdContents]
+
+
+def _encode(text: str, encoding: str) -> bytes:
+    """Encodes text like a file opened in text mode, translating line breaks."""
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode(encoding)
+
+
+class MdSlot(MdControlElement):
+    """Placeholder of a value given when a :class:`MdTemplate` is rendered.
+
+    Attributes:
+        name (str): The name of the slot.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        """Initializes a named slot of a template.
+
+        Args:
+            name (str): The name of the slot.
+        """
+        self.name = name
+
+
+class MdTemplate:
+    """Document whose static parts are rendered once, with slots filled per render.
+
+    The contents are flattened and every run of elements between two
+    :class:`MdSlot` placeholders is rendered to one string when the template is
+    created, so static texts are formatted once. Rendering the template then
+    only renders the slot values and joins them with the static strings, and
+    :meth:`write_many` writes the static parts, encoded once, to many files.
+
+    Templates render like :meth:`~mdfy.mdfy.Mdfier.stringify` does for the
+    contents with the slots replaced by their values, except that a table of
+    contents only lists the static headers, and that embedded reference-style
+    images are only defined for the static contents.
+
+    Args:
+        contents (MdContents): The strings, elements and slots of the document.
+        separator (str, optional): Written between elements. Defaults to a newline.
+
+    Attributes:
+        slots (tuple[str, ...]): The names of the slots, in document order.
+
+    Examples:
+        >>> from mdfy import MdHeader, MdSlot, MdTemplate, MdText
+        >>> template = MdTemplate([
+        ...     MdHeader("Monthly report"),
+        ...     MdText("Dear customer,"),
+        ...     MdSlot("summary"),
+        ...     MdText("[Thank you:bold] for your trust."),
+        ... ])
+        >>> template.slots
+        ('summary',)
+        >>> print(template.render(summary=MdText("You saved [12%:bold].")))
+        # Monthly report
+        Dear customer,
+        You saved **12%**.
+        **Thank you** for your trust.
+    """
+
+    __slots__ = ("separator", "slots", "_static", "_definitions", "_encoded")
+
+    def __init__(self, contents: MdContents, separator: str = "\n") -> None:
+        self.separator = separator
+        flattened = flattern(contents)
+
+        slots: list[str] = []
+        # Rendering of the elements between two slots, None if there are none
+        static: list[Optional[str]] = []
+        buffer = StringIO()
+        filled = False
+        for i, element in enumerate(flattened):
+            if isinstance(element, MdSlot):
+                static.append(buffer.getvalue() if filled else None)
+                slots.append(element.name)
+                buffer = StringIO()
+                filled = False
+                continue
+            # Separators next to slots are written with the slot values
+            if filled:
+                buffer.write(separator)
+            if isinstance(element, MdTableOfContents):
+                buffer.write(element.render(flattened, i))
+            elif isinstance(element, MdElement):
+                element.render_into(buffer.write)
+            else:
+                buffer.write(str(element))
+            filled = True
+        static.append(buffer.getvalue() if filled else None)
+
+        # Embedded images of the static contents are defined once, at the end
+        buffer = StringIO()
+        _render_definitions(buffer.write, [], _reference_images(flattened))
+
+        self.slots = tuple(slots)
+        self._static = static
+        self._definitions = buffer.getvalue()
+        # Static strings, separator and definitions encoded per encoding, see
+        # write_many
+        self._encoded: dict[str, Tuple[list[Optional[bytes]], bytes, bytes]] = {}
+
+    def _render_value(
+        self, name: str, values: SlotValues, write: Write, separate: bool
+    ) -> bool:
+        """Pushes the value of a slot, flattened and separated, into ``write``.
+
+        Args:
+            name (str): The name of the slot.
+            values (Mapping[str, MdContents]): The value of every slot.
+            write (Callable[[str], Any]): Called with every fragment, in order.
+            separate (bool): Whether to push a separator before the value, if
+                it is not empty.
+
+        Returns:
+            bool: Whether the value holds any element.
+        """
+        try:
+            value = values[name]
+        except KeyError:
+            raise KeyError(f"No value given for slot {name!r}") from None
+        elements = [value] if isinstance(value, str) else flattern(value)
+        for i, element in enumerate(elements):
+            if i or separate:
+                write(self.separator)
+            if isinstance(element, MdElement):
+                element.render_into(write)
+            else:
+                write(str(element))
+        return bool(elements)
+
+    def render_into(self, write: Write, values: SlotValues) -> None:
+        """Pushes the document with the given slot values into ``write``.
+
+        Args:
+            write (Callable[[str], Any]): Called with every fragment, in order.
+            values (Mapping[str, MdContents]): The value of every slot.
+
+        Raises:
+            KeyError: If a slot has no value.
+        """
+        written = False
+        for i, text in enumerate(self._static):
+            if i:
+                written |= self._render_value(self.slots[i - 1], values, write, written)
+            if text is not None:
+                if written:
+                    write(self.separator)
+                write(text)
+                written = True
+        write(self._definitions)
+
+    def render(self, **values: MdContents) -> str:
+        """Returns the document with the given slot values.
+
+        Args:
+            **values (MdContents): The value of every slot.
+
+        Returns:
+            str: The Markdown document.
+        """
+        buffer = StringIO()
+        self.render_into(buffer.write, values)
+        return buffer.getvalue()
+
+    def render_many(self, values: Iterable[SlotValues]) -> Iterator[str]:
+        """Yields one document per mapping of slot values.
+
+        Args:
+            values (Iterable[Mapping[str, MdContents]]): The slot values of every
+                document.
+
+        Yields:
+            str: The Markdown documents.
+        """
+        for document_values in values:
+            buffer = StringIO()
+            self.render_into(buffer.write, document_values)
+            yield buffer.getvalue()
+
+    def write_to(self, file: TextIO, values: SlotValues) -> None:
+        """Writes the document to a text file, ending it like :class:`~mdfy.mdfy.Mdfier`.
+
+        Args:
+            file (TextIO): The file to write to.
+            values (Mapping[str, MdContents]): The value of every slot.
+        """
+        self.render_into(file.write, values)
+        file.write("\n")
+
+    def write_many(
+        self,
+        outputs: Iterable[Tuple[Union[str, Path], SlotValues]],
+        encoding: str = "utf-8",
+    ) -> int:
+        """Writes one file per path and mapping of slot values.
+
+        The static parts are encoded once for all files, and only the slot
+        values are rendered and encoded per file. Files are written like
+        :meth:`~mdfy.mdfy.Mdfier.write` would write the filled contents.
+
+        Args:
+            outputs (Iterable[Tuple[Union[str, Path], Mapping[str, MdContents]]]):
+                The path of every file and its slot values.
+            encoding (str, optional): The encoding of the files. Defaults to ``"utf-8"``.
+
+        Returns:
+            int: The number of files written.
+        """
+        encoded = self._encoded.get(encoding)
+        if encoded is None:
+            encoded = self._encoded[encoding] = (
+                [
+                    None if text is None else _encode(text, encoding)
+                    for text in self._static
+                ],
+                _encode(self.separator, encoding),
+                _encode(self._definitions + "\n", encoding),
+            )
+        static, separator, end = encoded
+
+        written_files = 0
+        for path, values in outputs:
+            parts: list[bytes] = []
+            written = False
+            for i, chunk in enumerate(static):
+                if i:
+                    buffer = StringIO()
+                    name = self.slots[i - 1]
+                    if self._render_value(name, values, buffer.write, written):
+                        parts.append(_encode(buffer.getvalue(), encoding))
+                        written = True
+                if chunk is not None:
+                    if written:
+                        parts.append(separator)
+                    parts.append(chunk)
+                    written = True
+            parts.append(end)
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("wb") as file:
+                file.writelines(parts)
+            written_files += 1
+        return written_files
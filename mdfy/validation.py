@@ -0,0 +1,164 @@
+"""Offline validation of the links of a document."""
+
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Union
+from urllib.parse import quote, unquote, urlsplit
+
+from .elements import MdHeader, MdImage, MdLink
+from .types import MdContents
+from .utils import flattern, generate_anchor
+
+
+@dataclass
+class LinkIssue:
+    """A link whose target was not found.
+
+    Attributes:
+        index (int): Position of the element in the flattened contents.
+        element (Union[MdLink, MdImage]): The link or image.
+        target (str): The URL of the element.
+        reason (str): Why the target was not found.
+    """
+
+    index: int
+    element: Union[MdLink, MdImage]
+    target: str
+    reason: str
+
+
+@dataclass
+class ValidationReport:
+    """Result of :func:`validate_links`.
+
+    Attributes:
+        anchors_checked (int): Number of internal ``#anchor`` links checked.
+        files_checked (int): Number of relative links and images checked.
+        paths_stated (int): Number of distinct paths looked up on the filesystem.
+        broken_anchors (list[LinkIssue]): Internal links to anchors of no header.
+        missing_files (list[LinkIssue]): Relative links and images to missing files.
+    """
+
+    anchors_checked: int = 0
+    files_checked: int = 0
+    paths_stated: int = 0
+    broken_anchors: list[LinkIssue] = field(default_factory=list)
+    missing_files: list[LinkIssue] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Whether every checked link has a target."""
+        return not self.broken_anchors and not self.missing_files
+
+
+def collect_anchors(contents: MdContents) -> set[str]:
+    """Returns the anchors of the headers of the contents.
+
+    Besides the anchor of every header, repeated headers get the ``-1``, ``-2``...
+    suffixed anchors that GitHub gives them.
+
+    Args:
+        contents (MdContents): The Markdown contents.
+
+    Returns:
+        set[str]: The anchors, without the leading ``#``.
+    """
+    anchors: set[str] = set()
+    counts: Dict[str, int] = {}
+    for element in flattern(contents):
+        if isinstance(element, MdHeader):
+            anchor = generate_anchor(element.content)
+            count = counts.get(anchor, 0)
+            counts[anchor] = count + 1
+            anchors.add(anchor)
+            if count:
+                anchors.add(f"{anchor}-{count}")
+    return anchors
+
+
+def _relative_path(url: str) -> Optional[str]:
+    """Returns the unquoted path of a relative URL, or None for other URLs."""
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path or parts.path.startswith("/"):
+        return None
+    return unquote(parts.path)
+
+
+def validate_links(
+    contents: MdContents, base_dir: Union[str, Path, None] = None
+) -> ValidationReport:
+    """Checks the internal anchors and relative file targets of the contents.
+
+    Internal links (``#anchor``) of :class:`~mdfy.elements.link.MdLink` elements
+    are looked up in the set of anchors of the headers of the contents. Relative
+    targets of links and images are looked up on the filesystem, with one
+    ``os.stat`` per distinct path however many elements point to it. Absolute
+    URLs and embedded images are not checked.
+
+    Args:
+        contents (MdContents): The Markdown contents.
+        base_dir (Union[str, Path, None]): Directory relative targets are resolved
+            against, usually the directory of the Markdown file. Defaults to the
+            current directory.
+
+    Returns:
+        ValidationReport: The number of checked links and the broken ones.
+
+    Examples:
+        >>> from mdfy import MdHeader, MdLink
+        >>> report = validate_links([
+        ...     MdHeader("Getting started"),
+        ...     MdLink("#getting-started", "ok"),
+        ...     MdLink("#installation", "broken"),
+        ... ])
+        >>> report.ok
+        False
+        >>> [issue.target for issue in report.broken_anchors]
+        ['#installation']
+    """
+    flattened = flattern(contents)
+    anchors = collect_anchors(flattened)
+    base = Path(base_dir) if base_dir is not None else Path()
+    report = ValidationReport()
+
+    # Elements are grouped by URL, so each distinct URL is parsed once
+    links: Dict[str, list[tuple[int, Union[MdLink, MdImage]]]] = {}
+    for index, element in enumerate(flattened):
+        if isinstance(element, MdLink):
+            url = element.url
+        elif isinstance(element, MdImage) and element.path is None:
+            url = element.src
+        else:
+            continue
+        if url:
+            links.setdefault(url, []).append((index, element))
+
+    # Relative targets are grouped by path, so each path is stated once
+    paths: Dict[str, list[str]] = {}
+    for url, elements in links.items():
+        if url.startswith("#"):
+            elements = [item for item in elements if isinstance(item[1], MdLink)]
+            report.anchors_checked += len(elements)
+            if quote(unquote(url[1:])) not in anchors:
+                report.broken_anchors.extend(
+                    LinkIssue(index, element, url, "no header with this anchor")
+                    for index, element in elements
+                )
+            continue
+        path = _relative_path(url)
+        if path is not None:
+            report.files_checked += len(elements)
+            paths.setdefault(os.path.normpath(base / path), []).append(url)
+
+    report.paths_stated = len(paths)
+    for path, urls in paths.items():
+        if not os.path.exists(path):
+            report.missing_files.extend(
+                LinkIssue(index, element, url, f"{path} does not exist")
+                for url in urls
+                for index, element in links[url]
+            )
+    report.broken_anchors.sort(key=lambda issue: issue.index)
+    report.missing_files.sort(key=lambda issue: issue.index)
+    return report
@@ -0,0 +1,99 @@
+import io
+from pathlib import Path
+
+from mdfy import (
+    MdCode,
+    MdDocumentBuilder,
+    Mdfier,
+    MdHeader,
+    MdHorizontal,
+    MdImage,
+    MdLink,
+    MdTable,
+    MdTableOfContents,
+    MdText,
+)
+from mdfy.elements.text_formatter import MdFormatter
+from mdfy.types import MdWritableItem
+
+
+class UpperFormatter(MdFormatter):
+    def format(self, text: str) -> str:
+        return text.upper()
+
+
+def _contents() -> list[MdWritableItem]:
+    return [
+        MdHeader("Catalog"),
+        MdTableOfContents(),
+        MdHeader("Items", 2),
+        MdText("[Bold:bold] text"),
+        MdText("[Not styled:bold]", no_style=True),
+        MdText("custom", formatter=UpperFormatter()),
+        MdLink("https://example.com", "example", title="Example"),
+        MdLink("https://example.com/empty"),
+        MdImage("image.png", "alt"),
+        MdHorizontal("---"),
+        "plain string",
+        MdCode("print('code')", syntax="python"),
+        MdTable([{"a": 1}, {"a": 2}]),
+        MdHeader("Items", 2),
+    ]
+
+
+def test_builder_renders_like_elements() -> None:
+    contents = _contents()
+    builder = MdDocumentBuilder.from_elements(contents)
+
+    assert len(builder) == len(contents)
+    assert str(builder) == Mdfier.stringify(contents)
+
+    buffer = io.StringIO()
+    builder.write_to(buffer)
+    assert buffer.getvalue() == Mdfier.stringify(contents)
+
+
+def test_builder_round_trip() -> None:
+    contents = _contents()
+    elements = MdDocumentBuilder.from_elements(contents).to_elements()
+
+    assert [type(element) for element in elements] == [
+        type(element) for element in contents
+    ]
+    # Elements without a record kind are the same objects
+    assert elements[1] is contents[1]
+    assert elements[5] is contents[5]
+    assert Mdfier.stringify(elements) == Mdfier.stringify(contents)
+
+
+def test_builder_interns_strings() -> None:
+    builder = MdDocumentBuilder()
+    for _ in range(1000):
+        builder.header("Same header", 3)
+        builder.link("https://example.com", "Same text")
+
+    assert len(builder) == 2000
+    assert len(builder._strings) == 3
+
+
+def test_builder_keeps_deep_headers() -> None:
+    contents: list[MdWritableItem] = [MdTableOfContents(), MdHeader("Deep", 300)]
+    builder = MdDocumentBuilder.from_elements(contents)
+    builder.header("Deeper", 1000)
+
+    contents.append(MdHeader("Deeper", 1000))
+    assert str(builder) == Mdfier.stringify(contents)
+    assert builder.to_elements()[1] is contents[1]
+
+
+def test_mdfier_writes_builder(tmp_path: Path) -> None:
+    contents = _contents()
+    builder = MdDocumentBuilder.from_elements(contents)
+
+    Mdfier(tmp_path / "builder.md").write(builder)
+    Mdfier(tmp_path / "elements.md").write(contents)
+    Mdfier(tmp_path / "references.md", reference_links=True).write(builder)
+
+    expected = (tmp_path / "elements.md").read_text()
+    assert (tmp_path / "builder.md").read_text() == expected
+    assert (tmp_path / "references.md").read_text() == expected
@@ -0,0 +1,141 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from mdfy import DiskRenderCache, Mdfier, MdHeader, MdList, MdQuote, MdTable, MdText
+from mdfy import disk_cache
+from mdfy.disk_cache import MAX_TABLE_ROWS, element_key
+from mdfy.elements.text_formatter import MdFormatter
+
+
+def _contents() -> list:
+    return [
+        MdHeader("Report"),
+        MdText("[Figures:bold] are [estimates:italic]."),
+        MdQuote(MdList(["a", MdText("[b:bold]")])),
+        MdTable([{"x": 1, "y": 2.5}]),
+    ]
+
+
+def test_key_stable_across_processes() -> None:
+    element = MdQuote(MdList(["a", {"b": [1, 2.5]}, MdText("[c:bold]")]))
+    script = (
+        "from mdfy import MdList, MdQuote, MdText\n"
+        "from mdfy.disk_cache import element_key\n"
+        "print(element_key(MdQuote(MdList(['a', {'b': [1, 2.5]}, MdText('[c:bold]')]))))"
+    )
+    env = {**os.environ, "PYTHONHASHSEED": "1234"}
+    output = subprocess.run(
+        [sys.executable, "-c", script], env=env, capture_output=True, text=True
+    )
+    assert output.stdout.strip() == element_key(element)
+
+
+class _Distribution:
+    version = "1.2.3"
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def locate_file(self, path: str) -> Path:
+        return self.root / path
+
+
+@pytest.mark.parametrize("installed", [True, False])
+def test_version_of_installed_sources(
+    monkeypatch: pytest.MonkeyPatch, installed: bool
+) -> None:
+    # Editable installs locate their files elsewhere than the imported sources
+    root = Path(disk_cache.__file__).parents[1] if installed else Path("/elsewhere")
+    monkeypatch.setattr(disk_cache, "distribution", lambda name: _Distribution(root))
+    version = disk_cache._mdfy_version()
+    assert version == (
+        "1.2.3" if installed else f"source {disk_cache._source_digest()}"
+    )
+
+
+class UpperFormatter(MdFormatter):
+    def format(self, text: str) -> str:
+        return text.upper()
+
+
+def test_unencodable_elements_are_not_cached() -> None:
+    assert element_key(MdText("text", formatter=UpperFormatter())) is None
+    assert element_key(MdList(["a"], children=lambda item: None)) is None
+    assert element_key(MdList([1])) != element_key(MdList([1.0]))
+
+
+def test_streamed_and_large_tables_are_not_cached(tmp_path: Path) -> None:
+    rows = [{"i": i} for i in range(MAX_TABLE_ROWS + 1)]
+    assert element_key(MdTable(rows[:-1])) is not None
+    assert element_key(MdTable(rows)) is None
+    assert element_key(MdTable(iter(rows[:1]))) is None
+
+    with DiskRenderCache(tmp_path / "cache.sqlite") as cache:
+        text = Mdfier.stringify([MdQuote(MdTable(rows))], disk_cache=cache)
+        assert text.endswith(f"> | {MAX_TABLE_ROWS} |")
+        assert (cache.uncacheable, len(cache)) == (1, 0)
+
+
+def test_mdfy_write_with_disk_cache(tmp_path: Path) -> None:
+    path = tmp_path / "output.md"
+    with DiskRenderCache(tmp_path / "cache.sqlite") as cache:
+        Mdfier(path, disk_cache=cache).write(_contents())
+        assert (cache.hits, cache.misses) == (0, 3)
+        assert len(cache) == 3
+    first = path.read_text(encoding="utf-8")
+
+    with DiskRenderCache(tmp_path / "cache.sqlite") as cache:
+        Mdfier(path, disk_cache=cache).write(_contents())
+        assert (cache.hits, cache.misses) == (3, 0)
+        assert cache.hit_rate == 1.0
+    assert path.read_text(encoding="utf-8") == first
+    assert first == Mdfier.stringify(_contents()) + "\n"
+
+
+def test_evicts_least_recently_used(tmp_path: Path) -> None:
+    with DiskRenderCache(tmp_path / "cache.sqlite", max_bytes=25) as cache:
+        for word in ("first", "second", "third"):
+            Mdfier.stringify([MdText(f"[{word} word:bold]")], disk_cache=cache)
+
+        assert len(cache) == 1
+        assert cache.size <= 25
+        assert Mdfier.stringify([MdText("[third word:bold]")], disk_cache=cache)
+        assert cache.hits == 1
+
+
+def test_flushes_pending_renderings(tmp_path: Path) -> None:
+    with DiskRenderCache(tmp_path / "cache.sqlite", max_pending=20) as cache:
+        parts: list[str] = []
+        for i in range(2):
+            cache.render_into(MdText(f"[text {i}:bold]"), parts.append)
+        assert len(cache) == 0
+
+        # The third rendering exceeds the 20 characters of max_pending
+        cache.render_into(MdText("[text 2:bold]"), parts.append)
+        assert len(cache) == 3
+        assert not cache._pending
+
+
+def _write_documents(path: str, worker: int) -> int:
+    with DiskRenderCache(path) as cache:
+        for i in range(20):
+            Mdfier.stringify(
+                [MdText(f"[shared {i}:bold]"), MdText(f"[worker {worker}:italic]")],
+                disk_cache=cache,
+            )
+        return cache.hits + cache.misses
+
+
+def test_parallel_writers(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite")
+    with ProcessPoolExecutor(4) as executor:
+        lookups = list(executor.map(_write_documents, [path] * 4, range(4)))
+
+    assert lookups == [40] * 4
+    with DiskRenderCache(path) as cache:
+        assert len(cache) == 20 + 4
@@ -1,3 +1,6 @@
+import io
+from pathlib import Path
+
 from mdfy import MdCode
 
 
@@ -33,3 +36,31 @@ def test_mdcode_inline_override_with_newline() -> None:
     code = MdCode(code_content, inline=True)
     expected = "```\nprint('Hello, World!')\nprint('MDFY!')\n```"
     assert str(code) == expected
+
+
+def test_mdcode_fence_longer_than_backtick_runs() -> None:
+    code = MdCode("```python\nprint(1)\n```", syntax="markdown")
+    assert str(code) == "````markdown\n```python\nprint(1)\n```\n````"
+
+
+def test_mdcode_from_file(tmp_path: Path) -> None:
+    path = tmp_path / "app.log"
+    path.write_text("line 1\n`````\nline 3\n", encoding="utf-8")
+    code = MdCode.from_file(path, syntax="text")
+    expected = "``````text\nline 1\n`````\nline 3\n``````"
+    assert str(code) == expected
+
+    file = io.StringIO()
+    code.write_to(file)
+    assert file.getvalue() == expected
+
+    # Files without a final newline, and empty files
+    path.write_text("no newline", encoding="utf-8")
+    file = io.StringIO()
+    code.write_to(file)
+    assert file.getvalue() == str(code) == "```text\nno newline\n```"
+
+    path.write_text("", encoding="utf-8")
+    file = io.StringIO()
+    code.write_to(file)
+    assert file.getvalue() == str(code) == "```text\n\n```"
@@ -1,4 +1,7 @@
+import base64
+import io
 import logging
+from pathlib import Path
 
 import pytest
 from _pytest.logging import LogCaptureFixture
@@ -44,3 +47,92 @@ def test_image_with_none_src(caplog: LogCaptureFixture) -> None:
         logging.WARNING,
         "Image source is None, setting to empty string",
     ) in caplog.record_tuples
+
+
+def test_embed_image(tmp_path: Path) -> None:
+    data = bytes(range(256)) * 1000
+    path = tmp_path / "image.png"
+    path.write_bytes(data)
+
+    image = MdImage.embed(path, alt="Embedded")
+    expected = (
+        "![Embedded](data:image/png;base64,"
+        + base64.b64encode(data).decode("ascii")
+        + ")"
+    )
+    assert str(image) == expected
+
+    buffer = io.StringIO()
+    image.write_to(buffer)
+    assert buffer.getvalue() == expected
+
+
+def test_embed_large_image_is_streamed(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from mdfy.elements._embed import EMBED_CACHE
+
+    monkeypatch.setattr(EMBED_CACHE, "max_file_size", 10)
+    data = b"x" * 1000
+    path = tmp_path / "image.svg"
+    path.write_bytes(data)
+
+    image = MdImage.embed(path, mime_type="image/svg+xml")
+    assert str(image) == (
+        "![](data:image/svg+xml;base64," + base64.b64encode(data).decode() + ")"
+    )
+
+
+def test_embed_reference_image(tmp_path: Path) -> None:
+    path = tmp_path / "image.bin"
+    path.write_bytes(b"abc")
+
+    image = MdImage.embed(path, alt="Ref", reference=True)
+    assert image.label is not None
+    assert str(image) == f"![Ref][{image.label}]"
+    assert (
+        image.definition()
+        == f"[{image.label}]: data:application/octet-stream;base64,YWJj"
+    )
+
+    with pytest.raises(ValueError):
+        MdImage("https://example.com/image.png").definition()
+
+
+def test_reference_image_registered_when_rendered(tmp_path: Path) -> None:
+    from mdfy import Mdfier, MdQuote
+    from mdfy.elements._embed import REFERENCE_IMAGES
+
+    path = tmp_path / "image.bin"
+    path.write_bytes(b"abc")
+    image = MdImage.embed(path, alt="Ref")
+    image.reference = True
+
+    label = image.label
+    assert image not in REFERENCE_IMAGES
+    rendered = Mdfier.stringify([MdQuote(image)])
+    assert image in REFERENCE_IMAGES
+    assert rendered.endswith(f"[{label}]: data:application/octet-stream;base64,YWJj")
+
+
+def test_embed_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    from mdfy.elements._embed import EmbedCache
+
+    cache = EmbedCache(max_bytes=8, max_digests=2)
+    paths = []
+    for i, content in enumerate((b"abc", b"def", b"ghi")):
+        paths.append(tmp_path / f"{i}.bin")
+        paths[-1].write_bytes(content)
+
+    parts: list[str] = []
+    for path in paths:
+        cache.render_base64(path, parts.append)
+    assert parts == ["YWJj", "ZGVm", "Z2hp"]
+    assert len(cache._digests) == 2
+    assert list(cache._encodings.values()) == ["ZGVm", "Z2hp"]
+    assert cache._size == 8
+
+    # Cached encodings are reused, the least recently used one being evicted
+    cache.render_base64(paths[1], parts.append)
+    cache.render_base64(paths[0], parts.append)
+    assert list(cache._encodings.values()) == ["ZGVm", "YWJj"]
@@ -1,6 +1,9 @@
+import io
+from typing import Any
+
 import pytest
 
-from mdfy import MdList, MdText
+from mdfy import MdList, MdQuote, MdText
 
 TEST_CASES = [
     {
@@ -55,3 +58,120 @@ def test_md_list(test_data: dict) -> None:
 
     md_list = MdList(items, numbered=numbered, indent=indent)
     assert str(md_list) == expected_output
+
+
+def test_md_list_preview() -> None:
+    md_list = MdList(["A", ["A1", "A2"], "B", "C", "D"], numbered=True, indent=2)
+    assert md_list.preview(head=2, tail=1) == (
+        "1. A\n" "  1. A1\n" "  1. A2\n" "1. B\n" "1. ... (1 item omitted)\n" "1. D"
+    )
+    assert md_list._repr_markdown_() == str(md_list)
+
+
+def test_md_list_preview_keeps_children_with_their_items() -> None:
+    items = ["A", ["A1", "A2"], "B", ["B1"], "C", "D", ["D1"]]
+    assert MdList(items).preview(head=1, tail=2) == (
+        "- A\n"
+        "    - A1\n"
+        "    - A2\n"
+        "- ... (1 item omitted)\n"
+        "- C\n"
+        "- D\n"
+        "    - D1"
+    )
+    md_list = MdList(iter(items), numbered=True, sequential=True, indent=2)
+    assert md_list.preview(head=2, tail=1) == (
+        "1. A\n"
+        "  1. A1\n"
+        "  2. A2\n"
+        "2. B\n"
+        "  1. B1\n"
+        "3. ... (1 item omitted)\n"
+        "4. D\n"
+        "  1. D1"
+    )
+    assert MdList(items).preview(head=2, tail=2) == str(MdList(items))
+
+
+def test_md_list_sequential() -> None:
+    md_list = MdList(
+        ["A", ["A1", "A2", ["A2a"]], "B", "C"], numbered=True, sequential=True, indent=2
+    )
+    assert str(md_list) == (
+        "1. A\n" "  1. A1\n" "  2. A2\n" "    1. A2a\n" "2. B\n" "3. C"
+    )
+    assert md_list.preview(head=1, tail=1) == (
+        "1. A\n"
+        "  1. A1\n"
+        "  2. A2\n"
+        "    1. A2a\n"
+        "2. ... (1 item omitted)\n"
+        "3. C"
+    )
+
+
+def test_md_list_deeply_nested() -> None:
+    items: list = ["leaf"]
+    for depth in range(5000):
+        items = [f"level {depth}", items]
+    md_list = MdList(items, indent=1)
+
+    lines = md_list.iter_lines()
+    assert next(lines) == "- level 4999"
+    assert next(lines) == " - level 4998"
+
+    output = str(md_list)
+    assert output.endswith("\n" + " " * 5000 + "- leaf")
+
+    file = io.StringIO()
+    md_list.write_to(file)
+    assert file.getvalue() == output
+
+
+def test_md_list_mapping_and_children() -> None:
+    tree = {"a": {"a1": None, "a2": ["x", "y"]}, "b": 1, "c": {}}
+    assert str(MdList(tree, indent=2)) == (
+        "- a\n" "  - a1\n" "  - a2\n" "    - x\n" "    - y\n" "- b: 1\n" "- c"
+    )
+
+    expanded = []
+
+    def children(node: int) -> list:
+        expanded.append(node)
+        return [node * 10 + i for i in range(3)] if node < 100 else []
+
+    md_list = MdList([1, 2], children=children, max_depth=1, indent=2)
+    assert str(md_list) == (
+        "- 1\n" "  - 10\n" "  - 11\n" "  - 12\n" "- 2\n" "  - 20\n" "  - 21\n" "  - 22"
+    )
+    # Items below the maximum depth are not expanded
+    assert expanded == [1, 2]
+
+    # Generators of children are consumed lazily and cut after max_items
+    def numbers() -> Any:
+        i = 0
+        while True:
+            yield i
+            i += 1
+
+    md_list = MdList(["n", numbers()], numbered=True, sequential=True, max_items=4)
+    assert str(md_list) == (
+        "1. n\n" "    1. 0\n" "    2. 1\n" "    3. 2\n" "    4. ..."
+    )
+    assert MdList({"k": list(range(5)), "l": 1, "m": 2}).preview(head=1, tail=1) == (
+        "- k\n"
+        "    - 0\n"
+        "    - 1\n"
+        "    - 2\n"
+        "    - 3\n"
+        "    - 4\n"
+        "- ... (1 item omitted)\n"
+        "- m: 2"
+    )
+
+
+def test_md_list_multi_line_element_items() -> None:
+    md_list = MdList(
+        ["A", MdQuote("quoted\nlines"), "C"], numbered=True, sequential=True, indent=2
+    )
+    assert str(md_list) == "1. A\n2. > quoted\n   > lines\n3. C"
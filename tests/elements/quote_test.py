@@ -1,4 +1,7 @@
-from mdfy import MdQuote, MdText
+import io
+from pathlib import Path
+
+from mdfy import MdCode, MdQuote, MdTable, MdText
 
 
 def test_mdquote_with_simple_string() -> None:
@@ -24,3 +27,24 @@ def test_mdquote_with_md_element() -> None:
 def test_mdquote_with_empty_string() -> None:
     quote = MdQuote("")
     assert str(quote) == "> "
+
+
+def test_mdquote_nested_with_table_and_code(tmp_path: Path) -> None:
+    table = MdTable([{"a": 1}, {"a": 2}])
+    quote = MdQuote(MdQuote(table))
+    assert str(quote) == "> > | a |\n> > | --- |\n> > | 1 |\n> > | 2 |"
+
+    path = tmp_path / "script.py"
+    path.write_text("print(1)\n\nprint(2)\n", encoding="utf-8")
+    quote = MdQuote(MdCode.from_file(path, syntax="python"))
+    expected = "> ```python\n> print(1)\n> \n> print(2)\n> ```"
+    assert str(quote) == expected
+
+    file = io.StringIO()
+    quote.write_to(file)
+    assert file.getvalue() == expected
+
+
+def test_mdquote_line_breaks() -> None:
+    assert str(MdQuote("a\r\nb\n\n")) == "> a\n> b\n> "
+    assert str(MdQuote(MdText(""))) == "> "
@@ -1,6 +1,12 @@
+import io
+import sqlite3
+from pathlib import Path
+from typing import Any
+
 import pytest
 
 from mdfy import MdTable
+from mdfy.elements.table import TableData
 
 
 # Test initialization with dictionary
@@ -137,3 +143,484 @@ def test_mdtext_integration() -> None:
 def test_invalid_input() -> None:
     with pytest.raises(ValueError):
         MdTable("invalid input")  # type: ignore
+
+
+# Test keys that only appear after the first row
+def test_union_of_keys() -> None:
+    data = [{"name": "John", "age": 30}, {"name": "Jane", "city": "Tokyo"}]
+    table = MdTable(data)
+    expected_output = (
+        "| name | age | city |\n"
+        "| --- | --- | --- |\n"
+        "| John | 30 |  |\n"
+        "| Jane |  | Tokyo |"
+    )
+    assert str(table) == expected_output
+
+
+# Test nested rows whose layout changes between rows
+def test_flatten_mixed_layouts() -> None:
+    data = [
+        {"user": {"name": "John", "age": 30}},
+        {"user": {"name": "Jane", "age": {"years": 25}}},
+        {"user": {"name": "Doe", "age": 40}},
+        {"user": "unknown"},
+    ]
+    table = MdTable(data)
+    expected_output = (
+        "| user.name | user.age | user.age.years | user |\n"
+        "| --- | --- | --- | --- |\n"
+        "| John | 30 |  |  |\n"
+        "| Jane |  | 25 |  |\n"
+        "| Doe | 40 |  |  |\n"
+        "|  |  |  | unknown |"
+    )
+    assert str(table) == expected_output
+
+
+# Test nested rows spanning several extraction batches
+def test_flatten_many_rows() -> None:
+    data = [{"id": i, "stats": {"score": i * 2}} for i in range(3000)]
+    data[2500]["extra"] = "late"
+    lines = str(MdTable(data)).splitlines()
+    assert lines[0] == "| id | stats.score | extra |"
+    assert lines[2] == "| 0 | 0 |  |"
+    assert lines[2 + 2500] == "| 2500 | 5000 | late |"
+    assert len(lines) == 3002
+
+
+# Test that TableData keeps later keys without flattening
+def test_table_data_from_dict_list_union() -> None:
+    data = [{"a": 1}, {"a": 2, "b": {"c": 3}}]
+    table_data = TableData.from_dict_list(data)
+    assert table_data.header == ["a", "b"]
+    assert list(table_data.values) == [(1, ""), (2, {"c": 3})]
+
+
+# Test that construction keeps the given rows without copying them
+def test_construction_is_lazy() -> None:
+    data = [{"name": "John", "age": 30}]
+    table = MdTable(data)
+    assert table.data is data
+    data.append({"name": "Jane", "age": 25})
+    assert str(table).endswith("| Jane | 25 |")
+
+
+# Test that the deprecated transposition is a view on the original values
+def test_table_data_transpose_view() -> None:
+    table_data = TableData(
+        header=["name", "age"], row_labels=[], values=[("John", 30), ("Jane", 25)]
+    )
+    with pytest.warns(DeprecationWarning):
+        transposed = table_data.transpose()
+    assert not isinstance(transposed.values, list)
+    assert len(transposed.values) == 2  # type: ignore[arg-type]
+    assert list(transposed.values) == [("John", "Jane"), (30, 25)]
+    assert transposed.values[-1] == (30, 25)  # type: ignore[index]
+    assert transposed.header == ["", ""]
+    assert transposed.row_labels == ["name", "age"]
+
+
+# Test per-column formats
+def test_column_formats() -> None:
+    import datetime
+
+    data = [
+        {
+            "item": "Laptop",
+            "sales": 1234567.891,
+            "growth": 0.153,
+            "date": datetime.date(2024, 1, 31),
+            "ratio": 0.5,
+        },
+        {"item": "Phone", "sales": 800, "growth": "", "date": "n/a", "ratio": 2},
+    ]
+    table = MdTable(
+        data,
+        precision=1,
+        formats={
+            "item": str.upper,
+            "sales": ",.2f",
+            "growth": ".1%",
+            "date": "%Y/%m/%d",
+        },
+    )
+    expected_output = (
+        "| item | sales | growth | date | ratio |\n"
+        "| --- | --- | --- | --- | --- |\n"
+        "| LAPTOP | 1,234,567.89 | 15.3% | 2024/01/31 | 0.5 |\n"
+        "| PHONE | 800.00 |  | n/a | 2 |"
+    )
+    assert str(table) == expected_output
+
+
+# Test per-column formats on a transposed table with nested keys
+def test_column_formats_transposed() -> None:
+    data = [{"stats": {"score": 0.25, "count": 1200}}]
+    table = MdTable(
+        data, transpose=True, formats={"stats.score": ".0%", "stats.count": ","}
+    )
+    # fmt: off
+    expected_output = (
+        "| | |\n"
+        "| --- | --- |\n"
+        "| stats.score | 25% |\n"
+        "| stats.count | 1,200 |"
+    )
+    # fmt: on
+    assert str(table) == expected_output
+
+
+# Test that parallel rendering matches the serial renderer
+def test_parallel_rendering_matches_serial() -> None:
+    data = [
+        {"id": i, "score": i / 7, "name": f"row {i}", "stats": {"big": 2**40 + i}}
+        for i in range(5000)
+    ]
+    data[4000]["late"] = True
+    labels = [f"r{i}" for i in range(4500)]
+    kwargs = {"row_labels": labels, "precision": 3, "formats": {"stats.big": ","}}
+
+    serial = str(MdTable(data, **kwargs))  # type: ignore[arg-type]
+    parallel = str(MdTable(data, workers=2, **kwargs))  # type: ignore[arg-type]
+    assert parallel == serial
+
+
+# Test tables streamed from a CSV file
+def test_from_csv(tmp_path: Path) -> None:
+    path = tmp_path / "sales.csv"
+    path.write_text("item,price,qty\nPen,1.5,3\nBook,,1\nLamp,20\n", encoding="utf-8")
+
+    table = MdTable.from_csv(path, types={"price": float}, precision=2)
+    expected_output = (
+        "| item | price | qty |\n"
+        "| --- | --- | --- |\n"
+        "| Pen | 1.50 | 3 |\n"
+        "| Book |  | 1 |\n"
+        "| Lamp | 20.00 |  |"
+    )
+    assert str(table) == expected_output
+    # Tables read from a path can be rendered again
+    assert str(table) == expected_output
+
+    table = MdTable.from_csv(path, columns=["qty", "item"], limit=2)
+    expected_output = (
+        "| qty | item |\n" "| --- | --- |\n" "| 3 | Pen |\n" "| 1 | Book |"
+    )
+    assert str(table) == expected_output
+
+    with pytest.raises(ValueError):
+        str(MdTable.from_csv(path, columns=["missing"]))
+
+
+# Test tables streamed from a TSV file object
+def test_from_csv_tsv() -> None:
+    source = io.StringIO("a\tb\n" + "".join(f"{i}\t{i * 2}\n" for i in range(3000)))
+    table = MdTable.from_csv(source, delimiter="\t", types={"a": int, "b": int})
+    lines = str(table).split("\n")
+    assert lines[:3] == ["| a | b |", "| --- | --- |", "| 0 | 0 |"]
+    assert lines[-1] == "| 2999 | 5998 |"
+    assert len(lines) == 3002
+
+
+# Test tables streamed from a JSON Lines file
+def test_from_jsonl() -> None:
+    source = io.StringIO(
+        '{"name": "John", "stats": {"age": 30}}\n'
+        "\n"
+        '{"name": "Jane", "stats": {"age": 25}, "city": "Paris"}\n'
+        '{"name": "Jim", "stats": {"age": 41}}\n'
+    )
+    table = MdTable.from_jsonl(source, columns=["stats.age", "city"], limit=2)
+    expected_output = (
+        "| stats.age | city |\n" "| --- | --- |\n" "| 30 |  |\n" "| 25 | Paris |"
+    )
+    assert str(table) == expected_output
+
+
+# Test that generators are streamed with the columns of their first rows
+def test_generator_source() -> None:
+    rows = ({"id": i, "square": i * i} for i in range(3))
+    table = MdTable(rows, row_labels=["a", "b"])
+    expected_output = (
+        "| | id | square |\n"
+        "| --- | --- | --- |\n"
+        "| a | 0 | 0 |\n"
+        "| b | 1 | 1 |\n"
+        "| 2 | 4 |"
+    )
+    assert str(table) == expected_output
+
+    # Keys first appearing after the first batch of rows are not shown
+    def rows_with_late_key() -> Any:
+        yield from ({"id": i} for i in range(1024))
+        yield {"id": 1024, "late": True}
+
+    lines = str(MdTable(rows_with_late_key())).split("\n")
+    assert lines[0] == "| id |"
+    assert lines[-1] == "| 1024 |"
+
+
+# Test that write_to matches the string representation
+def test_write_to() -> None:
+    data = [{"a": i, "b": {"c": i / 3}} for i in range(2500)]
+    data[2000]["d"] = "late"
+    file = io.StringIO()
+    MdTable(data, precision=2).write_to(file)
+    assert file.getvalue() == str(MdTable(data, precision=2))
+
+    file = io.StringIO()
+    MdTable(iter(data), precision=2).write_to(file)
+    assert file.getvalue() == str(MdTable(iter(data), precision=2))
+
+
+# Test tables streamed from a DB-API cursor
+def test_from_cursor() -> None:
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE sales (item TEXT, price REAL, qty INTEGER)")
+    connection.executemany(
+        "INSERT INTO sales VALUES (?, ?, ?)",
+        [(f"item {i}", i / 4, i) for i in range(2500)],
+    )
+
+    cursor = connection.execute("SELECT * FROM sales ORDER BY qty")
+    lines = str(MdTable.from_cursor(cursor, batch_size=100, precision=1)).split("\n")
+    assert lines[:3] == [
+        "| item | price | qty |",
+        "| --- | --- | --- |",
+        "| item 0 | 0.0 | 0 |",
+    ]
+    assert lines[-1] == "| item 2499 | 624.8 | 2499 |"
+    assert len(lines) == 2502
+
+    cursor = connection.execute("SELECT * FROM sales ORDER BY qty")
+    table = MdTable.from_cursor(cursor, batch_size=2, columns=["qty", "item"], limit=3)
+    expected_output = (
+        "| qty | item |\n"
+        "| --- | --- |\n"
+        "| 0 | item 0 |\n"
+        "| 1 | item 1 |\n"
+        "| 2 | item 2 |"
+    )
+    assert str(table) == expected_output
+
+    # Empty result sets render nothing
+    cursor = connection.execute("SELECT * FROM sales WHERE qty < 0")
+    assert str(MdTable.from_cursor(cursor)) == ""
+
+    with pytest.raises(ValueError):
+        str(MdTable.from_cursor(connection.execute("DELETE FROM sales")))
+
+
+# Test sorting with limit and offset on lists and generators
+def test_sort_limit_offset() -> None:
+    data = [
+        {"name": "a", "stats": {"score": 3}},
+        {"name": "b", "stats": {"score": 1}},
+        {"name": "c"},
+        {"name": "d", "stats": {"score": 3}},
+        {"name": "e", "stats": {"score": 2}},
+    ]
+    expected_output = (
+        "| | name | stats.score |\n"
+        "| --- | --- | --- |\n"
+        "| first | a | 3 |\n"
+        "| second | d | 3 |"
+    )
+    for source in (data, iter(data)):
+        table = MdTable(
+            source,
+            sort_by="stats.score",
+            descending=True,
+            limit=2,
+            row_labels=["first", "second"],
+        )
+        assert str(table) == expected_output
+
+    # Rows without a value are placed last
+    table = MdTable(data, sort_by="stats.score", offset=2)
+    expected_output = (
+        "| name | stats.score |\n"
+        "| --- | --- |\n"
+        "| a | 3 |\n"
+        "| d | 3 |\n"
+        "| c |  |"
+    )
+    assert str(table) == expected_output
+
+    assert str(MdTable(data, sort_by="stats.score", limit=0)) == ""
+
+
+# Test sorting by a column holding values that cannot be compared
+def test_sort_mixed_types() -> None:
+    data = [{"n": 1}, {"n": None}, {"n": "n/a"}, {"n": 2}]
+    for limit in (None, 2):
+        with pytest.raises(ValueError, match="Cannot sort by column 'n'"):
+            str(MdTable(data, sort_by="n", limit=limit))
+
+    source = io.StringIO("n\n2\nn/a\n1\n")
+    table = MdTable.from_csv(source, types={"n": int}, sort_by="n")
+    with pytest.raises(ValueError, match="Cannot sort by column 'n'"):
+        str(table)
+
+
+# Test that a limit stops reading a generator
+def test_limit_stops_reading() -> None:
+    read = 0
+
+    def rows() -> Any:
+        nonlocal read
+        for i in range(100_000):
+            read += 1
+            yield {"i": i}
+
+    lines = str(MdTable(rows(), offset=10, limit=3)).split("\n")
+    assert lines[2:] == ["| 10 |", "| 11 |", "| 12 |"]
+    assert read < 3 * 1024
+
+
+# Test column projection with dotted paths
+def test_column_projection() -> None:
+    data: list[dict[str, Any]] = [
+        {"id": 1, "user": {"name": "Ann", "tags": {"a": 1}}, "other": {"x": 1}},
+        {"id": 2, "user": {"name": "Bob"}},
+        {"id": 3, "user": "deleted"},
+        {"id": 4, "user.name": "Dotted"},
+        {"id": 5, "user": {"name": {"first": "Nested"}}},
+    ]
+    table = MdTable(data, columns=["user.name", "id", "missing"])
+    expected_output = (
+        "| user.name | id | missing |\n"
+        "| --- | --- | --- |\n"
+        "| Ann | 1 |  |\n"
+        "| Bob | 2 |  |\n"
+        "|  | 3 |  |\n"
+        "| Dotted | 4 |  |\n"
+        "|  | 5 |  |"
+    )
+    assert str(table) == expected_output
+
+    # Many rows sharing a layout, with one row lacking a selected key
+    rows = [{"a": {"b": i, "c": -i}, "d": i} for i in range(3000)]
+    del rows[1500]["a"]["b"]
+    lines = str(MdTable(rows, columns=["d", "a.b"])).split("\n")
+    assert lines[2] == "| 0 | 0 |"
+    assert lines[1502] == "| 1500 |  |"
+    assert lines[-1] == "| 2999 | 2999 |"
+
+    table = MdTable(data[:2], columns=["user.name"], transpose=True)
+    assert str(table) == "| | | |\n| --- | --- | --- |\n| user.name | Ann | Bob |"
+
+    table_data = TableData.from_dict_list(data[:2], columns=["id"])
+    assert table_data.header == ["id"]
+    assert list(table_data.values) == [(1,), (2,)]
+
+
+# Test column projection of a streamed source
+def test_column_projection_source() -> None:
+    source = io.StringIO("a,b,c\n1,2,3\n")
+    table = MdTable.from_csv(source, columns=["c", "a"], limit=1)
+    assert str(MdTable(list(table.data), columns=["a"])) == "| a |\n| --- |\n| 1 |"
+
+    table = MdTable.from_csv(io.StringIO("a,b,c\n1,2,3\n"), columns=["c", "b"])
+    assert str(MdTable(table.data, columns=["b"])) == "| b |\n| --- |\n| 2 |"
+
+
+# Test sorting by a column that is not selected
+def test_column_projection_sort_by_unselected() -> None:
+    data = [{"name": "a", "score": 1}, {"name": "b", "score": 3}]
+    expected_output = "| name |\n| --- |\n| b |\n| a |"
+    for source in (data, iter(data)):
+        table = MdTable(source, columns=["name"], sort_by="score", descending=True)
+        assert str(table) == expected_output
+
+    source = io.StringIO("name,score\na,1\nb,3\n")
+    table = MdTable.from_csv(source, columns=["name"], sort_by="score", descending=True)
+    assert str(table) == expected_output
+
+
+# Test splitting a table into per-group subtables
+def test_group_by() -> None:
+    data = [
+        {"team": {"region": "EU"}, "name": f"n{i}", "score": i / 4}
+        for i in range(0, 9, 2)
+    ] + [
+        {"team": {"region": "US"}, "name": f"n{i}", "score": i / 4}
+        for i in range(1, 9, 2)
+    ]
+    table = MdTable(
+        data, columns=["name", "score"], formats={"score": ".2f"}, row_labels=["x"]
+    )
+
+    elements = table.group_by("team.region", level=3)
+    assert [str(e) for e in elements[::2]] == ["### EU", "### US"]
+    assert str(elements[3]) == (
+        "| name | score |\n"
+        "| --- | --- |\n"
+        "| n1 | 0.25 |\n"
+        "| n3 | 0.75 |\n"
+        "| n5 | 1.25 |\n"
+        "| n7 | 1.75 |"
+    )
+
+    # Sorting and limits apply per group
+    top = MdTable(data, columns=["name"], sort_by="score", descending=True, limit=1)
+    assert [str(e) for e in top.group_by("team.region")[1::2]] == [
+        "| name |\n| --- |\n| n8 |",
+        "| name |\n| --- |\n| n7 |",
+    ]
+
+    # Callable keys and streamed data
+    elements = MdTable(iter(data), columns=["name"]).group_by(
+        lambda row: len(row["name"])
+    )
+    assert [str(e) for e in elements] == ["## 2", str(MdTable(data, columns=["name"]))]
+
+
+# Test that spilling groups to disk renders the same tables
+def test_group_by_spill() -> None:
+    data = [{"group": i % 7, "value": i} for i in range(5000)]
+    in_memory = MdTable(data).group_by("group")
+    spilled = MdTable(iter(data)).group_by("group", spill=True, buffer_size=100)
+    assert [str(e) for e in spilled] == [str(e) for e in in_memory]
+    # Spilled groups can be rendered again
+    assert str(spilled[1]) == str(in_memory[1])
+
+
+# Test previews of the first and last rows
+def test_preview() -> None:
+    data = [{"i": i, "half": i / 2} for i in range(100)]
+    labels = [f"r{i}" for i in range(100)]
+    expected_output = (
+        "| | i | half |\n"
+        "| --- | --- | --- |\n"
+        "| r0 | 0 | 0.0 |\n"
+        "| ... (97 rows omitted) | ... | ... |\n"
+        "| r98 | 98 | 49.0 |\n"
+        "| r99 | 99 | 49.5 |"
+    )
+    table = MdTable(data, row_labels=labels, precision=1)
+    assert table.preview(head=1, tail=2) == expected_output
+    assert table._repr_markdown_() == table.preview()
+    # Streamed data gives the same preview
+    table = MdTable(iter(data), row_labels=labels, precision=1)
+    assert table.preview(head=1, tail=2) == expected_output
+
+    # Small tables are shown in full
+    assert MdTable(data[:5]).preview() == str(MdTable(data[:5]))
+    assert MdTable(iter(data[:5])).preview(head=3, tail=2) == str(MdTable(data[:5]))
+
+    # Sorting and limits apply before the preview
+    table = MdTable(data, columns=["i"], sort_by="i", descending=True, limit=10)
+    assert table.preview(head=1, tail=1) == (
+        "| i |\n| --- |\n| 99 |\n| ... (8 rows omitted) |\n| 90 |"
+    )
+    table = MdTable(data, columns=["i"], offset=5, limit=10)
+    assert (
+        table.preview(head=1, tail=0)
+        == "| i |\n| --- |\n| 5 |\n| ... (9 rows omitted) |"
+    )
+
+    # A preview without rows would have no columns
+    with pytest.raises(ValueError):
+        table.preview(head=0, tail=0)
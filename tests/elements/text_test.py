@@ -95,3 +95,10 @@ def test_text_with_bracket_but_no_style(input_text: str, expected_output: str) -
 def test_fallback_when_parse_error(input_text: str, expected_output: str) -> None:
     text = MdText(input_text)
     assert str(text) == expected_output
+
+
+def test_texts_share_default_formatter() -> None:
+    first, second = MdText("[a:bold]"), MdText("[b:italic]")
+    assert first.formatter is not None
+    assert first.formatter is second.formatter
+    assert (str(first), str(second)) == ("**a**", "*b*")
@@ -1,7 +1,25 @@
+import pickle
 import tempfile
 from pathlib import Path
 
-from mdfy import Mdfier, MdHeader, MdText, MdLink, MdElement
+import pytest
+
+from mdfy import (
+    DedupReport,
+    LinkReferences,
+    Mdfier,
+    MdCode,
+    MdHeader,
+    MdHorizontal,
+    MdImage,
+    MdList,
+    MdQuote,
+    MdTable,
+    MdTableOfContents,
+    MdText,
+    MdLink,
+    MdElement,
+)
 
 
 def test_mdfy_write() -> None:
@@ -78,3 +96,272 @@ def test_mdfy_nested_contents() -> None:
             assert lines[2] == "This is another nested content.\n"
             assert lines[3] == "[Click me!](url)\n"
             assert lines[4] == "This is a simple text.\n"
+
+
+def test_mdfy_write_streamed_table() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = Path(tmp_dir, "data.csv")
+        csv_path.write_text("x,y\n1,2\n3,4\n", encoding="utf-8")
+        tmp_output_path = Path(tmp_dir, "output.md")
+        contents = [MdHeader("Data"), MdTable.from_csv(csv_path), MdText("End")]
+        Mdfier(tmp_output_path).write(contents)
+
+        assert tmp_output_path.read_text(encoding="utf-8") == (
+            "# Data\n| x | y |\n| --- | --- |\n| 1 | 2 |\n| 3 | 4 |\nEnd\n"
+        )
+        assert Mdfier.stringify(contents) + "\n" == tmp_output_path.read_text(
+            encoding="utf-8"
+        )
+
+
+def test_mdfy_write_reference_images() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        logo = Path(tmp_dir, "logo.png")
+        logo.write_bytes(b"\x89PNG")
+        copy = Path(tmp_dir, "copy.png")
+        copy.write_bytes(b"\x89PNG")
+        image = MdImage.embed(logo, alt="Logo", reference=True)
+        contents = [
+            image,
+            MdText("Text"),
+            MdImage.embed(copy, alt="Copy", reference=True),
+        ]
+        label = image.label
+        expected = (
+            f"![Logo][{label}]\nText\n![Copy][{label}]\n\n"
+            f"[{label}]: data:image/png;base64,iVBORw==\n"
+        )
+
+        tmp_output_path = Path(tmp_dir, "output.md")
+        Mdfier(tmp_output_path).write(contents)
+
+        assert tmp_output_path.read_text(encoding="utf-8") == expected
+        assert Mdfier.stringify(contents) + "\n" == expected
+
+
+def test_mdfy_write_nested_reference_images() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        logo = Path(tmp_dir, "logo.png")
+        logo.write_bytes(b"\x89PNG")
+        image = MdImage.embed(logo, alt="Logo", reference=True)
+        contents = [
+            MdQuote(image),
+            MdList(["item", [image]]),
+            MdTable([{"logo": image}]),
+        ]
+        label = image.label
+        definition = f"[{label}]: data:image/png;base64,iVBORw=="
+
+        rendered = Mdfier.stringify(contents)
+        assert rendered.count(f"![Logo][{label}]") == 3
+        assert rendered.endswith(f"\n\n{definition}")
+        assert rendered.count(definition) == 1
+
+
+def test_mdfy_write_reference_links() -> None:
+    url = "https://example.com/dependencies/some-package/versions/1.2.3"
+    contents = [
+        MdLink(url, "a", title="pkg"),
+        MdLink("https://example.com/short", "short"),
+        MdLink(url, "b", title="pkg"),
+        MdImage(url),
+        MdLink(url, "c", title="pkg"),
+    ]
+    inline = Mdfier.stringify(contents) + "\n"
+    expected = (
+        "[a][1]\n"
+        "[short](https://example.com/short)\n"
+        "[b][1]\n"
+        f"![]({url})\n"
+        "[c][1]\n"
+        "\n"
+        f'[1]: {url} "pkg"\n'
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_output_path = Path(tmp_dir, "output.md")
+        mdfier = Mdfier(tmp_output_path, reference_links=True)
+        mdfier.write(contents)
+
+        assert tmp_output_path.read_text(encoding="utf-8") == expected
+        assert mdfier.link_references is not None
+        assert mdfier.link_references.bytes_saved == len(inline) - len(expected)
+    assert Mdfier.stringify(contents, reference_links=True) + "\n" == expected
+
+
+def test_mdfy_reference_links_continue_across_writes() -> None:
+    first, second = "https://example.com/first", "https://example.com/second"
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_output_path = Path(tmp_dir, "output.md")
+        with Mdfier(tmp_output_path, reference_links=True) as mdfier:
+            mdfier.write([MdLink(first, "1"), MdLink(first, "2"), MdLink(first, "3")])
+            mdfier.write(
+                [MdLink(second, "4"), MdLink(second, "5"), MdLink(second, "6")]
+            )
+
+        text = tmp_output_path.read_text(encoding="utf-8")
+    assert f"[1]: {first}\n" in text
+    assert f"[2]: {second}\n" in text
+    assert "[4][2]" in text
+
+
+def test_mdfy_reference_links_shared_across_writes() -> None:
+    url = "https://example.com/dependencies/some-package/versions/1.2.3"
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_output_path = Path(tmp_dir, "output.md")
+        with Mdfier(tmp_output_path, reference_links=True) as mdfier:
+            mdfier.write([MdLink(url, "a"), MdLink(url, "b")])
+            mdfier.write(MdLink(url, "c"))
+            mdfier.write([MdText("End"), MdLink(url, "d")])
+            mdfier.flush()
+            mdfier.write(MdLink(url, "e"))
+
+        assert tmp_output_path.read_text(encoding="utf-8") == (
+            f"[a][1]\n[b][1]\n[c][1]\nEnd\n[d][1]\n\n[1]: {url}\n[e][1]\n"
+        )
+
+        # A target used once per write is labelled from its second use on
+        with Mdfier(tmp_output_path, reference_links=True) as mdfier:
+            for text in "abc":
+                mdfier.write(MdLink(url, text))
+        assert tmp_output_path.read_text(encoding="utf-8") == (
+            f"[a]({url})\n[b][1]\n[c][1]\n\n[1]: {url}\n"
+        )
+
+
+def test_link_references_skip_unprofitable_targets() -> None:
+    contents = [MdLink("a", "x"), MdLink("a", "y")]
+    references = LinkReferences(list(contents))
+
+    assert len(references) == 0
+    assert references.render(contents[0]) is None
+    assert references.bytes_saved == 0
+
+
+@pytest.mark.parametrize(
+    "element",
+    [
+        MdCode("code"),
+        MdHeader("header"),
+        MdHorizontal(),
+        MdImage("image.png"),
+        MdLink("https://example.com"),
+        MdList(["item"]),
+        MdQuote("quote"),
+        MdTable([{"a": 1}]),
+        MdTableOfContents(),
+        MdText("text"),
+    ],
+)
+def test_elements_have_no_instance_dict(element: MdElement) -> None:
+    assert not hasattr(element, "__dict__")
+
+
+class PlainElement(MdElement):
+    """Third-party element implementing only __str__."""
+
+    def __str__(self) -> str:
+        return "plain\nelement"
+
+
+def test_render_into_falls_back_to_str() -> None:
+    parts: list[str] = []
+    PlainElement().render_into(parts.append)
+    assert parts == ["plain\nelement"]
+
+    contents = [MdQuote(PlainElement()), MdList([PlainElement()]), PlainElement()]
+    assert Mdfier.stringify(contents) == (
+        "> plain\n> element\n- plain\n  element\nplain\nelement"
+    )
+
+
+def test_render_into_pushes_fragments() -> None:
+    table = MdTable([{"a": i} for i in range(3000)])
+    quote = MdQuote(MdQuote(table))
+
+    parts: list[str] = []
+    quote.render_into(parts.append)
+
+    assert len(parts) > 1
+    assert "".join(parts) == str(quote)
+    assert str(quote).splitlines() == [
+        "> > " + line for line in str(table).splitlines()
+    ]
+
+
+def test_elements_structural_key() -> None:
+    legend = MdTable([{"symbol": "*", "meaning": "estimated", "weight": 0.5}])
+    same = MdTable([{"symbol": "*", "meaning": "estimated", "weight": 0.5}])
+    assert legend.structural_key() == same.structural_key()
+    # Elements themselves keep identity equality
+    assert legend != same and len({legend, same}) == 2
+
+    reordered = MdTable([{"meaning": "estimated", "symbol": "*", "weight": 0.5}])
+    assert legend.structural_key() != reordered.structural_key()
+    assert MdText("1").structural_key() != MdHeader("1").structural_key()
+    assert MdList([1, 2]).structural_key() != MdList([1.0, 2.0]).structural_key()
+    assert MdList([0.0]).structural_key() != MdList([-0.0]).structural_key()
+
+    # Generators are keyed by identity, as rendering consumes them
+    assert MdList(iter([1])).structural_key() != MdList(iter([1])).structural_key()
+
+
+def test_mdfy_write_dedup() -> None:
+    contents: list[MdElement] = []
+    for i in range(3):
+        contents += [MdHeader(f"Section {i}", 2), MdQuote(MdText("[Draft:bold]"))]
+        contents += [MdText("[Figures are estimates:italic]"), MdHorizontal()]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir, "output.md")
+        mdfier = Mdfier(path, dedup=True)
+        mdfier.write(contents)
+
+        assert path.read_text(encoding="utf-8") == Mdfier.stringify(contents) + "\n"
+        assert mdfier.dedup_report == DedupReport(
+            rendered=6, reused=6, chars_reused=2 * (11 + 23 + 5)
+        )
+        assert Mdfier(path).dedup_report is None
+    assert Mdfier.stringify(contents, dedup=True) == Mdfier.stringify(contents)
+
+
+@pytest.mark.parametrize(
+    "element",
+    [
+        MdCode("print(1)", syntax="python"),
+        MdHeader("header", 3),
+        MdHorizontal("---"),
+        MdImage("image.png", "alt"),
+        MdLink("https://example.com", "text", "title"),
+        MdList(["item", [MdText("[nested:bold]")]], numbered=True),
+        MdQuote(MdText("[quote:italic]")),
+        MdTable([{"a": 1, "b": 2.5}], precision=1),
+        MdText("[text:bold]"),
+    ],
+)
+def test_elements_pickle_round_trip(element: MdElement) -> None:
+    loaded = pickle.loads(pickle.dumps(element))
+    assert type(loaded) is type(element)
+    assert loaded.structural_key() == element.structural_key()
+    assert str(loaded) == str(element)
+
+
+def test_pickled_text_shares_default_formatter() -> None:
+    text = MdText("[text:bold]")
+    data = pickle.dumps(text)
+    assert b"lark" not in data.lower()
+
+    loaded = pickle.loads(data)
+    assert loaded.formatter is text.formatter
+    assert pickle.loads(pickle.dumps(MdText("text", no_style=True))).formatter is None
+
+
+class TaggedElement(PlainElement):
+    """Third-party element with instance attributes."""
+
+    def __init__(self, tag: str) -> None:
+        self.tag = tag
+
+
+def test_pickle_element_with_instance_dict() -> None:
+    loaded = pickle.loads(pickle.dumps(TaggedElement("tag")))
+    assert loaded.tag == "tag"
@@ -0,0 +1,127 @@
+from typing import Iterator
+
+import pytest
+
+from mdfy import MdElement, MdList, MdQuote, MdTable, MdText, render_cache
+
+
+@pytest.fixture
+def cache() -> Iterator[None]:
+    render_cache.enable()
+    yield
+    render_cache.disable()
+
+
+def test_disabled_by_default() -> None:
+    text = MdText("[text:bold]")
+    assert str(text) == str(text) == "**text**"
+    assert len(render_cache) == 0
+    assert render_cache.hits == render_cache.misses == 0
+    assert "__setattr__" not in vars(MdElement)
+
+
+def test_hit_and_setattr_invalidation(cache: None) -> None:
+    table = MdTable([{"a": 1}, {"a": 2}])
+    assert str(table) == str(table)
+    assert (render_cache.hits, render_cache.misses) == (1, 1)
+
+    table.limit = 1
+    assert str(table) == "| a |\n| --- |\n| 1 |"
+    assert render_cache.misses == 2
+
+
+def test_container_invalidated_by_child(cache: None) -> None:
+    text = MdText("[quoted:bold]")
+    quote = MdQuote(MdList(["item", text]))
+    assert str(quote) == "> - item\n> - **quoted**"
+
+    text.content = "[quoted:italic]"
+    assert str(quote) == "> - item\n> - *quoted*"
+
+
+def test_table_invalidated_by_cell(cache: None) -> None:
+    cell = MdText("[cell:bold]")
+    title = MdText("text")
+    table = MdTable({"text": cell}, header=[title])
+    assert str(table) == "| text |\n| --- |\n| **cell** |"
+
+    cell.content = "[cell:italic]"
+    assert str(table) == "| text |\n| --- |\n| *cell* |"
+    title.content = "[text:bold]"
+    assert str(table) == "| **text** |\n| --- |\n| *cell* |"
+
+
+def test_invalidate_after_in_place_edit(cache: None) -> None:
+    items = ["a"]
+    md_list = MdList(items)
+    assert str(md_list) == "- a"
+
+    items.append("b")
+    assert str(md_list) == "- a"
+    md_list.invalidate()
+    assert str(md_list) == "- a\n- b"
+
+
+def test_render_into_reuses_cached_rendering(cache: None) -> None:
+    quote = MdQuote("line")
+    str(quote)
+    parts: list[str] = []
+    quote.render_into(parts.append)
+    assert parts == ["> line"]
+    assert render_cache.hits == 1
+
+
+def test_evicts_least_recently_used(cache: None) -> None:
+    texts = [MdText(f"text {i}", no_style=True) for i in range(3)]
+    str(texts[0])
+    render_cache.enable(max_bytes=render_cache.size * 2)
+    for text in texts:
+        str(text)
+
+    assert len(render_cache) == 2
+    assert render_cache.size <= render_cache.max_bytes
+    str(texts[0])
+    assert render_cache.misses == 4
+
+
+def test_skips_renderings_larger_than_cache(cache: None) -> None:
+    render_cache.enable(max_bytes=100)
+    str(MdText("x" * 1000, no_style=True))
+    assert len(render_cache) == 0
+
+
+def test_entry_dropped_with_element(cache: None) -> None:
+    str(MdText("[gone:bold]"))
+    assert len(render_cache) == 0
+
+
+def test_structural_key_cached_until_child_changes(cache: None) -> None:
+    text = MdText("[note:bold]")
+    quote = MdQuote(MdList([text]))
+    first = quote.structural_key()
+    assert quote.structural_key() is first
+
+    text.content = "[note:italic]"
+    assert quote.structural_key() != first
+    assert (
+        quote.structural_key()
+        == MdQuote(MdList([MdText("[note:italic]")])).structural_key()
+    )
+
+
+def test_structural_key_cached_without_render_cache() -> None:
+    items: list = ["a", MdText("[b:bold]")]
+    md_list = MdList(items)
+    first = md_list.structural_key()
+    assert md_list.structural_key() is first
+
+    md_list.numbered = True
+    second = md_list.structural_key()
+    assert second != first
+    assert md_list.structural_key() is second
+
+    # Lists edited in place are noticed once invalidated
+    items.append("c")
+    assert md_list.structural_key() is second
+    md_list.invalidate()
+    assert md_list.structural_key() == MdList(items, numbered=True).structural_key()
@@ -0,0 +1,116 @@
+from pathlib import Path
+
+import pytest
+
+from mdfy import (
+    MdContents,
+    Mdfier,
+    MdHeader,
+    MdHorizontal,
+    MdSlot,
+    MdTable,
+    MdTableOfContents,
+    MdTemplate,
+    MdText,
+)
+from mdfy.elements.text_formatter import MdFormatter
+
+
+class CountingFormatter(MdFormatter):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def format(self, text: str) -> str:
+        self.calls += 1
+        return text.upper()
+
+
+def _contents(name: MdContents, rows: MdContents) -> list[MdContents]:
+    return [
+        MdHeader("Report"),
+        MdText("[Dear:bold]"),
+        name,
+        MdHorizontal(),
+        rows,
+        MdText("[Bye:italic]"),
+    ]
+
+
+def test_render_matches_stringify() -> None:
+    template = MdTemplate(_contents(MdSlot("name"), MdSlot("rows")))
+    name = MdText("[Ann:bold]")
+    rows: list[MdContents] = [MdTable([{"a": 1}]), "note"]
+
+    assert template.slots == ("name", "rows")
+    assert template.render(name=name, rows=rows) == Mdfier.stringify(
+        _contents(name, rows)
+    )
+    assert template.render(name="Bob", rows=[]).startswith("# Report\n**Dear**\nBob")
+
+
+def test_empty_slot_values_are_not_separated(tmp_path: Path) -> None:
+    template = MdTemplate(
+        [
+            MdSlot("first"),
+            MdText("A"),
+            MdSlot("empty"),
+            MdSlot("middle"),
+            MdText("B"),
+            MdSlot("last"),
+        ]
+    )
+    assert template.render(first=[], empty=[], middle=[], last=[]) == "A\nB"
+
+    middle: list[MdContents] = [MdText("[y:bold]"), "z"]
+    values: dict[str, MdContents] = {
+        "first": "x",
+        "empty": [],
+        "middle": middle,
+        "last": [[]],
+    }
+    filled: list[MdContents] = ["x", MdText("A"), [], middle, MdText("B"), [[]]]
+    assert template.render(**values) == Mdfier.stringify(filled)
+
+    path, expected = tmp_path / "filled.md", tmp_path / "expected.md"
+    template.write_many([(path, values)])
+    Mdfier(expected).write(filled)
+    assert path.read_bytes() == expected.read_bytes()
+
+
+def test_static_parts_rendered_once() -> None:
+    formatter = CountingFormatter()
+    template = MdTemplate([MdText("static", formatter), MdSlot("value")])
+
+    documents = list(template.render_many({"value": str(i)} for i in range(100)))
+    assert documents[:2] == ["STATIC\n0", "STATIC\n1"]
+    assert formatter.calls == 1
+
+
+def test_missing_slot_value() -> None:
+    template = MdTemplate([MdSlot("first"), MdSlot("second")])
+    with pytest.raises(KeyError, match="second"):
+        template.render(first="value")
+
+
+def test_table_of_contents_lists_static_headers() -> None:
+    template = MdTemplate([MdTableOfContents(), MdHeader("Static"), MdSlot("section")])
+    rendered = template.render(section=MdHeader("Dynamic"))
+    assert "[Static](#static)" in rendered
+    assert "[Dynamic]" not in rendered
+
+
+def test_write_many(tmp_path: Path) -> None:
+    template = MdTemplate(_contents(MdSlot("name"), MdSlot("rows")))
+    values: list[dict[str, MdContents]] = [
+        {"name": f"Customer {i}", "rows": MdTable([{"id": i, "név": "é"}])}
+        for i in range(3)
+    ]
+    paths = [tmp_path / "out" / f"{i}.md" for i in range(3)]
+
+    assert template.write_many(zip(paths, values)) == 3
+    for path, document_values in zip(paths, values):
+        expected = tmp_path / "expected.md"
+        Mdfier(expected).write(
+            _contents(document_values["name"], document_values["rows"])
+        )
+        assert path.read_bytes() == expected.read_bytes()
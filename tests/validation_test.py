@@ -0,0 +1,78 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from mdfy import Mdfier, MdHeader, MdImage, MdLink, MdText, validate_links
+from mdfy.validation import collect_anchors
+
+
+def test_collect_anchors() -> None:
+    anchors = collect_anchors(
+        [MdHeader("Getting Started"), MdText("text"), [MdHeader("Getting Started", 2)]]
+    )
+    assert anchors == {"getting-started", "getting-started-1"}
+
+
+def test_validate_anchors() -> None:
+    contents = [
+        MdHeader("Release notes"),
+        MdLink("#release-notes", "ok"),
+        MdLink("#release%20notes", "broken"),
+        MdLink("#missing", "broken"),
+        MdLink("https://example.com/#missing", "external"),
+    ]
+    report = validate_links(contents)
+
+    assert report.anchors_checked == 3
+    assert [(issue.index, issue.target) for issue in report.broken_anchors] == [
+        (2, "#release%20notes"),
+        (3, "#missing"),
+    ]
+    assert report.files_checked == 0
+    assert not report.ok
+
+
+def test_validate_relative_files(tmp_path: Path) -> None:
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "guide.md").write_text("guide")
+    (tmp_path / "logo.png").write_bytes(b"")
+
+    contents = [
+        MdLink("docs/guide.md#usage", "guide"),
+        MdLink("docs/missing.md", "missing"),
+        MdImage("logo.png"),
+        MdImage("./missing.png"),
+        MdLink("/absolute/path.md", "absolute"),
+        MdLink("mailto:someone@example.com", "mail"),
+    ]
+    report = validate_links(contents, tmp_path)
+
+    assert report.files_checked == 4
+    assert [issue.target for issue in report.missing_files] == [
+        "docs/missing.md",
+        "./missing.png",
+    ]
+    assert report.broken_anchors == []
+
+
+def test_validate_stats_each_path_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (tmp_path / "target.md").write_text("target")
+    calls: list[str] = []
+    exists = os.path.exists
+
+    def counting_exists(path: str) -> bool:
+        calls.append(path)
+        return exists(path)
+
+    monkeypatch.setattr(os.path, "exists", counting_exists)
+    contents = [MdLink("target.md", str(i)) for i in range(1000)]
+    contents += [MdLink("./target.md#top", "again"), MdLink("gone.md", "gone")]
+    report = Mdfier(tmp_path / "out.md").validate(contents)
+
+    assert report.files_checked == 1002
+    assert report.paths_stated == 2
+    assert len(calls) == 2
+    assert [issue.target for issue in report.missing_files] == ["gone.md"]